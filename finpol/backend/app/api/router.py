@@ -1,10 +1,20 @@
 """API Router - combines all route handlers."""
+from importlib import import_module
+
 from fastapi import APIRouter
-from app.api.routes import transactions, health, compliance
+
+__all__ = ["api_router"]
+
+# (module, prefix, tag) for each route module under app.api.routes
+ROUTE_MODULES = (
+    ("health", "", "health"),
+    ("transactions", "/transactions", "transactions"),
+    ("compliance", "/compliance", "compliance"),
+)
 
 api_router = APIRouter()
 
 # Include all route modules with /api/v1 prefix
-api_router.include_router(health.router, tags=["health"])
-api_router.include_router(transactions.router, prefix="/transactions", tags=["transactions"])
-api_router.include_router(compliance.router, prefix="/compliance", tags=["compliance"])
+for name, prefix, tag in ROUTE_MODULES:
+    module = import_module(f"app.api.routes.{name}")
+    api_router.include_router(module.router, prefix=prefix, tags=[tag])
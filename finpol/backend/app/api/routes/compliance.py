@@ -1,83 +1,141 @@
 """Compliance API routes."""
 from fastapi import APIRouter, HTTPException, Depends, Query, UploadFile, File, Form
-from fastapi.responses import Response
+from fastapi.responses import FileResponse, ORJSONResponse, Response
+from starlette.background import BackgroundTask
 from typing import List, Optional
-from datetime import datetime
 import logging
+import os
 
+import orjson
+
+from app.config import settings
+from app.utils.helpers import utc_now
 from app.models.risk_response_model import ComplianceReport
-from app.dependencies import get_compliance_generator, get_regulation_retriever
-from app.services.compliance_generator import ComplianceGenerator
-from app.services.regulation_retriever import RegulationRetriever
-from app.services.bulk_processor import bulk_processor
+from app.dependencies import (
+    get_regulation_retriever,
+    get_semantic_cache,
+    RegulationRetrieverProtocol,
+    SemanticCacheProtocol
+)
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Risk levels that require manual compliance review
+_REVIEW_LEVELS = frozenset({"Medium", "High", "Critical"})
+
+# Report fields per risk level; anything not listed is auto-approved
+_APPROVED_TEMPLATE = {
+    "compliance_status": "approved",
+    "regulations_applied": (),
+    "violations": (),
+    "recommendations": ("Auto-approved",),
+}
+_REVIEW_TEMPLATE = {
+    "compliance_status": "review_required",
+    "regulations_applied": ("AML", "KYC"),
+    "violations": (),
+    "recommendations": ("Manual review required",),
+}
+_REPORT_TEMPLATES = {level: _REVIEW_TEMPLATE for level in _REVIEW_LEVELS}
+
+_LLM_ANALYSIS_PREFIX = "Compliance review pending due to risk level: "
+
+# Fallback payloads are static, so they are encoded once at import
+_SAMPLE_REGULATIONS_JSON = orjson.dumps([
+    {"id": "aml_001", "title": "Anti-Money Laundering Act", "content": "Financial institutions must report suspicious transactions over $10,000."},
+    {"id": "kyc_001", "title": "Know Your Customer", "content": "Customer identity verification required for all accounts."},
+    {"id": "fatf_001", "title": "FATF Guidelines", "content": "International standards for combating money laundering and terrorist financing."}
+])
+_SAMPLE_SEARCH_PREFIX = b'[{"content":"Sample regulation related to: '
+_SAMPLE_SEARCH_SUFFIX = b'. In production, this would come from the FAISS vectorstore."}]'
+_COMPLIANCE_HEALTH_JSON = orjson.dumps({"status": "operational", "service": "compliance"})
+
+_ALLOWED_UPLOAD_EXTENSIONS = ['.csv', '.xlsx', '.xls', '.pdf']
+
+
+def _validate_upload(file: UploadFile) -> None:
+    """
+    Reject uploads with an unsupported type or over the size limit.
+    
+    Raises:
+        HTTPException: 400 for unsupported types, 413 for oversized files
+    """
+    file_ext = file.filename.lower().split('.')[-1]
+    
+    if f'.{file_ext}' not in _ALLOWED_UPLOAD_EXTENSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported file type. Allowed: {', '.join(_ALLOWED_UPLOAD_EXTENSIONS)}"
+        )
+    
+    max_bytes = settings.max_upload_size_mb * 1024 * 1024
+    if file.size is not None and file.size > max_bytes:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File too large. Maximum size is {settings.max_upload_size_mb} MB"
+        )
+
 
-@router.post("/report/{transaction_id}", response_model=ComplianceReport)
+@router.post("/report/{transaction_id}", response_model=None, responses={200: {"model": ComplianceReport}})
 async def generate_compliance_report(
     transaction_id: str,
     risk_score: int = Query(..., description="Risk score from transaction analysis"),
-    risk_level: str = Query(..., description="Risk level from transaction analysis"),
-    compliance_gen: ComplianceGenerator = Depends(get_compliance_generator)
+    risk_level: str = Query(..., description="Risk level from transaction analysis")
 ):
     """Generate compliance report for a transaction."""
     # Create a minimal report without the actual transaction
     # In production, you'd fetch the full transaction from DB
-    report = ComplianceReport(
-        transaction_id=transaction_id,
-        compliance_status="review_required" if risk_level in ["Medium", "High", "Critical"] else "approved",
-        regulations_applied=["AML", "KYC"] if risk_level in ["Medium", "High", "Critical"] else [],
-        violations=[],
-        recommendations=["Manual review required"] if risk_level in ["Medium", "High", "Critical"] else ["Auto-approved"],
-        llm_analysis="Compliance review pending due to risk level: " + risk_level,
-        timestamp=datetime.now()
-    )
-    return report
-
-
-@router.get("/regulations", response_model=List[dict])
+    # Every field is set here from trusted values, so the ComplianceReport
+    # shape is emitted directly instead of being validated and re-dumped
+    template = _REPORT_TEMPLATES.get(risk_level, _APPROVED_TEMPLATE)
+    return ORJSONResponse({
+        "transaction_id": transaction_id,
+        **template,
+        "llm_analysis": _LLM_ANALYSIS_PREFIX + risk_level,
+        "timestamp": utc_now(),
+    })
+
+
+@router.get("/regulations", response_model=None, responses={200: {"model": List[dict]}})
 async def list_regulations(
-    retriever: RegulationRetriever = Depends(get_regulation_retriever)
+    retriever: RegulationRetrieverProtocol = Depends(get_regulation_retriever)
 ):
     """List all available regulations."""
     try:
-        return await retriever.get_all_regulations()
+        return ORJSONResponse(await retriever.get_all_regulations())
     except FileNotFoundError:
         # Return sample regulations if vectorstore not available
-        return [
-            {"id": "aml_001", "title": "Anti-Money Laundering Act", "content": "Financial institutions must report suspicious transactions over $10,000."},
-            {"id": "kyc_001", "title": "Know Your Customer", "content": "Customer identity verification required for all accounts."},
-            {"id": "fatf_001", "title": "FATF Guidelines", "content": "International standards for combating money laundering and terrorist financing."}
-        ]
+        return Response(content=_SAMPLE_REGULATIONS_JSON, media_type="application/json")
 
 
 @router.post("/regulations/search")
 async def search_regulations(
     query: str,
-    retriever: RegulationRetriever = Depends(get_regulation_retriever)
+    retriever: RegulationRetrieverProtocol = Depends(get_regulation_retriever),
+    cache: SemanticCacheProtocol = Depends(get_semantic_cache)
 ):
-    """Search regulations by query."""
+    """Search regulations by query, reusing results for similar queries."""
     try:
-        results = await retriever.search_regulations_async(query)
-        return results
+        payload = await cache.get_or_search(query, retriever)
+        return Response(content=payload, media_type="application/json")
     except FileNotFoundError:
         # Return sample results if vectorstore not available
         logger.warning(f"Vectorstore not available, returning sample results for query: {query}")
-        return [
-            {"content": f"Sample regulation related to: {query}. In production, this would come from the FAISS vectorstore."}
-        ]
+        # Splice the escaped query (a JSON string without its quotes) into the template
+        payload = _SAMPLE_SEARCH_PREFIX + orjson.dumps(query)[1:-1] + _SAMPLE_SEARCH_SUFFIX
+        return Response(content=payload, media_type="application/json")
 
 
-@router.get("/health")
+# Duplicates the top-level /health probe, so it is kept out of the schema
+@router.get("/health", include_in_schema=False)
 async def compliance_health():
     """Health check for compliance service."""
-    return {"status": "operational", "service": "compliance"}
+    return Response(content=_COMPLIANCE_HEALTH_JSON, media_type="application/json")
 
 
-@router.post("/upload")
+@router.post("/upload", response_class=ORJSONResponse)
 async def upload_transactions(
     file: UploadFile = File(...),
     user_id: str = Form(default="bulk_upload")
@@ -89,40 +147,33 @@ async def upload_transactions(
     1. Parse the file and extract transactions
     2. Analyze each transaction with the RiskEngine
     3. Retrieve relevant regulations via RAG
-    4. Generate a PDF compliance report
     
-    Returns summary of analysis and allows PDF download.
+    Returns summary of analysis. The PDF report is only rendered by
+    /upload-with-report, since this response does not include it.
     """
     logger.info(f"Received file upload: {file.filename}")
     
-    # Validate file type
-    allowed_extensions = ['.csv', '.xlsx', '.xls', '.pdf']
-    file_ext = file.filename.lower().split('.')[-1]
-    
-    if f'.{file_ext}' not in allowed_extensions:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Unsupported file type. Allowed: {', '.join(allowed_extensions)}"
-        )
+    _validate_upload(file)
     
     try:
-        # Read file content
-        content = await file.read()
+        # Parse straight from the spooled upload instead of buffering it
+        # Imported here so pandas/reportlab load only when uploads are used
+        from app.services.bulk_processor import bulk_processor
         
-        # Process the file
         result = await bulk_processor.process_file(
-            file_content=content,
+            file=file.file,
             filename=file.filename,
-            user_id=user_id
+            user_id=user_id,
+            generate_report=False
         )
         
-        return {
+        return ORJSONResponse({
             "status": "success",
             "message": f"Successfully processed {result['summary']['total_transactions']} transactions",
             "filename": result['filename'],
             "processed_at": result['processed_at'],
             "summary": result['summary']
-        }
+        })
         
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -143,36 +194,28 @@ async def upload_transactions_with_report(
     """
     logger.info(f"Received file upload with report: {file.filename}")
     
-    # Validate file type
-    allowed_extensions = ['.csv', '.xlsx', '.xls', '.pdf']
-    file_ext = file.filename.lower().split('.')[-1]
-    
-    if f'.{file_ext}' not in allowed_extensions:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Unsupported file type. Allowed: {', '.join(allowed_extensions)}"
-        )
+    _validate_upload(file)
     
     try:
-        # Read file content
-        content = await file.read()
+        # Parse straight from the spooled upload instead of buffering it
+        # Imported here so pandas/reportlab load only when uploads are used
+        from app.services.bulk_processor import bulk_processor
         
-        # Process the file
         result = await bulk_processor.process_file(
-            file_content=content,
+            file=file.file,
             filename=file.filename,
             user_id=user_id
         )
         
         # Generate filename for PDF
-        pdf_filename = f"compliance_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+        pdf_filename = f"compliance_report_{utc_now().strftime('%Y%m%d_%H%M%S')}.pdf"
         
-        return Response(
-            content=result['pdf_report'],
+        # Stream the report from its temporary file, deleting it once sent
+        return FileResponse(
+            result['pdf_path'],
             media_type='application/pdf',
-            headers={
-                'Content-Disposition': f'attachment; filename="{pdf_filename}"'
-            }
+            filename=pdf_filename,
+            background=BackgroundTask(os.remove, result['pdf_path'])
         )
         
     except ValueError as e:
@@ -1,16 +1,25 @@
 """Health check routes."""
 from fastapi import APIRouter
+from fastapi.responses import Response
+import orjson
 
 router = APIRouter()
 
+# Probed constantly and never change, so encoded once at import. A fresh
+# Response wraps the bytes per request: middleware sets per-request
+# headers, so a shared Response instance would leak them across requests.
+_HEALTH_JSON = orjson.dumps({"status": "healthy", "service": "FinPol API"})
+_READY_JSON = orjson.dumps({"ready": True})
 
-@router.get("/health")
+
+# HEAD is accepted as well, since some load balancers probe with it
+@router.api_route("/health", methods=["GET", "HEAD"])
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "service": "FinPol API"}
+    return Response(content=_HEALTH_JSON, media_type="application/json")
 
 
-@router.get("/ready")
+@router.api_route("/ready", methods=["GET", "HEAD"])
 async def readiness_check():
     """Readiness check endpoint."""
-    return {"ready": True}
+    return Response(content=_READY_JSON, media_type="application/json")
@@ -7,44 +7,77 @@ This module provides:
 - Clean service abstraction
 """
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import ORJSONResponse
 from typing import List, Optional
-from uuid import uuid4
+import asyncio
 import logging
 
 from app.models.transaction_model import Transaction, TransactionCreate, TransactionResponse
 from app.models.risk_response_model import RiskResponse
+from app.config import settings
+from app.utils.helpers import generate_id, utc_now
+from app.services.response_cache import feature_key
+from app.core.constants import HIGH_RISK_AMOUNT_THRESHOLD, MEDIUM_RISK_DEVICE_SCORE, RISK_CODE_REVIEW
 from app.dependencies import (
     get_risk_engine,
     get_compliance_generator,
-    get_regulation_retriever,
+    get_retrieval_batcher,
+    get_transaction_store,
+    get_response_cache,
     RiskEngineProtocol,
-    RegulationRetrieverProtocol,
-    ComplianceGeneratorProtocol
+    RetrievalBatcherProtocol,
+    ComplianceGeneratorProtocol,
+    TransactionStoreProtocol,
+    ResponseCacheProtocol
 )
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# In-memory storage (use database in production)
-transactions_db: dict = {}
+_COMPLIANCE_UNAVAILABLE = "Compliance review required but detailed analysis unavailable."
 
 
-@router.post("/analyze", response_model=RiskResponse)
+def _may_require_review(transaction: Transaction) -> bool:
+    """
+    Cheap pre-check for whether a transaction could be flagged.
+    
+    Thresholds are deliberately looser than the risk rules, so a False
+    result means regulation retrieval need not be started speculatively.
+    """
+    return (
+        transaction.amount > HIGH_RISK_AMOUNT_THRESHOLD
+        or transaction.device_risk_score > MEDIUM_RISK_DEVICE_SCORE
+        or transaction.merchant_type == "crypto_exchange"
+    )
+
+
+# High-traffic routes return ORJSONResponse themselves: FastAPI then skips its
+# jsonable_encoder pass and orjson encodes datetimes and numpy values natively.
+@router.post(
+    "/analyze",
+    response_model=None,
+    response_class=ORJSONResponse,
+    responses={200: {"model": RiskResponse}}
+)
 async def analyze_transaction(
     transaction: Transaction,
     risk_engine: RiskEngineProtocol = Depends(get_risk_engine),
     compliance_gen: ComplianceGeneratorProtocol = Depends(get_compliance_generator),
-    regulation_retriever: RegulationRetrieverProtocol = Depends(get_regulation_retriever)
-) -> RiskResponse:
+    retrieval_batcher: RetrievalBatcherProtocol = Depends(get_retrieval_batcher),
+    response_cache: ResponseCacheProtocol = Depends(get_response_cache)
+) -> ORJSONResponse:
     """
     Analyze a transaction for risk and compliance.
     
     Flow:
     1. Accept Transaction model
-    2. Call RiskEngine to assess risk (async)
+    2. Call RiskEngine to assess risk (async), retrieving regulations
+       concurrently when the transaction may need review
     3. If risk is Medium or High:
-        - Retrieve regulations (async)
+        - Reuse a cached explanation for similar transactions, or
+        - Retrieve regulations (async, batched with concurrent requests)
+          if not already fetched
         - Generate compliance explanation (async)
     4. Return RiskResponse model
     
@@ -52,27 +85,51 @@ async def analyze_transaction(
         transaction: Transaction to analyze
         risk_engine: Injected risk engine
         compliance_gen: Injected compliance generator
-        regulation_retriever: Injected regulation retriever
+        retrieval_batcher: Injected regulation retrieval batcher
+        response_cache: Injected compliance explanation cache
         
     Returns:
-        RiskResponse with risk assessment and compliance explanation
+        RiskResponse JSON with risk assessment and compliance explanation
     """
     try:
-        transaction_id = getattr(transaction, 'transaction_id', None) or str(uuid4())
+        transaction_id = getattr(transaction, 'transaction_id', None) or generate_id()
         transaction.transaction_id = transaction_id
         
-        # Step 1: Assess risk (async for future ML integration)
-        risk_result = await risk_engine.assess_risk_async(transaction)
+        # The retrieval query only depends on the transaction, so it can
+        # run alongside risk assessment instead of after it
+        query = f"transaction risk {transaction.country} {transaction.merchant_type}"
+        regulations = None
+        cache_key = feature_key(transaction)
+        
+        # Step 1: Assess risk (async for future ML integration); retrieval is
+        # not worth starting when a cached explanation will likely be reused
+        if _may_require_review(transaction) and not response_cache.contains(cache_key):
+            risk_result, regulations = await asyncio.gather(
+                risk_engine.assess_risk_async(transaction),
+                retrieval_batcher.submit(query),
+                return_exceptions=True
+            )
+            if isinstance(risk_result, Exception):
+                raise risk_result
+        else:
+            risk_result = await risk_engine.assess_risk_async(transaction)
         
         # Determine if compliance check is needed
-        requires_compliance = risk_result.risk_level in ["Medium", "High", "Critical"]
+        requires_compliance = risk_result.risk_code >= RISK_CODE_REVIEW
         compliance_explanation: Optional[str] = None
         
         if requires_compliance:
+            compliance_explanation = response_cache.get(
+                cache_key, risk_result.risk_level, risk_result.factors
+            )
+        
+        if requires_compliance and compliance_explanation is None:
             try:
-                # Step 2: Retrieve relevant regulations (async)
-                query = f"transaction risk {transaction.country} {transaction.merchant_type}"
-                regulations = await regulation_retriever.retrieve_async(query)
+                # Step 2: Retrieve relevant regulations (async) unless already fetched
+                if regulations is None:
+                    regulations = await retrieval_batcher.submit(query)
+                if isinstance(regulations, Exception):
+                    raise regulations
                 
                 # Step 3: Generate compliance explanation (async)
                 compliance_explanation = await compliance_gen.generate_async(
@@ -80,53 +137,173 @@ async def analyze_transaction(
                     reasons=risk_result.factors,
                     regulations=regulations
                 )
+                response_cache.put(
+                    cache_key, risk_result.risk_level, compliance_explanation, risk_result.factors
+                )
             except Exception as e:
                 logger.warning(f"Compliance generation failed: {e}")
-                compliance_explanation = "Compliance review required but detailed analysis unavailable."
+                compliance_explanation = _COMPLIANCE_UNAVAILABLE
         
         # Build response
-        should_approve = risk_result.risk_level in ["Low"]
-        requires_review = risk_result.risk_level in ["Medium", "High", "Critical"]
+        should_approve = not requires_compliance
+        requires_review = requires_compliance
         
         logger.info(
             f"Transaction {transaction_id} analyzed: "
             f"risk={risk_result.risk_level}, approve={should_approve}"
         )
         
-        return RiskResponse(
+        # Built from the risk engine's own output, so not re-validated
+        return ORJSONResponse(RiskResponse.model_construct(
             transaction_id=transaction_id,
             risk_score=risk_result.risk_score,
             risk_level=risk_result.risk_level,
             should_approve=should_approve,
             requires_review=requires_review,
             compliance_explanation=compliance_explanation
-        )
+        ).model_dump())
         
     except Exception as e:
         logger.error(f"Transaction analysis failed: {e}")
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
 
-@router.post("/", response_model=TransactionResponse, status_code=201)
+@router.post(
+    "/analyze/batch",
+    response_model=None,
+    response_class=ORJSONResponse,
+    responses={200: {"model": List[RiskResponse]}}
+)
+async def analyze_transactions_batch(
+    transactions: List[Transaction],
+    risk_engine: RiskEngineProtocol = Depends(get_risk_engine),
+    compliance_gen: ComplianceGeneratorProtocol = Depends(get_compliance_generator),
+    retrieval_batcher: RetrievalBatcherProtocol = Depends(get_retrieval_batcher),
+    response_cache: ResponseCacheProtocol = Depends(get_response_cache)
+) -> ORJSONResponse:
+    """
+    Analyze many transactions in one request.
+    
+    Flow:
+    1. Score every transaction in one vectorized RiskEngine pass
+    2. Reuse cached explanations for flagged transactions where possible
+    3. Retrieve regulations once per distinct (country, merchant type)
+    4. Generate the remaining explanations with batched LLM prompts
+    5. Return one RiskResponse per transaction, in request order
+    
+    Args:
+        transactions: Transactions to analyze
+        risk_engine: Injected risk engine
+        compliance_gen: Injected compliance generator
+        retrieval_batcher: Injected regulation retrieval batcher
+        response_cache: Injected compliance explanation cache
+        
+    Returns:
+        JSON list of RiskResponse, one per transaction
+        
+    Raises:
+        HTTPException: If the batch is empty or too large
+    """
+    if not transactions:
+        raise HTTPException(status_code=400, detail="No transactions provided")
+    if len(transactions) > settings.analyze_batch_max_size:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many transactions. Maximum is {settings.analyze_batch_max_size} per request"
+        )
+    
+    try:
+        assessed = risk_engine.assess_transactions(transactions)
+        risk_scores = assessed["risk_score"].tolist()
+        risk_levels = assessed["risk_level"].tolist()
+        requires_review = (assessed["risk_code"].to_numpy() >= RISK_CODE_REVIEW).tolist()
+        reasons_list = assessed["reasons"].tolist()
+        
+        explanations: List[Optional[str]] = [None] * len(transactions)
+        cache_keys: dict = {}
+        # Flagged positions still needing an explanation, grouped by retrieval query
+        pending: dict = {}
+        for position, (transaction, risk_level, review) in enumerate(
+            zip(transactions, risk_levels, requires_review)
+        ):
+            if not review:
+                continue
+            cache_key = cache_keys[position] = feature_key(transaction)
+            explanations[position] = response_cache.get(cache_key, risk_level, reasons_list[position])
+            if explanations[position] is None:
+                query = f"transaction risk {transaction.country} {transaction.merchant_type}"
+                pending.setdefault(query, []).append(position)
+        
+        async def explain(query: str, positions: List[int]) -> None:
+            try:
+                regulations = await retrieval_batcher.submit(query)
+                generated = await compliance_gen.generate_batch_async(
+                    [transactions[position] for position in positions],
+                    [reasons_list[position] for position in positions],
+                    regulations
+                )
+            except Exception as e:
+                logger.warning(f"Batch compliance generation failed: {e}")
+                return
+            for position, explanation in zip(positions, generated):
+                if explanation is not None:
+                    explanations[position] = explanation
+                    response_cache.put(
+                        cache_keys[position], risk_levels[position], explanation, reasons_list[position]
+                    )
+        
+        await asyncio.gather(*(explain(query, positions) for query, positions in pending.items()))
+        
+        logger.info(f"Batch of {len(transactions)} transactions analyzed")
+        
+        return ORJSONResponse([
+            RiskResponse.model_construct(
+                transaction_id=transaction.transaction_id,
+                risk_score=risk_score,
+                risk_level=risk_level,
+                should_approve=not review,
+                requires_review=review,
+                compliance_explanation=(explanation or _COMPLIANCE_UNAVAILABLE) if review else None
+            ).model_dump()
+            for transaction, risk_score, risk_level, review, explanation in zip(
+                transactions, risk_scores, risk_levels, requires_review, explanations
+            )
+        ])
+        
+    except Exception as e:
+        logger.error(f"Batch transaction analysis failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+
+
+@router.post(
+    "/",
+    response_model=None,
+    response_class=ORJSONResponse,
+    responses={201: {"model": TransactionResponse}},
+    status_code=201
+)
 async def create_transaction(
     transaction: TransactionCreate,
-    risk_engine: RiskEngineProtocol = Depends(get_risk_engine)
-) -> TransactionResponse:
+    risk_engine: RiskEngineProtocol = Depends(get_risk_engine),
+    store: TransactionStoreProtocol = Depends(get_transaction_store)
+) -> ORJSONResponse:
     """
     Create a new transaction with risk assessment.
     
     Args:
         transaction: Transaction creation request
         risk_engine: Injected risk engine
+        store: Injected transaction store
         
     Returns:
-        TransactionResponse with risk assessment
+        Stored transaction JSON (TransactionResponse shape)
     """
     try:
-        transaction_id = str(uuid4())
+        transaction_id = generate_id()
         
-        # Convert to full Transaction model for risk assessment
-        full_transaction = Transaction(
+        # Convert to full Transaction model for risk assessment; the fields
+        # were validated as TransactionCreate, so validation is not repeated
+        full_transaction = Transaction.trusted(
             transaction_id=transaction_id,
             user_id=transaction.user_id,
             amount=transaction.amount,
@@ -137,14 +314,15 @@ async def create_transaction(
             sender_account=transaction.sender_account,
             country=transaction.country,
             merchant_type=transaction.merchant_type,
-            device_risk_score=transaction.device_risk_score
+            device_risk_score=transaction.device_risk_score,
+            timestamp=utc_now()
         )
         
         # Assess risk (async)
         risk_result = await risk_engine.assess_risk_async(full_transaction)
         
         # Store transaction
-        transactions_db[transaction_id] = {
+        record = {
             "id": transaction_id,
             "user_id": full_transaction.user_id,
             "amount": full_transaction.amount,
@@ -156,119 +334,90 @@ async def create_transaction(
             "country": full_transaction.country,
             "merchant_type": full_transaction.merchant_type,
             "device_risk_score": full_transaction.device_risk_score,
-            "timestamp": full_transaction.timestamp.isoformat(),
+            "timestamp": full_transaction.timestamp,
             "risk_score": risk_result.risk_score,
             "risk_level": risk_result.risk_level
         }
+        store.add(record)
         
         logger.info(f"Transaction {transaction_id} created with risk level: {risk_result.risk_level}")
         
-        return TransactionResponse(
-            id=transaction_id,
-            user_id=full_transaction.user_id,
-            amount=full_transaction.amount,
-            currency=full_transaction.currency,
-            transaction_type=full_transaction.transaction_type,
-            description=full_transaction.description,
-            recipient_account=full_transaction.recipient_account,
-            sender_account=full_transaction.sender_account,
-            country=full_transaction.country,
-            merchant_type=full_transaction.merchant_type,
-            device_risk_score=full_transaction.device_risk_score,
-            timestamp=full_transaction.timestamp,
-            risk_score=risk_result.risk_score,
-            risk_level=risk_result.risk_level
-        )
+        return ORJSONResponse(record, status_code=201)
         
     except Exception as e:
         logger.error(f"Transaction creation failed: {e}")
         raise HTTPException(status_code=500, detail=f"Creation failed: {str(e)}")
 
 
-@router.get("/", response_model=List[TransactionResponse])
+# Routes below return store rows as-is, like create_transaction: they are
+# built server-side from already-validated transactions, so response_model
+# validation is skipped and the schema is only kept for the OpenAPI docs.
+@router.get(
+    "/",
+    response_model=None,
+    response_class=ORJSONResponse,
+    responses={200: {"model": List[TransactionResponse]}}
+)
 async def list_transactions(
     limit: int = 100,
-    offset: int = 0
-) -> List[TransactionResponse]:
+    offset: int = 0,
+    store: TransactionStoreProtocol = Depends(get_transaction_store)
+) -> ORJSONResponse:
     """
     List all transactions with pagination.
     
     Args:
         limit: Maximum number of transactions to return
         offset: Number of transactions to skip
+        store: Injected transaction store
         
     Returns:
-        List of TransactionResponse
+        JSON list of transactions (TransactionResponse shape)
     """
-    transactions = list(transactions_db.values())
-    transactions.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
-    
-    paginated = transactions[offset:offset + limit]
-    
-    return [
-        TransactionResponse(
-            id=tx["id"],
-            user_id=tx["user_id"],
-            amount=tx["amount"],
-            currency=tx.get("currency", "USD"),
-            transaction_type=tx.get("transaction_type", "transfer"),
-            description=tx.get("description"),
-            recipient_account=tx.get("recipient_account", ""),
-            sender_account=tx.get("sender_account", ""),
-            country=tx.get("country", "India"),
-            merchant_type=tx.get("merchant_type", "retail"),
-            device_risk_score=tx.get("device_risk_score", 0.0),
-            timestamp=tx.get("timestamp"),
-            risk_score=tx.get("risk_score"),
-            risk_level=tx.get("risk_level")
-        )
-        for tx in paginated
-    ]
+    return ORJSONResponse(store.list(limit=limit, offset=offset))
 
 
-@router.get("/{transaction_id}", response_model=TransactionResponse)
-async def get_transaction(transaction_id: str) -> TransactionResponse:
+@router.get(
+    "/{transaction_id}",
+    response_model=None,
+    response_class=ORJSONResponse,
+    responses={200: {"model": TransactionResponse}}
+)
+async def get_transaction(
+    transaction_id: str,
+    store: TransactionStoreProtocol = Depends(get_transaction_store)
+) -> ORJSONResponse:
     """
     Get a specific transaction by ID.
     
     Args:
         transaction_id: Transaction ID
+        store: Injected transaction store
         
     Returns:
-        TransactionResponse
+        Transaction JSON (TransactionResponse shape)
         
     Raises:
         HTTPException: If transaction not found
     """
-    if transaction_id not in transactions_db:
+    tx = store.get(transaction_id)
+    if tx is None:
         raise HTTPException(status_code=404, detail="Transaction not found")
     
-    tx = transactions_db[transaction_id]
-    return TransactionResponse(
-        id=tx["id"],
-        user_id=tx["user_id"],
-        amount=tx["amount"],
-        currency=tx.get("currency", "USD"),
-        transaction_type=tx.get("transaction_type", "transfer"),
-        description=tx.get("description"),
-        recipient_account=tx.get("recipient_account", ""),
-        sender_account=tx.get("sender_account", ""),
-        country=tx.get("country", "India"),
-        merchant_type=tx.get("merchant_type", "retail"),
-        device_risk_score=tx.get("device_risk_score", 0.0),
-        timestamp=tx.get("timestamp"),
-        risk_score=tx.get("risk_score"),
-        risk_level=tx.get("risk_level")
-    )
+    return ORJSONResponse(tx)
 
 
 @router.delete("/{transaction_id}")
-async def delete_transaction(transaction_id: str) -> dict:
+async def delete_transaction(
+    transaction_id: str,
+    store: TransactionStoreProtocol = Depends(get_transaction_store)
+) -> dict:
     """
     Delete a transaction.
     
     Args:
         transaction_id: Transaction ID
+        store: Injected transaction store
         
     Returns:
         Success message
@@ -276,10 +425,9 @@ async def delete_transaction(transaction_id: str) -> dict:
     Raises:
         HTTPException: If transaction not found
     """
-    if transaction_id not in transactions_db:
+    if not store.delete(transaction_id):
         raise HTTPException(status_code=404, detail="Transaction not found")
     
-    del transactions_db[transaction_id]
     logger.info(f"Transaction {transaction_id} deleted")
     
     return {"message": "Transaction deleted", "id": transaction_id}
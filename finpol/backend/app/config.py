@@ -6,6 +6,9 @@ from typing import List, Optional
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+# Model name prefixes recognised as OpenAI chat models
+_KNOWN_MODEL_PREFIXES = ("gpt-", "o1", "o3")
+
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
@@ -15,13 +18,18 @@ class Settings(BaseSettings):
         env_file_encoding="utf-8",
         case_sensitive=False,
         extra="ignore",
-        protected_namespaces=("settings_",)
+        protected_namespaces=("settings_",),
+        # One instance is shared process-wide, so it must not be mutated
+        frozen=True
     )
     
     # Required configuration
     openai_api_key: str = Field(..., description="OpenAI API key for LLM")
     model_name: str = Field(default="gpt-4o", description="LLM model name")
     embedding_model: str = Field(default="text-embedding-3-small", description="Embedding model name")
+    embedding_batch_size: int = Field(default=128, ge=1, description="Texts per embedding request during ingestion")
+    embedding_max_concurrency: int = Field(default=16, ge=1, description="Concurrent embedding requests during ingestion")
+    query_embedding_cache_size: int = Field(default=10_000, ge=0, description="Query embeddings cached to skip repeat API calls (0 disables)")
     vector_db_path: str = Field(default="./data/faiss_index", description="Path to FAISS vector database")
     debug: bool = Field(default=False, description="Debug mode flag")
     
@@ -40,6 +48,40 @@ class Settings(BaseSettings):
     api_prefix: str = Field(default="/api/v1", description="API prefix")
     api_version: str = Field(default="1.0.0", description="API version")
     
+    # Regulation search cache
+    semantic_cache_size: int = Field(default=512, ge=1, description="Maximum cached regulation searches")
+    semantic_cache_ttl_seconds: int = Field(default=3600, ge=0, description="Regulation search cache TTL")
+    semantic_cache_threshold: float = Field(default=0.92, ge=0.0, le=1.0, description="Cosine similarity for a cache hit")
+    
+    # Regulation index
+    vector_index_ivf_threshold: int = Field(default=50_000, ge=1, description="Build a quantized IVF index once the corpus has this many vectors")
+    vector_index_nprobe: int = Field(default=8, ge=1, description="IVF cells searched per query")
+    faiss_omp_threads: int = Field(default=1, ge=0, description="OpenMP threads per FAISS search (0 keeps the FAISS default)")
+    retrieval_max_concurrency: Optional[int] = Field(default=None, ge=1, description="Concurrent regulation index searches (defaults to CPU count)")
+    
+    # Regulation retrieval batching
+    retrieval_batch_size: int = Field(default=32, ge=1, description="Maximum regulation queries searched together")
+    retrieval_batch_wait_ms: float = Field(default=10.0, ge=0, description="Time to wait for more queries to join a retrieval batch")
+    retrieval_cache_size: int = Field(default=4096, ge=0, description="Maximum memoized retrieval queries (0 disables)")
+    retrieval_cache_ttl_seconds: int = Field(default=300, ge=0, description="Memoized retrieval result TTL")
+    
+    # Batch analysis
+    analyze_batch_max_size: int = Field(default=1000, ge=1, description="Maximum transactions per /analyze/batch request")
+    
+    # Analyze response cache
+    response_cache_size: int = Field(default=2000, ge=1, description="Maximum cached compliance explanations")
+    response_cache_ttl_seconds: int = Field(default=600, ge=0, description="Compliance explanation cache TTL")
+    
+    # LLM batching
+    llm_batch_size: int = Field(default=8, ge=1, description="Transactions per batched compliance prompt")
+    llm_max_concurrency: int = Field(default=4, ge=1, description="Maximum concurrent LLM requests for batches")
+    llm_timeout_seconds: float = Field(default=60.0, gt=0, description="Timeout for a single batched LLM request")
+    llm_hedge_delay_seconds: Optional[float] = Field(default=None, gt=0, description="Send a backup LLM request after this delay (disabled if unset)")
+    
+    # Uploads
+    pdf_workers: Optional[int] = Field(default=None, ge=1, description="Worker processes for PDF reports (defaults to CPU count)")
+    max_upload_size_mb: int = Field(default=50, ge=1, description="Maximum bulk upload size in megabytes")
+    
     # Rate limiting
     rate_limit_per_minute: int = Field(default=60, description="Rate limit per minute")
     
@@ -62,8 +104,7 @@ class Settings(BaseSettings):
     def validate_model_name(cls, v: str) -> str:
         """Validate model name - allow any OpenAI model."""
         # Accept any model that starts with gpt- or o1
-        allowed_prefixes = ["gpt-", "o1", "o3", "gpt-4o", "gpt-4-turbo", "gpt-3.5-turbo"]
-        if any(v.startswith(prefix) for prefix in allowed_prefixes):
+        if v.startswith(_KNOWN_MODEL_PREFIXES):
             return v
         # For custom/deployed models, just return as-is
         return v
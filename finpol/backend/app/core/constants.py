@@ -1,12 +1,18 @@
-"""Application constants."""
+"""Application constants.
 
-# Risk thresholds
-RISK_THRESHOLD_HIGH = 80
-RISK_THRESHOLD_MEDIUM = 50
-RISK_THRESHOLD_LOW = 20
+Values that can be configured per deployment (risk score thresholds, API
+prefix and version) live in app.config.Settings only, not here.
+"""
 
-# Risk levels
-RISK_LEVELS = ["Low", "Medium", "High", "Critical"]
+# Risk levels (ordered by severity; use the set for membership tests)
+RISK_LEVELS_ORDER = ("Low", "Medium", "High", "Critical")
+RISK_LEVELS = frozenset(RISK_LEVELS_ORDER)
+
+# Risk codes index RISK_LEVELS_ORDER; Medium and above require review,
+# High and above require manual review
+RISK_CODE_REVIEW = RISK_LEVELS_ORDER.index("Medium")
+RISK_CODE_HIGH = RISK_LEVELS_ORDER.index("High")
+HIGH_RISK_LEVELS = frozenset(RISK_LEVELS_ORDER[RISK_CODE_HIGH:])
 
 # High risk amount threshold
 HIGH_RISK_AMOUNT_THRESHOLD = 10000
@@ -21,15 +27,11 @@ DEFAULT_TOP_K_RETRIEVAL = 5
 MAX_TRANSACTION_AMOUNT = 1000000
 MIN_TRANSACTION_AMOUNT = 0.01
 
-# API settings
-API_VERSION = "1.0.0"
-API_PREFIX = "/api/v1"
-
 # Supported currencies
-SUPPORTED_CURRENCIES = ["USD", "EUR", "GBP", "INR", "JPY"]
+SUPPORTED_CURRENCIES = frozenset({"USD", "EUR", "GBP", "INR", "JPY"})
 
 # Transaction types
-TRANSACTION_TYPES = ["transfer", "payment", "withdrawal", "deposit", "investment"]
+TRANSACTION_TYPES = frozenset({"transfer", "payment", "withdrawal", "deposit", "investment"})
 
 # Compliance regulations
-REGULATION_TYPES = ["AML", "KYC", "GDPR", "SEC", "FATF"]
+REGULATION_TYPES = frozenset({"AML", "KYC", "GDPR", "SEC", "FATF"})
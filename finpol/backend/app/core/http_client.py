@@ -0,0 +1,109 @@
+"""Shared HTTP clients for outbound API calls.
+
+This module provides:
+- Process-wide httpx clients with TCP_NODELAY on every connection
+- An async transport with one connection pool per event loop
+- OpenAI SDK clients built on those httpx clients
+"""
+import asyncio
+import socket
+import threading
+import urllib.request
+import weakref
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import httpx
+import openai
+
+# Prompts and embedding queries are small writes; don't let Nagle's
+# algorithm hold them back waiting for an ACK
+SOCKET_OPTIONS = [(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)]
+
+
+def _proxy_url() -> Optional[str]:
+    """Get the HTTPS proxy from the environment (custom transports bypass httpx's own lookup)."""
+    return urllib.request.getproxies().get("https")
+
+
+class PerLoopAsyncTransport(httpx.AsyncBaseTransport):
+    """
+    Async transport that keeps a separate connection pool per event loop.
+    
+    Pooled connections belong to the loop that opened them, so a single
+    pool breaks once that loop closes (e.g. between asyncio.run() calls in
+    scripts or ingestion). Each loop gets its own pool instead; a pool is
+    dropped along with its loop.
+    """
+    
+    def __init__(self):
+        self._transports: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+    
+    def _get_transport(self) -> httpx.AsyncHTTPTransport:
+        """Get the pool for the running event loop, creating it on first use."""
+        loop = asyncio.get_running_loop()
+        transport = self._transports.get(loop)
+        if transport is None:
+            with self._lock:
+                transport = self._transports.get(loop)
+                if transport is None:
+                    transport = httpx.AsyncHTTPTransport(proxy=_proxy_url(), socket_options=SOCKET_OPTIONS)
+                    self._transports[loop] = transport
+        return transport
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._get_transport().handle_async_request(request)
+    
+    async def aclose(self) -> None:
+        """Close the running loop's pool; pools of other loops go with their loops."""
+        transport = self._transports.pop(asyncio.get_running_loop(), None)
+        if transport is not None:
+            await transport.aclose()
+
+
+@lru_cache
+def get_http_client() -> httpx.Client:
+    """Get the shared synchronous HTTP client."""
+    return httpx.Client(transport=httpx.HTTPTransport(proxy=_proxy_url(), socket_options=SOCKET_OPTIONS))
+
+
+@lru_cache
+def get_async_transport() -> PerLoopAsyncTransport:
+    """Get the shared per-event-loop async transport."""
+    return PerLoopAsyncTransport()
+
+
+@lru_cache
+def get_async_http_client() -> httpx.AsyncClient:
+    """Get the shared asynchronous HTTP client (usable from any event loop)."""
+    return httpx.AsyncClient(transport=get_async_transport())
+
+
+async def close_loop_connections() -> None:
+    """
+    Close the running event loop's pooled connections.
+    
+    Await this before a short-lived loop (asyncio.run) finishes, so its
+    sockets are closed rather than left behind with the closed loop.
+    """
+    await get_async_transport().aclose()
+
+
+@lru_cache
+def get_openai_clients(api_key: str) -> Tuple[openai.OpenAI, openai.AsyncOpenAI]:
+    """
+    Get OpenAI clients that share the process-wide HTTP connection pools.
+    
+    Args:
+        api_key: OpenAI API key
+        
+    Returns:
+        Tuple of (sync client, async client)
+    """
+    return (
+        openai.OpenAI(api_key=api_key, http_client=get_http_client()),
+        openai.AsyncOpenAI(api_key=api_key, http_client=get_async_http_client()),
+    )
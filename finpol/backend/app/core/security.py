@@ -1,17 +1,49 @@
 """Security utilities for the application."""
 from typing import Optional
 import hashlib
+import hmac
 import secrets
 
+# scrypt cost parameters (n=2**14, r=8, p=1: ~16 MB and tens of ms per hash)
+_SCRYPT_N = 2 ** 14
+_SCRYPT_R = 8
+_SCRYPT_P = 1
+_SCRYPT_PREFIX = "scrypt"
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    """Derive a 32-byte key from a password with scrypt."""
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=64 * 1024 * 1024, dklen=32)
+
 
 def hash_password(password: str) -> str:
-    """Hash a password using SHA-256."""
-    return hashlib.sha256(password.encode()).hexdigest()
+    """
+    Hash a password with salted scrypt.
+
+    Returns:
+        Encoded hash of the form scrypt$n$r$p$salt$key (hex salt and key)
+    """
+    salt = secrets.token_bytes(16)
+    key = _scrypt(password, salt, _SCRYPT_N, _SCRYPT_R, _SCRYPT_P)
+    return f"{_SCRYPT_PREFIX}${_SCRYPT_N}${_SCRYPT_R}${_SCRYPT_P}${salt.hex()}${key.hex()}"
 
 
 def verify_password(password: str, hashed: str) -> bool:
-    """Verify password against hash."""
-    return hash_password(password) == hashed
+    """Verify password against hash, in constant time."""
+    parts = hashed.split("$")
+    if len(parts) == 6 and parts[0] == _SCRYPT_PREFIX:
+        # Malformed stored hashes (bad hex, n not a power of 2, parameters
+        # over maxmem or out of range) fail verification instead of raising
+        try:
+            n, r, p = (int(value) for value in parts[1:4])
+            salt, expected = bytes.fromhex(parts[4]), bytes.fromhex(parts[5])
+            key = _scrypt(password, salt, n, r, p)
+        except (ValueError, OverflowError, TypeError):
+            return False
+        return hmac.compare_digest(key, expected)
+
+    # Legacy unsalted SHA-256 hex digests
+    return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), hashed)
 
 
 def generate_api_key() -> str:
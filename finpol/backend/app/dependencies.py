@@ -6,11 +6,12 @@ This module provides FastAPI dependency injection with:
 - Service abstraction for ML model integration
 - Factory pattern for scalability
 """
-from typing import Protocol, Generator, Optional, AsyncGenerator
-from functools import lru_cache
+from typing import Iterable, Protocol, Optional
+from concurrent.futures import Executor
 import logging
+import threading
 
-from app.config import settings
+from app.config import get_settings, settings  # get_settings re-exported for legacy imports
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +26,7 @@ class RiskEngineProtocol(Protocol):
     
     def evaluate(self, transaction: "Transaction") -> dict: ...
     def assess_risk(self, transaction: "Transaction") -> "RiskResult": ...
+    def assess_transactions(self, transactions: list["Transaction"]) -> "DataFrame": ...
 
 
 class RegulationRetrieverProtocol(Protocol):
@@ -32,24 +34,66 @@ class RegulationRetrieverProtocol(Protocol):
     
     async def retrieve(self, query: str) -> list[str]: ...
     async def search_regulations(self, query: str, top_k: int = 3) -> list[dict]: ...
+    async def get_all_regulations(self) -> list[dict]: ...
 
 
 class ComplianceGeneratorProtocol(Protocol):
     """Protocol for Compliance Generator service."""
     
-    async def generate(
+    async def generate_async(
         self,
         transaction: "Transaction",
         reasons: list[str],
         regulations: list[str]
     ) -> str: ...
+    async def generate_batch_async(
+        self,
+        transactions: list["Transaction"],
+        reasons_list: list[list[str]],
+        regulations: list[str]
+    ) -> list[Optional[str]]: ...
+
+
+class TransactionStoreProtocol(Protocol):
+    """Protocol for Transaction Store."""
+    
+    def add(self, record: dict) -> None: ...
+    def get(self, transaction_id: str) -> Optional[dict]: ...
+    def delete(self, transaction_id: str) -> bool: ...
+    def list(self, limit: int = 100, offset: int = 0) -> list[dict]: ...
+
+
+class RetrievalBatcherProtocol(Protocol):
+    """Protocol for the regulation Retrieval Batcher."""
+    
+    async def submit(self, query: str, top_k: int = 3) -> list[str]: ...
+
+
+class SemanticCacheProtocol(Protocol):
+    """Protocol for the regulation search Semantic Cache."""
+    
+    async def get_or_search(self, query: str, retriever: "RegulationRetrieverProtocol", top_k: int = 3) -> bytes: ...
+
+
+class ResponseCacheProtocol(Protocol):
+    """Protocol for the compliance explanation Response Cache."""
+    
+    def get(self, key: str, risk_level: str, factors: Iterable[str] = ()) -> Optional[str]: ...
+    def contains(self, key: str) -> bool: ...
+    def put(self, key: str, risk_level: str, explanation: str, factors: Iterable[str] = ()) -> None: ...
 
 
 class VectorStoreManagerProtocol(Protocol):
     """Protocol for Vector Store Manager."""
     
     def load_vectorstore(self) -> any: ...
-    def save_vectorstore(self, texts: list[str], metadatas: Optional[list[dict]] = None) -> any: ...
+    def save_vectorstore(
+        self,
+        texts: list[str],
+        metadatas: Optional[list[dict]] = None,
+        vectors: Optional["ndarray"] = None,
+        rebuild: bool = False
+    ) -> any: ...
 
 
 # ============================================================
@@ -66,97 +110,259 @@ class ServiceFactory:
     """
     
     _instances: dict = {}
+    # Guards first-time creation; getters may run concurrently in worker
+    # threads, and one getter may call another (hence reentrant)
+    _lock = threading.RLock()
     
     @classmethod
     def get_risk_engine(cls) -> "RiskEngineProtocol":
         """Get or create Risk Engine instance."""
         if "risk_engine" not in cls._instances:
-            from app.services.risk_engine import RiskEngine
-            cls._instances["risk_engine"] = RiskEngine()
-            logger.info("RiskEngine instance created")
+            with cls._lock:
+                if "risk_engine" not in cls._instances:
+                    from app.services.risk_engine import RiskEngine
+                    cls._instances["risk_engine"] = RiskEngine()
+                    logger.info("RiskEngine instance created")
         return cls._instances["risk_engine"]
     
     @classmethod
     def get_regulation_retriever(cls) -> "RegulationRetrieverProtocol":
         """Get or create Regulation Retriever instance."""
         if "regulation_retriever" not in cls._instances:
-            from app.services.regulation_retriever import RegulationRetriever
-            cls._instances["regulation_retriever"] = RegulationRetriever(
-                index_path=settings.vector_db_path
-            )
-            logger.info("RegulationRetriever instance created")
+            with cls._lock:
+                if "regulation_retriever" not in cls._instances:
+                    from app.services.regulation_retriever import RegulationRetriever
+                    cls._instances["regulation_retriever"] = RegulationRetriever(
+                        index_path=settings.vector_db_path,
+                        max_concurrent_searches=settings.retrieval_max_concurrency,
+                        query_cache_size=settings.query_embedding_cache_size
+                    )
+                    logger.info("RegulationRetriever instance created")
         return cls._instances["regulation_retriever"]
     
     @classmethod
     def get_compliance_generator(cls) -> "ComplianceGeneratorProtocol":
         """Get or create Compliance Generator instance."""
         if "compliance_generator" not in cls._instances:
-            from app.services.compliance_generator import ComplianceGenerator
-            cls._instances["compliance_generator"] = ComplianceGenerator()
-            logger.info("ComplianceGenerator instance created")
+            with cls._lock:
+                if "compliance_generator" not in cls._instances:
+                    from app.services.compliance_generator import ComplianceGenerator
+                    cls._instances["compliance_generator"] = ComplianceGenerator()
+                    logger.info("ComplianceGenerator instance created")
         return cls._instances["compliance_generator"]
     
+    @classmethod
+    def get_transaction_store(cls) -> TransactionStoreProtocol:
+        """Get or create Transaction Store instance."""
+        if "transaction_store" not in cls._instances:
+            with cls._lock:
+                if "transaction_store" not in cls._instances:
+                    from app.services.transaction_store import (
+                        SQLiteTransactionStore,
+                        TransactionStore,
+                        sqlite_path_from_url,
+                    )
+                    path = sqlite_path_from_url(settings.database_url) if settings.database_url else None
+                    if path is not None:
+                        cls._instances["transaction_store"] = SQLiteTransactionStore(path)
+                        logger.info("SQLiteTransactionStore instance created")
+                    else:
+                        if settings.database_url:
+                            logger.warning("Unsupported DATABASE_URL scheme; using in-memory transaction store")
+                        cls._instances["transaction_store"] = TransactionStore()
+                        logger.info("TransactionStore instance created")
+        return cls._instances["transaction_store"]
+    
+    @classmethod
+    def get_retrieval_batcher(cls) -> RetrievalBatcherProtocol:
+        """Get or create Retrieval Batcher instance."""
+        if "retrieval_batcher" not in cls._instances:
+            with cls._lock:
+                if "retrieval_batcher" not in cls._instances:
+                    from app.services.retrieval_batcher import RetrievalBatcher
+                    cls._instances["retrieval_batcher"] = RetrievalBatcher(
+                        cls.get_regulation_retriever(),
+                        max_batch_size=settings.retrieval_batch_size,
+                        max_wait_seconds=settings.retrieval_batch_wait_ms / 1000,
+                        cache_size=settings.retrieval_cache_size,
+                        cache_ttl_seconds=settings.retrieval_cache_ttl_seconds
+                    )
+                    logger.info("RetrievalBatcher instance created")
+        return cls._instances["retrieval_batcher"]
+    
+    @classmethod
+    def get_semantic_cache(cls) -> SemanticCacheProtocol:
+        """Get or create Semantic Cache instance."""
+        if "semantic_cache" not in cls._instances:
+            with cls._lock:
+                if "semantic_cache" not in cls._instances:
+                    from app.services.semantic_cache import SemanticCache
+                    cls._instances["semantic_cache"] = SemanticCache(
+                        max_entries=settings.semantic_cache_size,
+                        ttl_seconds=settings.semantic_cache_ttl_seconds,
+                        similarity_threshold=settings.semantic_cache_threshold
+                    )
+                    logger.info("SemanticCache instance created")
+        return cls._instances["semantic_cache"]
+    
+    @classmethod
+    def get_response_cache(cls) -> ResponseCacheProtocol:
+        """Get or create Response Cache instance."""
+        if "response_cache" not in cls._instances:
+            with cls._lock:
+                if "response_cache" not in cls._instances:
+                    from app.services.response_cache import ResponseCache
+                    cls._instances["response_cache"] = ResponseCache(
+                        max_entries=settings.response_cache_size,
+                        ttl_seconds=settings.response_cache_ttl_seconds
+                    )
+                    logger.info("ResponseCache instance created")
+        return cls._instances["response_cache"]
+    
     @classmethod
     def get_vectorstore_manager(cls) -> VectorStoreManagerProtocol:
         """Get or create Vector Store Manager instance."""
         if "vectorstore_manager" not in cls._instances:
-            from app.rag.vectorstore import VectorStoreManager
-            cls._instances["vectorstore_manager"] = VectorStoreManager(
-                vector_db_path=settings.vector_db_path
-            )
-            logger.info("VectorStoreManager instance created")
+            with cls._lock:
+                if "vectorstore_manager" not in cls._instances:
+                    from app.rag.vectorstore import VectorStoreManager
+                    cls._instances["vectorstore_manager"] = VectorStoreManager(
+                        vector_db_path=settings.vector_db_path
+                    )
+                    logger.info("VectorStoreManager instance created")
         return cls._instances["vectorstore_manager"]
     
+    @classmethod
+    def get_pdf_executor(cls) -> Executor:
+        """Get or create the process pool used for PDF report rendering."""
+        if "pdf_executor" not in cls._instances:
+            with cls._lock:
+                if "pdf_executor" not in cls._instances:
+                    import multiprocessing
+                    from concurrent.futures import ProcessPoolExecutor
+                    # Spawn rather than fork: the server process runs threads
+                    cls._instances["pdf_executor"] = ProcessPoolExecutor(
+                        max_workers=settings.pdf_workers,
+                        mp_context=multiprocessing.get_context("spawn")
+                    )
+                    logger.info("PDF process pool created")
+        return cls._instances["pdf_executor"]
+    
+    @classmethod
+    async def warm_up(cls) -> None:
+        """
+        Create request-path services ahead of the first request.
+        
+        Also loads the regulation vectorstore, so the first analysis does
+        not pay the index load.
+        """
+        cls.get_risk_engine()
+        cls.get_compliance_generator()
+        cls.get_transaction_store()
+        cls.get_semantic_cache()
+        cls.get_response_cache()
+        cls.get_retrieval_batcher()
+        await cls.get_regulation_retriever().initialize()
+        logger.info("Service instances warmed up")
+    
     @classmethod
     def clear_instances(cls) -> None:
         """Clear all cached instances (useful for testing)."""
-        cls._instances.clear()
+        with cls._lock:
+            for instance in cls._instances.values():
+                if isinstance(instance, Executor):
+                    instance.shutdown(wait=False, cancel_futures=True)
+                elif hasattr(instance, "close"):
+                    instance.close()
+            cls._instances.clear()
         logger.info("Service factory instances cleared")
 
 
 # ============================================================
 # FastAPI Dependency Injection Functions
 # ============================================================
+# Plain async functions: FastAPI calls them inline on the event loop,
+# without the threadpool hop and exit-stack setup of sync generators.
 
 
-def get_risk_engine() -> Generator[RiskEngineProtocol, None, None]:
+async def get_risk_engine() -> RiskEngineProtocol:
     """
     FastAPI dependency for Risk Engine.
     
-    Yields:
+    Returns:
         RiskEngine instance
     """
-    yield ServiceFactory.get_risk_engine()
+    return ServiceFactory.get_risk_engine()
 
 
-def get_regulation_retriever() -> Generator[RegulationRetrieverProtocol, None, None]:
+async def get_regulation_retriever() -> RegulationRetrieverProtocol:
     """
     FastAPI dependency for Regulation Retriever.
     
-    Yields:
+    Returns:
         RegulationRetriever instance
     """
-    yield ServiceFactory.get_regulation_retriever()
+    return ServiceFactory.get_regulation_retriever()
 
 
-def get_compliance_generator() -> Generator[ComplianceGeneratorProtocol, None, None]:
+async def get_compliance_generator() -> ComplianceGeneratorProtocol:
     """
     FastAPI dependency for Compliance Generator.
     
-    Yields:
+    Returns:
         ComplianceGenerator instance
     """
-    yield ServiceFactory.get_compliance_generator()
+    return ServiceFactory.get_compliance_generator()
+
+
+async def get_transaction_store() -> TransactionStoreProtocol:
+    """
+    FastAPI dependency for Transaction Store.
+    
+    Returns:
+        TransactionStore instance
+    """
+    return ServiceFactory.get_transaction_store()
+
+
+async def get_retrieval_batcher() -> RetrievalBatcherProtocol:
+    """
+    FastAPI dependency for the regulation Retrieval Batcher.
+    
+    Returns:
+        RetrievalBatcher instance
+    """
+    return ServiceFactory.get_retrieval_batcher()
 
 
-def get_vectorstore_manager() -> Generator[VectorStoreManagerProtocol, None, None]:
+async def get_semantic_cache() -> SemanticCacheProtocol:
+    """
+    FastAPI dependency for the regulation search Semantic Cache.
+    
+    Returns:
+        SemanticCache instance
+    """
+    return ServiceFactory.get_semantic_cache()
+
+
+async def get_response_cache() -> ResponseCacheProtocol:
+    """
+    FastAPI dependency for the compliance explanation Response Cache.
+    
+    Returns:
+        ResponseCache instance
+    """
+    return ServiceFactory.get_response_cache()
+
+
+async def get_vectorstore_manager() -> VectorStoreManagerProtocol:
     """
     FastAPI dependency for Vector Store Manager.
     
-    Yields:
+    Returns:
         VectorStoreManager instance
     """
-    yield ServiceFactory.get_vectorstore_manager()
+    return ServiceFactory.get_vectorstore_manager()
 
 
 # ============================================================
@@ -164,12 +370,6 @@ def get_vectorstore_manager() -> Generator[VectorStoreManagerProtocol, None, Non
 # ============================================================
 
 
-@lru_cache
-def get_settings() -> settings.__class__:
-    """Get settings instance (legacy compatibility)."""
-    return settings
-
-
 # Keep for backward compatibility
 risk_engine = ServiceFactory.get_risk_engine
 regulation_retriever = ServiceFactory.get_regulation_retriever
@@ -18,7 +18,7 @@ warnings.filterwarnings("ignore", message="distutils Version classes are depreca
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.openapi.utils import get_openapi
 
 from app.config import settings
@@ -27,6 +27,10 @@ from app.utils.logger import setup_logger, get_logger
 
 # Setup logger
 logger = setup_logger()
+access_logger = get_logger("app.access")
+
+# Paths left out of the access log
+EXCLUDED_PATHS = frozenset({"/docs", "/redoc", "/openapi.json"})
 
 
 @asynccontextmanager
@@ -45,9 +49,16 @@ async def lifespan(app: FastAPI):
     
     # Startup tasks
     try:
-        # Initialize services lazily via dependency injection
-        # This avoids loading ML models at startup
-        logger.info("Services ready for lazy initialization via DI")
+        # Create singletons and load the vectorstore now rather than on
+        # the first request
+        from app.dependencies import ServiceFactory
+        from app.rag.vectorstore import configure_faiss_threads
+        configure_faiss_threads(settings.faiss_omp_threads)
+        try:
+            await ServiceFactory.warm_up()
+        except Exception as e:
+            # Services still initialize lazily on first use
+            logger.warning(f"Service warm-up failed: {e}")
         
         if settings.debug:
             logger.warning("Debug mode enabled - do not use in production")
@@ -76,6 +87,7 @@ app = FastAPI(
     version=settings.api_version,
     description="FinPol - AI-Powered Fintech Compliance Monitoring System",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs" if settings.debug else None,
     redoc_url="/redoc" if settings.debug else None,
     openapi_url="/openapi.json" if settings.debug else None,
@@ -86,33 +98,25 @@ app = FastAPI(
 # Middleware Configuration
 # ============================================================
 
-# Request ID middleware
+# Request ID and logging middleware (one layer, so one call_next per request)
 @app.middleware("http")
-async def add_request_id(request: Request, call_next):
-    """Add request ID to each request for tracing."""
-    request_id = request.headers.get("X-Request-ID", str(uuid4()))
+async def request_middleware(request: Request, call_next):
+    """Add a request ID for tracing and log the request and response."""
+    # Only mint an ID when the client did not send one
+    request_id = request.headers.get("X-Request-ID") or uuid4().hex
     request.state.request_id = request_id
     
-    response = await call_next(request)
-    response.headers["X-Request-ID"] = request_id
-    
-    return response
-
-
-# Request logging middleware
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Log incoming requests with timing."""
-    logger = get_logger(__name__)
-    
-    # Skip logging for docs endpoints
-    if request.url.path not in ["/docs", "/redoc", "/openapi.json"]:
-        logger.info(f"Request: {request.method} {request.url.path}")
+    # Skip logging for docs endpoints, and skip formatting when INFO is off
+    path = request.url.path
+    log_access = path not in EXCLUDED_PATHS and access_logger.isEnabledFor(logging.INFO)
+    if log_access:
+        access_logger.info("Request: %s %s", request.method, path)
     
     response = await call_next(request)
+    response.headers["X-Request-ID"] = request_id
     
-    if request.url.path not in ["/docs", "/redoc", "/openapi.json"]:
-        logger.info(f"Response: {response.status_code}")
+    if log_access:
+        access_logger.info("Response: %s", response.status_code)
     
     return response
 
@@ -131,10 +135,9 @@ app.add_middleware(
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Handle unhandled exceptions."""
-    logger = get_logger(__name__)
-    logger.error(f"Unhandled exception: {exc}", exc_info=True)
+    logger.error("Unhandled exception: %s", exc, exc_info=True)
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "detail": "Internal server error",
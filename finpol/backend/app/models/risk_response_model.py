@@ -15,6 +15,7 @@ class RiskResult(BaseModel):
     """Risk assessment result."""
     risk_score: int
     risk_level: str
+    risk_code: int = 0  # Severity rank of risk_level (0 = Low)
     factors: List[str] = []
     recommendations: List[str] = []
 
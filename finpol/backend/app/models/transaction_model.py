@@ -4,13 +4,21 @@ This module provides:
 - Transaction model for API requests/responses
 - Transaction creation model
 - Transaction type enumeration
+- Lightweight TxnCore record for internal risk passes
 - Proper validation and typing
+
+Models validate once at the API boundary; unknown fields are ignored and
+assignments are not re-validated. Code holding already-validated data
+builds instances with Transaction.trusted() instead.
 """
+from dataclasses import MISSING, dataclass, fields
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Any, Mapping, Optional
 from datetime import datetime
 from enum import Enum
 
+from app.utils.helpers import generate_id, utc_now
+
 
 class TransactionType(str, Enum):
     """Transaction type enumeration."""
@@ -20,6 +28,40 @@ class TransactionType(str, Enum):
     DEPOSIT = "deposit"
 
 
+@dataclass(slots=True, frozen=True)
+class TxnCore:
+    """
+    Slotted, immutable view of the transaction fields risk rules read.
+    
+    Used for internal passes over many already-validated transactions,
+    where a full Pydantic model per row is too heavy.
+    """
+    
+    amount: float
+    device_risk_score: float
+    user_id: str
+    timestamp: datetime
+    country: str = "India"
+    merchant_type: str = "retail"
+    
+    @classmethod
+    def from_record(cls, record: Mapping[str, Any]) -> "TxnCore":
+        """
+        Build from a mapping (e.g. a DataFrame record), ignoring unknown keys.
+        
+        Raises:
+            ValueError: If a field without a Transaction default is missing
+        """
+        missing = [name for name in _TXN_CORE_REQUIRED if name not in record]
+        if missing:
+            raise ValueError(f"Transaction record is missing fields: {', '.join(missing)}")
+        return cls(**{name: record[name] for name in _TXN_CORE_FIELDS if name in record})
+
+
+_TXN_CORE_FIELDS = tuple(field.name for field in fields(TxnCore))
+_TXN_CORE_REQUIRED = tuple(field.name for field in fields(TxnCore) if field.default is MISSING)
+
+
 class Transaction(BaseModel):
     """
     Transaction model with validation.
@@ -27,14 +69,14 @@ class Transaction(BaseModel):
     Used for transaction analysis and risk assessment.
     """
     
-    transaction_id: str = Field(default_factory=lambda: "TXN-" + str(datetime.now().timestamp()))
+    transaction_id: str = Field(default_factory=lambda: "TXN-" + generate_id())
     user_id: str = Field(..., min_length=1, description="User identifier")
     amount: float = Field(..., gt=0, description="Transaction amount")
     currency: str = Field(default="USD", description="Currency code")
     country: str = Field(default="India", description="Country code")
     merchant_type: str = Field(default="retail", description="Merchant category")
     device_risk_score: float = Field(..., ge=0.0, le=1.0, description="Device risk score")
-    timestamp: datetime = Field(default_factory=datetime.now, description="Transaction timestamp")
+    timestamp: datetime = Field(default_factory=utc_now, description="Transaction timestamp")
     
     # Additional fields
     transaction_type: Optional[TransactionType] = Field(default=TransactionType.TRANSFER, description="Transaction type")
@@ -43,6 +85,8 @@ class Transaction(BaseModel):
     sender_account: Optional[str] = Field(default=None, description="Sender account")
     
     model_config = {
+        "extra": "ignore",
+        "validate_assignment": False,
         "json_schema_extra": {
             "example": {
                 "transaction_id": "TXN-123456",
@@ -56,6 +100,27 @@ class Transaction(BaseModel):
             }
         }
     }
+    
+    @classmethod
+    def trusted(cls, **fields) -> "Transaction":
+        """
+        Build a Transaction from already-validated data without re-validating.
+        
+        For internal paths only (stored rows, frames built from validated
+        transactions); external input must go through Transaction(**data).
+        """
+        return cls.model_construct(**fields)
+    
+    def to_core(self) -> TxnCore:
+        """Copy the fields risk rules read into a TxnCore."""
+        return TxnCore(
+            amount=self.amount,
+            country=self.country,
+            merchant_type=self.merchant_type,
+            device_risk_score=self.device_risk_score,
+            user_id=self.user_id,
+            timestamp=self.timestamp
+        )
 
 
 class TransactionCreate(BaseModel):
@@ -75,6 +140,8 @@ class TransactionCreate(BaseModel):
     device_risk_score: float = Field(default=0.0, ge=0.0, le=1.0, description="Device risk score")
     
     model_config = {
+        "extra": "ignore",
+        "validate_assignment": False,
         "json_schema_extra": {
             "example": {
                 "user_id": "user-123",
@@ -108,12 +175,15 @@ class TransactionResponse(BaseModel):
     country: str = Field(default="India", description="Country")
     merchant_type: str = Field(default="retail", description="Merchant category")
     device_risk_score: float = Field(default=0.0, description="Device risk score")
-    timestamp: datetime = Field(default_factory=datetime.now, description="Timestamp")
+    timestamp: datetime = Field(default_factory=utc_now, description="Timestamp")
     
     # Risk assessment fields
     risk_score: Optional[int] = Field(default=None, description="Risk score (0-100)")
     risk_level: Optional[str] = Field(default=None, description="Risk level")
     
+    # Describes a stored transaction, so instances are read-only
     model_config = {
-        "from_attributes": True
+        "from_attributes": True,
+        "frozen": True,
+        "extra": "ignore"
     }
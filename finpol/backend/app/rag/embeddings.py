@@ -1,10 +1,22 @@
 """Embeddings module for RAG system."""
-from typing import List, Protocol, Any
+from collections import OrderedDict
+from functools import lru_cache
+from hashlib import blake2b
+from typing import List, Optional, Protocol, Any
+import asyncio
 import numpy as np
 import logging
+import re
+
+from langchain_openai import OpenAIEmbeddings
+
+from app.config import settings
+from app.core.http_client import get_openai_clients
 
 logger = logging.getLogger(__name__)
 
+_WHITESPACE = re.compile(r"\s+")
+
 
 class EmbeddingsProvider(Protocol):
     """Protocol for embeddings providers."""
@@ -18,6 +30,7 @@ class EmbeddingsProvider(Protocol):
         ...
 
 
+@lru_cache(maxsize=1)
 def get_embeddings_model() -> Any:
     """
     Get embeddings model instance.
@@ -25,29 +38,151 @@ def get_embeddings_model() -> Any:
     Uses OpenAIEmbeddings from LangChain with OPENAI_API_KEY from config.
     Modular structure for easy provider switching in the future.
     
+    The model is built once per process (settings are immutable) and shared
+    by retrieval and ingestion; call get_embeddings_model.cache_clear() to
+    rebuild it.
+    
     Returns:
         OpenAIEmbeddings instance
     """
-    from langchain_openai import OpenAIEmbeddings
-    from app.config import settings
-    
+    client, async_client = get_openai_clients(settings.openai_api_key)
     return OpenAIEmbeddings(
         model=settings.embedding_model,
-        openai_api_key=settings.openai_api_key
+        openai_api_key=settings.openai_api_key,
+        client=client.embeddings,
+        async_client=async_client.embeddings
     )
 
 
+class QueryEmbeddingCache:
+    """
+    LRU cache of query embeddings.
+    
+    Keys are a 16-byte hash of the query with case and whitespace
+    normalized, so trivial variants share an entry and long queries do not
+    bloat the key set. Embeddings depend only on the model, not on the
+    index, so entries stay valid across index rebuilds.
+    """
+    
+    def __init__(self, max_entries: int = 10_000):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_entries: Maximum number of cached embeddings (0 disables caching)
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def key(query: str) -> bytes:
+        """Hash a query after normalizing case and whitespace."""
+        normalized = _WHITESPACE.sub(" ", query).strip().lower()
+        return blake2b(normalized.encode(), digest_size=16).digest()
+    
+    def get(self, query: str) -> Optional[Any]:
+        """Get the cached embedding for a query, or None."""
+        key = self.key(query)
+        embedding = self._entries.get(key)
+        if embedding is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return embedding
+    
+    def put(self, query: str, embedding: Any) -> None:
+        """Store a query embedding, evicting the least recently used if full."""
+        if self.max_entries <= 0 or embedding is None:
+            return
+        key = self.key(query)
+        self._entries[key] = embedding
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def get_stats(self) -> dict:
+        """Get cache statistics."""
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+async def aembed_in_batches(
+    embeddings_model: Any,
+    texts: List[str],
+    batch_size: int = 128,
+    concurrency: int = 16
+) -> np.ndarray:
+    """
+    Embed texts with several batched requests in flight at once.
+    
+    The LangChain model sends its own batches one after another; for large
+    ingests the wall time is then the sum of every round trip. Here the
+    texts are split into batch_size chunks and up to `concurrency` chunks
+    are embedded concurrently.
+    
+    Each batch is copied into a float32 matrix as soon as it arrives, so
+    at most `concurrency` batches exist as Python float lists at a time
+    (about 8x the size of their float32 rows).
+    
+    Args:
+        embeddings_model: Model with an async aembed_documents method
+        texts: Texts to embed
+        batch_size: Texts per request
+        concurrency: Maximum requests in flight
+        
+    Returns:
+        Float32 matrix with one embedding row per text, in input order
+    """
+    slots = asyncio.Semaphore(concurrency)
+    out: Optional[np.ndarray] = None
+    
+    async def embed_batch(start: int) -> None:
+        nonlocal out
+        async with slots:
+            vectors = await embeddings_model.aembed_documents(texts[start:start + batch_size])
+        if out is None:
+            # The model's dimension is known once the first batch returns
+            out = np.empty((len(texts), len(vectors[0])), dtype=np.float32)
+        out[start:start + len(vectors)] = vectors
+    
+    starts = range(0, len(texts), batch_size)
+    await asyncio.gather(*(embed_batch(start) for start in starts))
+    logger.info("Embedded %d texts in %d requests", len(texts), len(starts))
+    return out if out is not None else np.empty((0, 0), dtype=np.float32)
+
+
+# Output dimension of OpenAI text-embedding-3-small and ada-002
+EMBEDDING_DIMENSION = 1536
+
+
 class Embeddings:
     """Text embeddings for semantic search."""
     
-    def __init__(self, model_name: str = "text-embedding-3-small"):
+    def __init__(
+        self,
+        model_name: str = "text-embedding-3-small",
+        client: Optional[Any] = None,
+        batch_size: int = 128,
+        dimension: int = EMBEDDING_DIMENSION,
+        query_cache_size: int = 10_000
+    ):
         """
         Initialize embeddings model.
         
         Args:
             model_name: Name of embedding model
+            client: OpenAI client; without one, zero vectors are returned (stub mode)
+            batch_size: Documents sent per embeddings request
+            dimension: Embedding dimension of the model
+            query_cache_size: Query embeddings kept by embed_query
         """
         self.model_name = model_name
+        self.client = client
+        self.batch_size = batch_size
+        self.dimension = dimension
+        self._query_cache = QueryEmbeddingCache(query_cache_size)
     
     def embed_text(self, text: str) -> np.ndarray:
         """
@@ -59,28 +194,38 @@ class Embeddings:
         Returns:
             Embedding vector
         """
-        # Placeholder - in production use OpenAI embeddings
-        # For now, return random vector
-        dimension = 1536  # OpenAI ada-002 dimension
-        return np.random.randn(dimension)
+        return self.embed_documents([text])[0]
     
     def embed_documents(self, documents: List[str]) -> np.ndarray:
         """
         Generate embeddings for multiple documents.
         
+        Documents are sent batch_size at a time, so K documents cost
+        ceil(K / batch_size) round trips rather than K.
+        
         Args:
             documents: List of documents
             
         Returns:
-            Numpy array of embeddings
+            Numpy array of embeddings, one float32 row per document
         """
-        embeddings = []
-        for doc in documents:
-            embedding = self.embed_text(doc)
-            embeddings.append(embedding)
+        if self.client is None or not documents:
+            return np.zeros((len(documents), self.dimension), dtype=np.float32)
+        
+        # Each batch is written straight into its rows of one preallocated
+        # array, rather than stacking per-batch arrays at the end
+        out = np.empty((len(documents), self.dimension), dtype=np.float32)
+        requests = 0
+        for start in range(0, len(documents), self.batch_size):
+            response = self.client.embeddings.create(
+                model=self.model_name,
+                input=documents[start:start + self.batch_size]
+            )
+            out[start:start + len(response.data)] = [item.embedding for item in response.data]
+            requests += 1
         
-        logger.info(f"Generated embeddings for {len(documents)} documents")
-        return np.array(embeddings)
+        logger.info("Generated embeddings for %d documents in %d requests", len(documents), requests)
+        return out
     
     def embed_query(self, query: str) -> np.ndarray:
         """
@@ -92,4 +237,9 @@ class Embeddings:
         Returns:
             Query embedding
         """
-        return self.embed_text(query)
+        embedding = self._query_cache.get(query)
+        if embedding is None:
+            embedding = self.embed_text(query)
+            self._query_cache.put(query, embedding)
+        # Callers get their own copy, so the cached vector cannot be modified
+        return embedding.copy()
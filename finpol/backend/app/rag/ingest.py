@@ -1,7 +1,13 @@
 """RAG Ingestion module for document processing."""
+import asyncio
 import os
 import logging
-from typing import List
+import queue
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from hashlib import blake2b
+from logging.handlers import QueueHandler, QueueListener
+from typing import Awaitable, List, Optional, Tuple
 import sys
 
 # Add parent directory to path for imports
@@ -10,45 +16,90 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspa
 from langchain_community.document_loaders import PyPDFLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 
-from app.rag.embeddings import get_embeddings_model
+from app.config import settings
+from app.core.http_client import close_loop_connections
+from app.rag.embeddings import aembed_in_batches, get_embeddings_model
 from app.rag.vectorstore import VectorStoreManager
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger(__name__)
 
 
-def load_pdfs(directory: str) -> List:
+def _configure_logging() -> QueueListener:
+    """
+    Route log records through a queue so console writes happen on a
+    listener thread instead of blocking ingestion.
+    
+    Returns:
+        The started listener; stop it to flush pending records
+    """
+    log_queue = queue.SimpleQueue()
+    # The queue handler formats each record before enqueueing it, so the
+    # console handler only writes the finished line
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        handlers=[QueueHandler(log_queue)],
+        force=True
+    )
+    
+    listener = QueueListener(log_queue, logging.StreamHandler())
+    listener.start()
+    return listener
+
+
+def _load_one_pdf(filepath: str) -> List:
+    """Load the pages of one PDF (runs in a worker process)."""
+    return PyPDFLoader(filepath).load()
+
+
+def load_pdfs(directory: str, max_workers: Optional[int] = None) -> List:
     """
     Load all PDFs from a directory.
     
+    PDF parsing is CPU-bound, so files are parsed in parallel worker
+    processes. Pages are returned grouped by file, in directory order.
+    
     Args:
         directory: Path to directory containing PDFs
+        max_workers: Worker processes (defaults to CPU count)
         
     Returns:
         List of loaded documents
     """
-    documents = []
-    
     if not os.path.exists(directory):
-        logger.warning(f"Directory does not exist: {directory}")
-        return documents
-    
-    for filename in os.listdir(directory):
-        if filename.lower().endswith(".pdf"):
-            filepath = os.path.join(directory, filename)
-            logger.info(f"Loading PDF: {filename}")
+        logger.warning("Directory does not exist: %s", directory)
+        return []
+    
+    filenames = [filename for filename in os.listdir(directory) if filename.lower().endswith(".pdf")]
+    if not filenames:
+        return []
+    
+    pages = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(_load_one_pdf, os.path.join(directory, filename)): filename
+            for filename in filenames
+        }
+        for future in as_completed(futures):
+            filename = futures[future]
             try:
-                loader = PyPDFLoader(filepath)
-                docs = loader.load()
-                documents.extend(docs)
-                logger.info(f"Loaded {len(docs)} pages from {filename}")
+                pages[filename] = future.result()
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("Loaded %d pages from %s", len(pages[filename]), filename)
             except Exception as e:
-                logger.error(f"Failed to load {filename}: {e}")
+                logger.error("Failed to load %s: %s", filename, e)
     
-    return documents
+    return [doc for filename in filenames for doc in pages.get(filename, ())]
+
+
+@lru_cache(maxsize=8)
+def _get_splitter(chunk_size: int, chunk_overlap: int) -> RecursiveCharacterTextSplitter:
+    """Build a splitter once per chunk configuration (splitters hold no per-call state)."""
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        separators=["\n\n", "\n", " ", ""]
+    )
 
 
 def split_documents(documents: List, chunk_size: int = 1000, chunk_overlap: int = 200) -> List:
@@ -63,32 +114,82 @@ def split_documents(documents: List, chunk_size: int = 1000, chunk_overlap: int
     Returns:
         List of split documents
     """
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=chunk_size,
-        chunk_overlap=chunk_overlap,
-        separators=["\n\n", "\n", " ", ""]
-    )
-    
-    splits = splitter.split_documents(documents)
-    logger.info(f"Split {len(documents)} documents into {len(splits)} chunks")
+    splits = _get_splitter(chunk_size, chunk_overlap).split_documents(documents)
+    logger.info("Split %d documents into %d chunks", len(documents), len(splits))
     return splits
 
 
-def create_embeddings_and_store(splits: List) -> None:
+def deduplicate_splits(splits: List) -> Tuple[List[str], List[dict]]:
     """
-    Create embeddings from document splits and store in FAISS.
+    Drop chunks whose text repeats an earlier chunk.
+    
+    Split PDFs repeat headers, footers and boilerplate clauses; each copy
+    would otherwise cost an embedding and an index slot. The metadata of
+    every dropped copy is kept on the surviving chunk under "duplicates",
+    so results still link back to all of their sources.
     
     Args:
         splits: List of document splits
+        
+    Returns:
+        Tuple of (unique texts, their metadata), in first-seen order
     """
-    texts = [doc.page_content for doc in splits]
-    metadatas = [doc.metadata for doc in splits]
+    positions = {}
+    texts: List[str] = []
+    metadatas: List[dict] = []
+    
+    for doc in splits:
+        digest = blake2b(doc.page_content.encode(), digest_size=16).digest()
+        position = positions.get(digest)
+        if position is None:
+            positions[digest] = len(texts)
+            texts.append(doc.page_content)
+            metadatas.append(dict(doc.metadata))
+        else:
+            metadatas[position].setdefault("duplicates", []).append(doc.metadata)
+    
+    dropped = len(splits) - len(texts)
+    if dropped:
+        logger.info("Dropped %d duplicate chunks of %d", dropped, len(splits))
+    return texts, metadatas
+
+
+async def create_embeddings_and_store(splits: List) -> None:
+    """
+    Create embeddings from document splits and store in FAISS.
     
+    Duplicate chunks and chunks already in the saved index are dropped,
+    batches are embedded concurrently, then the new vectors are added to
+    the index and saved in one pass.
+    
+    Args:
+        splits: List of document splits
+    """
     manager = VectorStoreManager()
-    manager.save_vectorstore(texts, metadatas)
+    texts, metadatas = manager.exclude_indexed(*deduplicate_splits(splits))
+    if not texts:
+        logger.info("No new chunks to embed")
+        return
+    
+    vectors = await aembed_in_batches(
+        get_embeddings_model(),
+        texts,
+        batch_size=settings.embedding_batch_size,
+        concurrency=settings.embedding_max_concurrency
+    )
+    
+    manager.save_vectorstore(texts, metadatas, vectors=vectors)
     logger.info("Embeddings created and stored in FAISS")
 
 
+async def _run_and_close_connections(coroutine: Awaitable[None]) -> None:
+    """Await a coroutine, then close the HTTP connections its event loop opened."""
+    try:
+        await coroutine
+    finally:
+        await close_loop_connections()
+
+
 def ingest() -> None:
     """
     Main ingestion function.
@@ -102,7 +203,7 @@ def ingest() -> None:
     backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     regulations_path = os.path.join(backend_dir, "data", "regulations")
     
-    logger.info(f"Loading PDFs from: {regulations_path}")
+    logger.info("Loading PDFs from: %s", regulations_path)
     
     documents = load_pdfs(regulations_path)
     
@@ -125,17 +226,24 @@ def ingest() -> None:
         metadatas = [{"source": f"regulation_{i}"} for i in range(len(sample_regulations))]
         
         manager = VectorStoreManager()
+        texts, metadatas = manager.exclude_indexed(texts, metadatas)
         manager.save_vectorstore(texts, metadatas)
-        logger.info(f"Created sample vectorstore with {len(sample_regulations)} regulations")
+        logger.info("Created sample vectorstore with %d regulations", len(sample_regulations))
         return
     
-    logger.info(f"Loaded {len(documents)} documents")
+    logger.info("Loaded %d documents", len(documents))
     
     splits = split_documents(documents)
-    create_embeddings_and_store(splits)
+    # Splits hold their own copies of the text; release the full pages
+    del documents
+    asyncio.run(_run_and_close_connections(create_embeddings_and_store(splits)))
     
     logger.info("Ingestion complete")
 
 
 if __name__ == "__main__":
-    ingest()
+    listener = _configure_logging()
+    try:
+        ingest()
+    finally:
+        listener.stop()
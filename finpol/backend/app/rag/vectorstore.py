@@ -1,8 +1,10 @@
 """FAISS Vector Store module for RAG system."""
 import faiss
+import inspect
 import numpy as np
-from typing import List, Optional, Protocol, Any
+from typing import List, Optional, Protocol, Any, Tuple
 import logging
+import math
 import os
 
 from langchain_community.vectorstores import FAISS
@@ -12,13 +14,106 @@ from app.rag.embeddings import get_embeddings_model
 
 logger = logging.getLogger(__name__)
 
+# The pinned langchain-community rejects this flag; newer releases require it
+_LOAD_KWARGS = (
+    {"allow_dangerous_deserialization": True}
+    if "allow_dangerous_deserialization" in inspect.signature(FAISS.load_local).parameters
+    else {}
+)
+
+# Product quantizer: sub-vectors per vector (must divide the dimension), 8 bits each
+PQ_SUBQUANTIZERS = 16
+
+# Training points FAISS wants per IVF centroid, and the centroids each 8-bit
+# PQ sub-quantizer learns; smaller corpora stay on the exact flat index
+IVF_MIN_POINTS_PER_CENTROID = 39
+PQ_CENTROIDS = 256
+
+# HNSW graph: neighbours per node, and candidate list sizes while building
+# and searching (higher means better recall, slower build/search)
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+
+# Scalar quantizers for stored vectors: fp16 halves memory traffic per
+# search, 8-bit quarters it (per-dimension ranges learned from training data)
+SCALAR_QUANTIZERS = {
+    "fp16": faiss.ScalarQuantizer.QT_fp16,
+    "int8": faiss.ScalarQuantizer.QT_8bit,
+}
+
+# Vectors staged by VectorStore.add_vectors before they are added to the index
+# in one call
+STAGING_FLUSH_SIZE = 10_000
+
+
+def build_ivf_index(flat_index: faiss.Index, nprobe: int) -> faiss.Index:
+    """
+    Rebuild an exact (flat) index as an IVF index with PQ-compressed vectors.
+    
+    Vectors keep their positions, so docstore mappings stay valid. Falls
+    back to uncompressed IVF lists when the dimension does not split into
+    PQ_SUBQUANTIZERS sub-vectors.
+    
+    Args:
+        flat_index: Populated flat index
+        nprobe: IVF cells searched per query (stored with the index)
+        
+    Returns:
+        Trained and populated IVF index, or flat_index unchanged when it
+        holds too few vectors to train one
+    """
+    count, dimension = flat_index.ntotal, flat_index.d
+    
+    nlist = max(1, int(4 * math.sqrt(count)))
+    use_pq = dimension % PQ_SUBQUANTIZERS == 0
+    encoding = f"PQ{PQ_SUBQUANTIZERS}" if use_pq else "Flat"
+    min_count = max(IVF_MIN_POINTS_PER_CENTROID * nlist, PQ_CENTROIDS if use_pq else 0)
+    if count < min_count:
+        logger.warning(
+            "Keeping flat index: %d vectors are too few to train IVF%d,%s (needs %d)",
+            count, nlist, encoding, min_count
+        )
+        return flat_index
+    
+    vectors = flat_index.reconstruct_n(0, count)
+    index = faiss.index_factory(dimension, f"IVF{nlist},{encoding}", flat_index.metric_type)
+    index.train(vectors)
+    index.add(vectors)
+    index.nprobe = nprobe
+    
+    logger.info("Built IVF%d,%s index over %d vectors", nlist, encoding, count)
+    return index
+
+
+def configure_faiss_threads(threads: int) -> None:
+    """
+    Set the OpenMP thread count FAISS uses within one search.
+    
+    Searches already run concurrently from worker threads (and batched
+    searches cover many queries at once), so per-search threading on top
+    of that oversubscribes the cores.
+    
+    Args:
+        threads: Threads per search; 0 leaves the FAISS default
+    """
+    if threads > 0:
+        faiss.omp_set_num_threads(threads)
+        logger.info("FAISS OpenMP threads set to %d", threads)
+
 
 class VectorStoreManagerProtocol(Protocol):
     """Protocol for VectorStoreManager."""
     
     def load_vectorstore(self) -> FAISS: ...
     
-    def save_vectorstore(self, texts: List[str], metadatas: Optional[List[dict]] = None) -> FAISS: ...
+    def save_vectorstore(
+        self,
+        texts: List[str],
+        metadatas: Optional[List[dict]] = None,
+        vectors: Optional[np.ndarray] = None,
+        rebuild: bool = False
+    ) -> FAISS: ...
 
 
 class VectorStoreManager:
@@ -51,34 +146,133 @@ class VectorStoreManager:
         self._vectorstore = FAISS.load_local(
             self.vector_db_path,
             embeddings,
-            allow_dangerous_deserialization=True
+            **_LOAD_KWARGS
         )
-        logger.info(f"Vectorstore loaded from {self.vector_db_path}")
+        logger.info("Vectorstore loaded from %s", self.vector_db_path)
         return self._vectorstore
     
-    def save_vectorstore(self, texts: List[str], metadatas: Optional[List[dict]] = None) -> FAISS:
+    def _load_existing(self) -> Optional[FAISS]:
+        """Return the current vectorstore, loading it from disk if one was saved."""
+        if self._vectorstore is None:
+            try:
+                self.load_vectorstore()
+            except FileNotFoundError:
+                return None
+        return self._vectorstore
+    
+    def exclude_indexed(
+        self,
+        texts: List[str],
+        metadatas: Optional[List[dict]] = None
+    ) -> Tuple[List[str], Optional[List[dict]]]:
         """
-        Create and save vectorstore to disk.
+        Drop texts the saved vectorstore already holds.
+        
+        Lets incremental ingests embed only new documents.
+        
+        Args:
+            texts: Candidate texts to index
+            metadatas: Optional metadata for each text
+            
+        Returns:
+            Tuple of (new texts, their metadata), in input order
+        """
+        store = self._load_existing()
+        if store is None:
+            return texts, metadatas
+        
+        indexed = {
+            store.docstore.search(doc_id).page_content
+            for doc_id in store.index_to_docstore_id.values()
+        }
+        keep = [i for i, text in enumerate(texts) if text not in indexed]
+        if len(keep) < len(texts):
+            logger.info("Skipping %d texts already in the vectorstore", len(texts) - len(keep))
+        return (
+            [texts[i] for i in keep],
+            [metadatas[i] for i in keep] if metadatas is not None else None
+        )
+    
+    def save_vectorstore(
+        self,
+        texts: List[str],
+        metadatas: Optional[List[dict]] = None,
+        vectors: Optional[np.ndarray] = None,
+        rebuild: bool = False
+    ) -> FAISS:
+        """
+        Add documents to the saved vectorstore (creating it if needed) and save it.
         
         Args:
             texts: List of text documents to index
             metadatas: Optional list of metadata for each document
+            vectors: Precomputed embedding matrix (one row per text); embedded here if omitted
+            rebuild: Replace any saved vectorstore instead of adding to it
             
         Returns:
             FAISS vectorstore instance
         """
         embeddings = get_embeddings_model()
+        existing = None if rebuild else self._load_existing()
         
-        self._vectorstore = FAISS.from_texts(
-            texts=texts,
-            embedding=embeddings,
-            metadatas=metadatas
-        )
+        if existing is not None:
+            # Only the new documents are embedded and added
+            if texts:
+                if vectors is not None:
+                    existing.add_embeddings(list(zip(texts, vectors)), metadatas=metadatas)
+                else:
+                    existing.add_texts(texts, metadatas=metadatas)
+            self._vectorstore = existing
+        elif vectors is not None:
+            self._vectorstore = FAISS.from_embeddings(
+                text_embeddings=list(zip(texts, vectors)),
+                embedding=embeddings,
+                metadatas=metadatas
+            )
+        else:
+            self._vectorstore = FAISS.from_texts(
+                texts=texts,
+                embedding=embeddings,
+                metadatas=metadatas
+            )
+        
+        self._save()
+        return self._vectorstore
+    
+    def merge_from(self, vector_db_path: str) -> FAISS:
+        """
+        Merge a vectorstore saved by another process into this one and save it.
+        
+        Both indexes must still be exact (flat) indexes.
+        
+        Args:
+            vector_db_path: Path of the vectorstore to merge in
+            
+        Returns:
+            FAISS vectorstore instance
+        """
+        other = FAISS.load_local(vector_db_path, get_embeddings_model(), **_LOAD_KWARGS)
+        existing = self._load_existing()
+        if existing is None:
+            self._vectorstore = other
+        else:
+            existing.merge_from(other)
+        logger.info("Merged %d vectors from %s", other.index.ntotal, vector_db_path)
+        
+        self._save()
+        return self._vectorstore
+    
+    def _save(self) -> None:
+        """Write the current vectorstore to disk, switching to IVF once it is large."""
+        # Exact search is cheapest for small corpora; large ones switch to a
+        # partitioned, quantized index so queries scan only nprobe cells
+        index = self._vectorstore.index
+        if isinstance(index, faiss.IndexFlat) and index.ntotal >= settings.vector_index_ivf_threshold:
+            self._vectorstore.index = build_ivf_index(index, nprobe=settings.vector_index_nprobe)
         
         os.makedirs(self.vector_db_path, exist_ok=True)
         self._vectorstore.save_local(self.vector_db_path)
-        logger.info(f"Vectorstore saved to {self.vector_db_path}")
-        return self._vectorstore
+        logger.info("Vectorstore saved to %s", self.vector_db_path)
     
     @property
     def vectorstore(self) -> Optional[FAISS]:
@@ -87,69 +281,161 @@ class VectorStoreManager:
 
 
 class VectorStore:
-    """FAISS vector store for semantic search."""
+    """
+    FAISS vector store for semantic search.
     
-    def __init__(self, dimension: int = 1536):
+    Vectors are L2-normalized on the way in and searched by inner product,
+    so scores are cosine similarities (higher is more similar).
+    
+    Added vectors are staged and written to the index in large batches by
+    flush(), which search() and save_index() call first.
+    """
+    
+    def __init__(self, dimension: int = 1536, quantization: Optional[str] = "fp16"):
         """
         Initialize vector store.
         
         Args:
             dimension: Embedding dimension
+            quantization: Stored vector encoding, "fp16", "int8", or None for float32
         """
+        if quantization is not None and quantization not in SCALAR_QUANTIZERS:
+            raise ValueError(f"Unsupported quantization: {quantization}")
         self.dimension = dimension
+        self.quantization = quantization
         self.index = None
         self.documents = []
+        # Vectors and documents waiting for the next flush()
+        self._stage_vecs: List[np.ndarray] = []
+        self._stage_docs: List[str] = []
+        self._staged_count = 0
+        # Object-array view of documents for vectorized lookups, rebuilt lazily
+        self._documents_array: Optional[np.ndarray] = None
     
     def create_index(self):
-        """Create FAISS index."""
-        self.index = faiss.IndexFlatL2(self.dimension)
+        """
+        Create FAISS HNSW index (approximate, sub-linear search).
+        
+        Quantized indexes are trained on the first batch of vectors flushed.
+        """
+        if self.quantization is None:
+            self.index = faiss.IndexHNSWFlat(self.dimension, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        else:
+            self.index = faiss.IndexHNSWSQ(
+                self.dimension,
+                SCALAR_QUANTIZERS[self.quantization],
+                HNSW_M,
+                faiss.METRIC_INNER_PRODUCT
+            )
+        self.index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        self.index.hnsw.efSearch = HNSW_EF_SEARCH
         logger.info("FAISS index created")
     
     def add_vectors(self, vectors: np.ndarray, documents: List[str]):
         """
-        Add vectors and documents to index.
+        Stage vectors and documents for the index.
+        
+        They are added once STAGING_FLUSH_SIZE vectors are staged, or on the
+        next flush(), search() or save_index().
         
         Args:
             vectors: Numpy array of embeddings
             documents: List of document texts
         """
+        # Copy so normalizing in place later leaves the caller's array alone
+        vectors = np.array(vectors, dtype=np.float32, order="C").reshape(-1, self.dimension)
+        self._stage_vecs.append(vectors)
+        self._stage_docs.extend(documents)
+        self._staged_count += len(vectors)
+        if self._staged_count >= STAGING_FLUSH_SIZE:
+            self.flush()
+    
+    def flush(self):
+        """Add all staged vectors and documents to the index in one call."""
+        if not self._stage_vecs:
+            return
         if self.index is None:
             self.create_index()
         
+        if len(self._stage_vecs) == 1:
+            vectors = self._stage_vecs[0]
+        else:
+            vectors = np.vstack(self._stage_vecs)
+        faiss.normalize_L2(vectors)
+        if not self.index.is_trained:
+            self.index.train(vectors)
         self.index.add(vectors)
-        self.documents.extend(documents)
-        logger.info(f"Added {len(documents)} documents to index")
+        self.documents.extend(self._stage_docs)
+        self._documents_array = None
+        logger.info("Added %d documents to index", len(self._stage_docs))
+        
+        self._stage_vecs = []
+        self._stage_docs = []
+        self._staged_count = 0
     
-    def search(self, query_vector: np.ndarray, top_k: int = 5) -> List[tuple]:
+    def search(self, query_vectors: np.ndarray, top_k: int = 5) -> List[List[tuple]]:
         """
-        Search for similar documents.
+        Search for similar documents for a batch of queries in one FAISS call.
         
         Args:
-            query_vector: Query embedding
-            top_k: Number of results
+            query_vectors: (B, dimension) C-contiguous float32 array of query embeddings
+            top_k: Number of results per query
             
         Returns:
-            List of (document, distance) tuples
+            One list per query of (document, cosine similarity) tuples, most
+            similar first
+            
+        Raises:
+            ValueError: If query_vectors is not a 2D C-contiguous float32 array
         """
+        if not (
+            query_vectors.ndim == 2
+            and query_vectors.dtype == np.float32
+            and query_vectors.flags.c_contiguous
+        ):
+            raise ValueError("query_vectors must be a 2D C-contiguous float32 array")
+        
+        self.flush()
         if self.index is None:
-            return []
+            return [[] for _ in range(len(query_vectors))]
         
-        distances, indices = self.index.search(query_vector.reshape(1, -1), top_k)
+        # Copy so normalizing in place leaves the caller's array alone
+        queries = query_vectors.copy()
+        faiss.normalize_L2(queries)
+        distances, indices = self.index.search(queries, top_k)
         
-        results = []
-        for i, idx in enumerate(indices[0]):
-            if idx < len(self.documents):
-                results.append((self.documents[idx], distances[0][i]))
+        if self._documents_array is None:
+            self._documents_array = np.array(self.documents, dtype=object)
         
-        return results
+        # Unfilled result slots come back as -1
+        valid = (indices >= 0) & (indices < len(self._documents_array))
+        return [
+            list(zip(self._documents_array[ids[mask]].tolist(), scores[mask].tolist()))
+            for ids, scores, mask in zip(indices, distances, valid)
+        ]
+    
+    def search_one(self, query_vector: np.ndarray, top_k: int = 5) -> List[tuple]:
+        """
+        Search for documents similar to a single query embedding.
+        
+        Args:
+            query_vector: Query embedding of any shape with `dimension` values
+            top_k: Number of results
+            
+        Returns:
+            List of (document, cosine similarity) tuples, most similar first
+        """
+        query = np.ascontiguousarray(query_vector, dtype=np.float32).reshape(1, -1)
+        return self.search(query, top_k)[0]
     
     def save_index(self, path: str):
         """Save index to disk."""
+        self.flush()
         if self.index is not None:
             faiss.write_index(self.index, path)
-            logger.info(f"Index saved to {path}")
+            logger.info("Index saved to %s", path)
     
     def load_index(self, path: str):
         """Load index from disk."""
         self.index = faiss.read_index(path)
-        logger.info(f"Index loaded from {path}")
+        logger.info("Index loaded from %s", path)
@@ -1,18 +1,30 @@
 """Bulk Transaction Processing Service - Orchestrates the full compliance flow."""
 
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
-from datetime import datetime
-from collections import defaultdict
+import os
+import tempfile
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Union, BinaryIO
 
+import numpy as np
+import pandas as pd
+
+from app.config import settings
+from app.core.constants import RISK_CODE_HIGH, RISK_CODE_REVIEW
 from app.models.transaction_model import Transaction
 from app.services.transaction_parser import parser as transaction_parser
-from app.services.risk_engine import RiskEngine
+from app.services.risk_engine import RiskEngine, RiskFactor
 from app.services.regulation_retriever import RegulationRetriever
-from app.services.pdf_report_generator import report_generator
+from app.services.retrieval_batcher import RetrievalBatcher
+from app.services.pdf_report_generator import render_compliance_report
+from app.utils.helpers import utc_now
 
 logger = logging.getLogger(__name__)
 
+# Regulation queries per risk factor found in an upload
+_AML_QUERY = "anti-money laundering suspicious transactions reporting"
+_CRYPTO_QUERY = "cryptocurrency virtual assets FATF travel rule"
+
 
 class BulkProcessor:
     """
@@ -26,32 +38,45 @@ class BulkProcessor:
     def __init__(
         self,
         risk_engine: Optional[RiskEngine] = None,
-        regulation_retriever: Optional[RegulationRetriever] = None
+        regulation_retriever: Optional[RegulationRetriever] = None,
+        retrieval_batcher: Optional[RetrievalBatcher] = None
     ):
         self.risk_engine = risk_engine or RiskEngine()
-        self.regulation_retriever = regulation_retriever or RegulationRetriever()
+        # Regulation lookups go through a RetrievalBatcher so the fixed
+        # per-upload queries are memoized (per index version) across uploads;
+        # without one, the application's shared batcher is used
+        if retrieval_batcher is None and regulation_retriever is not None:
+            retrieval_batcher = RetrievalBatcher(regulation_retriever)
+        self._retrieval_batcher = retrieval_batcher
+        # Bounds reports queued for the process pool so a burst of uploads
+        # waits here instead of piling pickled payloads into the pool
+        self._report_slots = asyncio.Semaphore((settings.pdf_workers or os.cpu_count() or 1) * 2)
     
     async def process_file(
         self,
-        file_content: bytes,
+        file: Union[bytes, BinaryIO],
         filename: str,
-        user_id: str = "bulk_upload"
+        user_id: str = "bulk_upload",
+        generate_report: bool = True
     ) -> Dict[str, Any]:
         """
         Process uploaded file and return analysis results + PDF report.
         
         Args:
-            file_content: Raw file bytes
+            file: Readable binary file object (or raw bytes)
             filename: Original filename
             user_id: User performing the upload
+            generate_report: Whether to render the PDF report
             
         Returns:
-            Dict with analysis results and PDF report
+            Dict with analysis results and the PDF report's temporary file
+            path and size (None if not generated); the caller owns the file
+            and must delete it
         """
         logger.info(f"Processing file: {filename}")
         
         # Step 1: Parse the file
-        parsed_data = transaction_parser.parse_file(file_content, filename)
+        parsed_data = transaction_parser.parse_file(file, filename)
         
         if not parsed_data:
             raise ValueError("No transactions found in the uploaded file")
@@ -62,20 +87,18 @@ class BulkProcessor:
         transactions = transaction_parser.create_transactions(parsed_data, user_id)
         
         # Step 3: Analyze each transaction
-        risk_results = await self._analyze_transactions(transactions)
+        risk_results, risk_levels, risk_factors = await self._analyze_transactions(transactions)
         
         # Step 4: Get relevant regulations
-        regulations = await self._get_relevant_regulations(transactions, risk_results)
+        regulations = await self._get_relevant_regulations(risk_results, risk_factors)
         
         # Step 5: Generate PDF report
-        pdf_bytes = report_generator.generate_compliance_report(
-            transactions=transactions,
-            risk_results=risk_results,
-            regulations=regulations
-        )
+        pdf_path = pdf_size = None
+        if generate_report:
+            pdf_path, pdf_size = await self._render_report(transactions, risk_results, regulations)
         
         # Step 6: Compile summary
-        summary = self._compile_summary(transactions, risk_results)
+        summary = self._compile_summary(transactions, risk_levels)
         
         logger.info(f"Bulk processing complete: {len(transactions)} transactions analyzed")
         
@@ -83,111 +106,177 @@ class BulkProcessor:
             "transactions": transactions,
             "risk_results": risk_results,
             "regulations": regulations,
-            "pdf_report": pdf_bytes,
+            "pdf_path": pdf_path,
+            "pdf_size": pdf_size,
             "summary": summary,
             "filename": filename,
-            "processed_at": datetime.now().isoformat()
+            "processed_at": utc_now().isoformat()
         }
     
+    async def _render_report(
+        self,
+        transactions: List[Transaction],
+        risk_results: Dict[str, Dict[str, Any]],
+        regulations: List[Dict[str, Any]]
+    ) -> Tuple[str, int]:
+        """
+        Render the PDF report in a worker process, keeping the event loop free.
+        
+        The worker writes the report to a temporary file, so the PDF is
+        neither sent back through the pool nor held in memory.
+        
+        Returns:
+            Tuple of (temporary file path, report size in bytes)
+        """
+        from app.dependencies import ServiceFactory
+        
+        fd, path = tempfile.mkstemp(prefix="compliance_report_", suffix=".pdf")
+        os.close(fd)
+        try:
+            async with self._report_slots:
+                loop = asyncio.get_event_loop()
+                size = await loop.run_in_executor(
+                    ServiceFactory.get_pdf_executor(),
+                    render_compliance_report,
+                    transactions,
+                    risk_results,
+                    regulations,
+                    path
+                )
+        except BaseException:
+            os.remove(path)
+            raise
+        return path, size
+    
     async def _analyze_transactions(
         self,
         transactions: List[Transaction]
-    ) -> Dict[str, Dict[str, Any]]:
-        """Analyze all transactions with RiskEngine."""
-        results = {}
+    ) -> Tuple[Dict[str, Dict[str, Any]], List[str], RiskFactor]:
+        """
+        Analyze all transactions with a single batched RiskEngine pass.
         
-        for tx in transactions:
-            try:
-                assessment = await self.risk_engine.assess_risk_async(tx)
-                results[tx.transaction_id] = {
-                    "risk_score": assessment.risk_score,
-                    "risk_level": assessment.risk_level,
-                    "should_approve": assessment.should_approve,
-                    "requires_review": assessment.requires_review,
-                    "reasons": assessment.risk_factors if hasattr(assessment, 'risk_factors') else []
-                }
-            except Exception as e:
-                logger.error(f"Error analyzing transaction {tx.transaction_id}: {e}")
-                results[tx.transaction_id] = {
+        Returns:
+            Tuple of (results keyed by transaction ID, risk level per
+            transaction in input order, RiskFactor bits found in any transaction)
+        """
+        try:
+            # Large files take a noticeable slice of CPU to score; run the pass
+            # on a worker thread so other requests keep being served meanwhile
+            loop = asyncio.get_event_loop()
+            assessed = await loop.run_in_executor(
+                None,
+                self.risk_engine.assess_transactions,
+                transactions
+            )
+        except Exception as e:
+            logger.error(f"Error analyzing transactions: {e}")
+            results = {
+                tx.transaction_id: {
                     "risk_score": 0,
                     "risk_level": "Unknown",
                     "should_approve": False,
                     "requires_review": True,
                     "reasons": [f"Analysis error: {str(e)}"]
                 }
+                for tx in transactions
+            }
+            return results, ["Unknown"] * len(transactions), RiskFactor.NONE
+        
+        # One vectorized comparison flags every row needing review
+        requires_review = (assessed["risk_code"].to_numpy() >= RISK_CODE_REVIEW).tolist()
+        risk_levels = assessed["risk_level"].tolist()
+        factors = assessed["risk_factors"].to_numpy()
+        risk_factors = RiskFactor(int(np.bitwise_or.reduce(factors))) if len(factors) else RiskFactor.NONE
         
-        return results
+        results = {}
+        for transaction_id, risk_score, risk_level, risk_code, review, reasons in zip(
+            [tx.transaction_id for tx in transactions],
+            assessed["risk_score"].tolist(),
+            risk_levels,
+            assessed["risk_code"].tolist(),
+            requires_review,
+            assessed["reasons"].tolist()
+        ):
+            results[transaction_id] = {
+                "risk_score": risk_score,
+                "risk_level": risk_level,
+                "risk_code": risk_code,
+                "should_approve": not review,
+                "requires_review": review,
+                "reasons": reasons
+            }
+        
+        return results, risk_levels, risk_factors
+    
+    def _get_retrieval_batcher(self) -> RetrievalBatcher:
+        """Return the injected batcher, or the application's shared one."""
+        if self._retrieval_batcher is not None:
+            return self._retrieval_batcher
+        from app.dependencies import ServiceFactory
+        return ServiceFactory.get_retrieval_batcher()
     
     async def _get_relevant_regulations(
         self,
-        transactions: List[Transaction],
-        risk_results: Dict[str, Dict[str, Any]]
+        risk_results: Dict[str, Dict[str, Any]],
+        risk_factors: RiskFactor
     ) -> List[Dict[str, Any]]:
-        """Get relevant regulations based on high-risk transactions."""
-        # Get unique risk factors
-        risk_factors = set()
-        for result in risk_results.values():
-            level = result.get('risk_level', '')
-            if level in ['High', 'Critical']:
-                risk_factors.add('high_risk')
-            if 'crypto' in str(result.get('reasons', [])).lower():
-                risk_factors.add('cryptocurrency')
+        """Get relevant regulations based on high-risk transactions and the factors found."""
+        high_risk = any(result.get('risk_code', 0) >= RISK_CODE_HIGH for result in risk_results.values())
+        crypto = bool(risk_factors & RiskFactor.CRYPTO_EXCHANGE)
         
         # Query regulations based on risk factors
-        regulations = []
+        queries = []
+        if high_risk:
+            queries.append(_AML_QUERY)
+        if crypto:
+            queries.append(_CRYPTO_QUERY)
         
-        if 'high_risk' in risk_factors:
-            try:
-                regs = await self.regulation_retriever.search_regulations_async(
-                    "anti-money laundering suspicious transactions reporting"
-                )
-                regulations.extend(regs)
-            except Exception as e:
-                logger.warning(f"Error retrieving AML regulations: {e}")
-        
-        if 'cryptocurrency' in risk_factors:
-            try:
-                regs = await self.regulation_retriever.search_regulations_async(
-                    "cryptocurrency virtual assets FATF travel rule"
-                )
-                regulations.extend(regs)
-            except Exception as e:
-                logger.warning(f"Error retrieving crypto regulations: {e}")
+        batcher = self._get_retrieval_batcher()
+        results = await asyncio.gather(
+            *(batcher.submit(query) for query in queries),
+            return_exceptions=True
+        )
+        
+        regulations = []
+        for query, result in zip(queries, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Error retrieving regulations for '{query}': {result}")
+                continue
+            regulations.extend({"content": content, "source": "faiss"} for content in result)
         
-        # Remove duplicates
-        seen = set()
-        unique_regulations = []
+        # Remove duplicates, keeping the first of each in order
+        unique_regulations = {}
         for reg in regulations:
-            reg_id = reg.get('id', reg.get('content', '')[:30])
-            if reg_id not in seen:
-                seen.add(reg_id)
-                unique_regulations.append(reg)
+            unique_regulations.setdefault(reg.get('id') or reg.get('content', '')[:30], reg)
         
-        return unique_regulations
+        return list(unique_regulations.values())
     
     def _compile_summary(
         self,
         transactions: List[Transaction],
-        risk_results: Dict[str, Dict[str, Any]]
+        risk_levels: Sequence[str]
     ) -> Dict[str, Any]:
-        """Compile summary statistics."""
-        total = len(transactions)
-        total_amount = sum(tx.amount for tx in transactions)
+        """
+        Compile summary statistics.
         
-        risk_counts = defaultdict(int)
-        risk_amounts = defaultdict(float)
+        Args:
+            transactions: Analyzed transactions
+            risk_levels: Risk level of each transaction, in the same order
+        """
+        total = len(transactions)
+        amounts = np.fromiter((tx.amount for tx in transactions), dtype=np.float64, count=total)
         
-        for tx in transactions:
-            result = risk_results.get(tx.transaction_id, {})
-            level = result.get('risk_level', 'Low')
-            risk_counts[level] += 1
-            risk_amounts[level] += tx.amount
+        # Per-level counts and amounts in one pass each; levels keep first-seen order
+        codes, levels = pd.factorize(np.array(risk_levels, dtype=object))
+        level_names = levels.tolist()
+        risk_counts = dict(zip(level_names, np.bincount(codes, minlength=len(level_names)).tolist()))
+        risk_amounts = np.bincount(codes, weights=amounts, minlength=len(level_names)).tolist()
         
         return {
             "total_transactions": total,
-            "total_amount": total_amount,
-            "risk_distribution": dict(risk_counts),
-            "amount_by_risk": {k: float(v) for k, v in risk_amounts.items()},
+            "total_amount": float(amounts.sum()),
+            "risk_distribution": risk_counts,
+            "amount_by_risk": dict(zip(level_names, risk_amounts)),
             "compliance_rate": (
                 (risk_counts.get('Low', 0) / total * 100) if total > 0 else 100
             ),
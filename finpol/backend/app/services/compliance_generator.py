@@ -2,23 +2,27 @@
 
 This module provides:
 - Async LLM generation support
+- Batched generation (several transactions per prompt) with bounded concurrency
+- Single-flight coalescing of identical in-flight requests, optional hedging
 - Abstraction for different LLM providers
 - Easy integration with future ML models
 - Prompt template management
 """
+import json
 import logging
 import asyncio
-from typing import List, Optional
+import hashlib
+from typing import Awaitable, Callable, Dict, List, Optional
 from abc import ABC, abstractmethod
 
 from langchain_openai import ChatOpenAI
-from langchain.prompts import ChatPromptTemplate
-from langchain.output_parsers import PydanticOutputParser
 from langchain.schema import HumanMessage, SystemMessage
 
 from app.config import settings
+from app.core.http_client import close_loop_connections, get_openai_clients
 from app.models.transaction_model import Transaction
 from app.models.risk_response_model import RiskResult
+from app.services.response_cache import bucketed_features
 
 logger = logging.getLogger(__name__)
 
@@ -38,22 +42,42 @@ Generate audit-ready explanations for transaction risk assessments.
 Provide clear, professional compliance documentation."""
 
 
-ANALYSIS_PROMPT = """Transaction Details:
+# Prompts are laid out static text first, then regulations (shared by every
+# transaction with the same retrieval query), then per-transaction details.
+# Requests therefore share the longest possible identical prefix, which the
+# provider's automatic prompt caching can reuse instead of prefilling again.
+
+ANALYSIS_PROMPT = """Generate an audit-ready compliance explanation for the transaction below that:
+1. Summarizes the transaction risk assessment
+2. Explains how each risk factor was evaluated
+3. References applicable regulatory requirements
+4. Provides a clear compliance determination
+
+Provide clean, professional text suitable for audit documentation.
+
+Relevant Regulations:
+{regulations_text}
+
+Transaction Details:
 {transaction_info}
 
 Risk Factors Identified:
-{reasons_text}
+{reasons_text}"""
+
+
+BATCH_ANALYSIS_PROMPT = """For each transaction below, generate an audit-ready compliance explanation
+that summarizes the risk assessment, explains each risk factor, references
+applicable regulatory requirements and gives a clear compliance determination.
+
+Respond with only a JSON array of strings, one explanation per transaction,
+in the order given.
 
 Relevant Regulations:
 {regulations_text}
 
-Generate an audit-ready compliance explanation that:
-1. Summarizes the transaction risk assessment
-2. Explains how each risk factor was evaluated
-3. References applicable regulatory requirements
-4. Provides a clear compliance determination
+Transactions ({count}):
 
-Provide clean, professional text suitable for audit documentation."""
+{transactions_text}"""
 
 
 # ============================================================
@@ -93,39 +117,80 @@ class OpenAIProvider(LLMProvider):
         self.model_name = model_name or settings.model_name
         self.api_key = api_key or settings.openai_api_key
         self.temperature = temperature
+        client, async_client = get_openai_clients(self.api_key)
         self._llm = ChatOpenAI(
             model=self.model_name,
             temperature=self.temperature,
-            api_key=self.api_key
+            api_key=self.api_key,
+            client=client.chat.completions,
+            async_client=async_client.chat.completions
         )
         logger.info(f"OpenAIProvider initialized with model: {self.model_name}")
     
+    # Both methods await the shared async OpenAI client directly, so a
+    # request in flight does not hold a worker thread and can be cancelled
+    
     async def generate(self, prompt: str) -> str:
         """Generate response from prompt."""
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(
-            None,
-            lambda: self._llm.invoke(prompt)
-        )
+        response = await self._llm.ainvoke(prompt)
         return response.content.strip()
     
     async def generate_with_messages(self, messages: list) -> str:
         """Generate response from messages."""
-        loop = asyncio.get_event_loop()
-        
-        def _invoke():
-            langchain_messages = []
-            for msg in messages:
-                if msg["role"] == "system":
-                    langchain_messages.append(SystemMessage(content=msg["content"]))
-                else:
-                    langchain_messages.append(HumanMessage(content=msg["content"]))
-            return self._llm.invoke(langchain_messages)
+        langchain_messages = []
+        for msg in messages:
+            if msg["role"] == "system":
+                langchain_messages.append(SystemMessage(content=msg["content"]))
+            else:
+                langchain_messages.append(HumanMessage(content=msg["content"]))
         
-        response = await loop.run_in_executor(None, _invoke)
+        response = await self._llm.ainvoke(langchain_messages)
         return response.content.strip()
 
 
+# ============================================================
+# Request Coalescing
+# ============================================================
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one in-flight call.
+    
+    Every caller awaits the same task; the key is released as soon as the
+    call finishes, so later calls run fresh.
+    """
+    
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+    
+    async def do(self, key: str, call: Callable[[], Awaitable[str]]) -> str:
+        """
+        Run call() unless an identical call is already in flight.
+        
+        Args:
+            key: Identity of the call
+            call: Zero-argument coroutine factory
+            
+        Returns:
+            Result of the shared call
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(call())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._release(key, task))
+        # Shield so one cancelled caller doesn't cancel the call for the rest
+        return await asyncio.shield(task)
+    
+    def _release(self, key: str, task: asyncio.Task) -> None:
+        """Forget a finished call."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+    
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+
 # ============================================================
 # Compliance Generator Service
 # ============================================================
@@ -145,7 +210,8 @@ class ComplianceGenerator:
         self,
         llm_provider: Optional[LLMProvider] = None,
         system_prompt: str = SYSTEM_PROMPT,
-        analysis_prompt: str = ANALYSIS_PROMPT
+        analysis_prompt: str = ANALYSIS_PROMPT,
+        hedge_delay: Optional[float] = None
     ):
         """
         Initialize the compliance generator.
@@ -154,20 +220,27 @@ class ComplianceGenerator:
             llm_provider: Optional custom LLM provider
             system_prompt: System prompt for LLM
             analysis_prompt: Analysis prompt template
+            hedge_delay: Seconds before a backup request is sent
+                (defaults to settings.llm_hedge_delay_seconds; None disables)
         """
         self._llm_provider = llm_provider or OpenAIProvider()
         self._system_prompt = system_prompt
         self._analysis_prompt = analysis_prompt
+        self._hedge_delay = hedge_delay if hedge_delay is not None else settings.llm_hedge_delay_seconds
+        self._batch_semaphore = asyncio.Semaphore(settings.llm_max_concurrency)
+        self._single_flight = SingleFlight()
         logger.info("ComplianceGenerator initialized")
     
-    def generate(
+    def generate_sync(
         self,
         transaction: Transaction,
         reasons: List[str],
         regulations: List[str]
     ) -> str:
         """
-        Synchronous generation of compliance explanation.
+        Blocking generation of compliance explanation, for callers without an
+        event loop (scripts, CLI tools). Code running inside an event loop
+        must await generate_async() instead.
         
         Args:
             transaction: The transaction to analyze
@@ -178,11 +251,26 @@ class ComplianceGenerator:
             Clean text compliance explanation
             
         Raises:
-            RuntimeError: If LLM generation fails
+            RuntimeError: If LLM generation fails, or if called from a
+                thread that is running an event loop
         """
-        return asyncio.get_event_loop().run_until_complete(
-            self.generate_async(transaction, reasons, regulations)
-        )
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self._generate_in_own_loop(transaction, reasons, regulations))
+        raise RuntimeError("generate_sync() would block the running event loop; await generate_async() instead")
+    
+    async def _generate_in_own_loop(
+        self,
+        transaction: Transaction,
+        reasons: List[str],
+        regulations: List[str]
+    ) -> str:
+        """Run generate_async, then close the connections this short-lived loop opened."""
+        try:
+            return await self.generate_async(transaction, reasons, regulations)
+        finally:
+            await close_loop_connections()
     
     async def generate_async(
         self,
@@ -223,7 +311,12 @@ class ComplianceGenerator:
                 {"role": "human", "content": human_prompt}
             ]
             
-            result = await self._llm_provider.generate_with_messages(messages)
+            # Identical prompts in flight at the same time share one LLM call
+            key = hashlib.blake2b(
+                f"{self._system_prompt}\0{human_prompt}".encode(),
+                digest_size=16
+            ).hexdigest()
+            result = await self._single_flight.do(key, lambda: self._generate_hedged(messages))
             
             logger.info(
                 f"Generated compliance explanation for transaction "
@@ -235,15 +328,126 @@ class ComplianceGenerator:
             logger.error(f"Failed to generate compliance explanation: {e}")
             raise RuntimeError(f"Compliance generation failed: {e}")
     
+    async def _generate_hedged(self, messages: list) -> str:
+        """
+        Call the LLM, sending a backup request if the first is slow.
+        
+        The first successful response wins and the other request is
+        cancelled. Without a hedge delay this is a single plain call.
+        """
+        if self._hedge_delay is None:
+            return await self._llm_provider.generate_with_messages(messages)
+        
+        pending = {asyncio.ensure_future(self._llm_provider.generate_with_messages(messages))}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=self._hedge_delay)
+            if not done:
+                logger.info(f"LLM request exceeded {self._hedge_delay}s, sending hedge request")
+                pending.add(asyncio.ensure_future(self._llm_provider.generate_with_messages(messages)))
+            
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def generate_batch_async(
+        self,
+        transactions: List[Transaction],
+        reasons_list: List[List[str]],
+        regulations: List[str],
+        batch_size: Optional[int] = None
+    ) -> List[Optional[str]]:
+        """
+        Generate compliance explanations for many transactions.
+        
+        Transactions are grouped into chunks that share a single prompt,
+        and at most settings.llm_max_concurrency chunks are in flight.
+        
+        Args:
+            transactions: Transactions to analyze
+            reasons_list: Risk factors per transaction
+            regulations: Regulation texts shared by all transactions
+            batch_size: Transactions per prompt (defaults to settings.llm_batch_size)
+            
+        Returns:
+            One explanation per transaction, in order; None where its chunk failed
+        """
+        batch_size = batch_size or settings.llm_batch_size
+        chunks = [
+            (transactions[start:start + batch_size], reasons_list[start:start + batch_size])
+            for start in range(0, len(transactions), batch_size)
+        ]
+        regulations_text = "\n\n".join(regulations) if regulations else "No specific regulations found."
+        
+        results = await asyncio.gather(*[
+            self._generate_chunk(chunk_transactions, chunk_reasons, regulations_text)
+            for chunk_transactions, chunk_reasons in chunks
+        ])
+        
+        explanations: List[Optional[str]] = []
+        for (chunk_transactions, _), chunk_result in zip(chunks, results):
+            explanations.extend(chunk_result or [None] * len(chunk_transactions))
+        return explanations
+    
+    async def _generate_chunk(
+        self,
+        transactions: List[Transaction],
+        reasons_list: List[List[str]],
+        regulations_text: str
+    ) -> Optional[List[str]]:
+        """Generate explanations for one chunk with a single LLM request."""
+        transactions_text = "\n\n".join(
+            f"Transaction {position}:\n{self._format_transaction(transaction)}\n"
+            f"Risk Factors:\n" + "\n".join([f"- {r}" for r in reasons])
+            for position, (transaction, reasons) in enumerate(zip(transactions, reasons_list), start=1)
+        )
+        human_prompt = BATCH_ANALYSIS_PROMPT.format(
+            count=len(transactions),
+            transactions_text=transactions_text,
+            regulations_text=regulations_text
+        )
+        messages = [
+            {"role": "system", "content": self._system_prompt},
+            {"role": "human", "content": human_prompt}
+        ]
+        
+        try:
+            async with self._batch_semaphore:
+                result = await asyncio.wait_for(
+                    self._llm_provider.generate_with_messages(messages),
+                    timeout=settings.llm_timeout_seconds
+                )
+            explanations = json.loads(result)
+            if not isinstance(explanations, list) or len(explanations) != len(transactions):
+                raise ValueError(f"expected a JSON array of {len(transactions)} explanations")
+        except Exception as e:
+            logger.error(f"Failed to generate batched compliance explanations: {e}")
+            return None
+        
+        logger.info(f"Generated compliance explanations for {len(transactions)} transactions")
+        return [str(explanation) for explanation in explanations]
+    
     def _format_transaction(self, transaction: Transaction) -> str:
-        """Format transaction for prompt."""
+        """
+        Format transaction for prompt.
+        
+        Explanations are cached and reused for transactions with the same
+        bucketed features, so the prompt carries only those features: no
+        transaction or user identifiers and no exact amount.
+        """
+        country, merchant_type, amount, device_risk_score = bucketed_features(transaction)
         return (
-            f"Transaction ID: {getattr(transaction, 'transaction_id', 'N/A')}\n"
-            f"User ID: {getattr(transaction, 'user_id', 'N/A')}\n"
-            f"Amount: {transaction.amount}\n"
-            f"Country: {transaction.country}\n"
-            f"Merchant Type: {transaction.merchant_type}\n"
-            f"Device Risk Score: {transaction.device_risk_score}"
+            f"Amount (nearest 100): {amount:,.0f}\n"
+            f"Country: {country}\n"
+            f"Merchant Type: {merchant_type}\n"
+            f"Device Risk Score (nearest 0.1): {device_risk_score}"
         )
     
     async def generate_from_assessment(
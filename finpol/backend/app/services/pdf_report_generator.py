@@ -2,9 +2,11 @@
 
 import io
 import logging
-from typing import List, Dict, Any
+from dataclasses import dataclass
+from typing import List, Dict, Any, BinaryIO
 from datetime import datetime
-from collections import defaultdict
+
+import numpy as np
 
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, A4
@@ -16,10 +18,59 @@ from reportlab.platypus import (
 )
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT, TA_JUSTIFY
 
+from app.core.constants import RISK_CODE_HIGH, RISK_LEVELS_ORDER
 from app.models.transaction_model import Transaction
 
 logger = logging.getLogger(__name__)
 
+# Severity code per risk level; unrecognised levels (e.g. "Unknown") map to -1
+_LEVEL_CODES = {level: code for code, level in enumerate(RISK_LEVELS_ORDER)}
+_CODE_CRITICAL = _LEVEL_CODES["Critical"]
+_NO_RESULT: Dict[str, Any] = {}
+
+
+@dataclass(frozen=True)
+class ReportArrays:
+    """Per-transaction report columns, extracted once and shared by every section."""
+    amounts: np.ndarray
+    level_codes: np.ndarray
+    is_crypto: np.ndarray
+    is_foreign: np.ndarray
+    risk_counts: Dict[str, int]
+    
+    @classmethod
+    def extract(
+        cls,
+        transactions: List[Transaction],
+        risk_results: Dict[str, Dict[str, Any]]
+    ) -> "ReportArrays":
+        """
+        Build the columns in one pass over the transactions.
+        
+        Transactions without a result count as Low risk.
+        """
+        total = len(transactions)
+        amounts = np.empty(total, dtype=np.float64)
+        level_codes = np.empty(total, dtype=np.int8)
+        is_crypto = np.empty(total, dtype=bool)
+        is_foreign = np.empty(total, dtype=bool)
+        
+        for position, tx in enumerate(transactions):
+            level = risk_results.get(tx.transaction_id, _NO_RESULT).get('risk_level', 'Low')
+            amounts[position] = tx.amount
+            level_codes[position] = _LEVEL_CODES.get(level, -1)
+            is_crypto[position] = tx.merchant_type == 'crypto_exchange'
+            is_foreign[position] = bool(tx.country) and tx.country != 'India'
+        
+        counts = np.bincount(level_codes[level_codes >= 0], minlength=len(RISK_LEVELS_ORDER))
+        return cls(
+            amounts=amounts,
+            level_codes=level_codes,
+            is_crypto=is_crypto,
+            is_foreign=is_foreign,
+            risk_counts=dict(zip(RISK_LEVELS_ORDER, counts.tolist()))
+        )
+
 
 class PDFReportGenerator:
     """
@@ -85,9 +136,31 @@ class PDFReportGenerator:
         if output_filename is None:
             output_filename = f"compliance_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
         
-        buffer = io.BytesIO()
+        with io.BytesIO() as buffer:
+            self.write_compliance_report(buffer, transactions, risk_results, regulations)
+            pdf_bytes = buffer.getvalue()
+        
+        logger.info(f"Generated PDF report: {output_filename} ({len(pdf_bytes)} bytes)")
+        return pdf_bytes
+    
+    def write_compliance_report(
+        self,
+        file: BinaryIO,
+        transactions: List[Transaction],
+        risk_results: Dict[str, Dict[str, Any]],
+        regulations: List[Dict[str, Any]]
+    ) -> None:
+        """
+        Render a PDF compliance report into a writable binary file.
+        
+        Args:
+            file: Target file object
+            transactions: List of transactions
+            risk_results: Dict mapping transaction_id to risk assessment
+            regulations: List of relevant regulations
+        """
         doc = SimpleDocTemplate(
-            buffer,
+            file,
             pagesize=letter,
             rightMargin=72,
             leftMargin=72,
@@ -113,58 +186,46 @@ class PDFReportGenerator:
         ))
         story.append(Spacer(1, 20))
         
+        # Sections read shared columns instead of each rescanning the transactions
+        arrays = ReportArrays.extract(transactions, risk_results)
+        
         # Executive Summary
-        story.extend(self._build_executive_summary(transactions, risk_results))
+        story.extend(self._build_executive_summary(arrays))
         
         # Risk Distribution
-        story.extend(self._build_risk_distribution(transactions, risk_results))
+        story.extend(self._build_risk_distribution(arrays))
         
         # High Risk Transactions
-        story.extend(self._build_high_risk_section(transactions, risk_results))
+        story.extend(self._build_high_risk_section(transactions, risk_results, arrays))
         
         # Critical Transactions
-        story.extend(self._build_critical_section(transactions, risk_results))
+        story.extend(self._build_critical_section(transactions, risk_results, arrays))
         
         # Regulations Applied
         if regulations:
             story.extend(self._build_regulations_section(regulations))
         
         # Recommendations
-        story.extend(self._build_recommendations_section(transactions, risk_results))
+        story.extend(self._build_recommendations_section(arrays))
         
         # Build PDF
         doc.build(story)
-        pdf_bytes = buffer.getvalue()
-        buffer.close()
-        
-        logger.info(f"Generated PDF report: {output_filename} ({len(pdf_bytes)} bytes)")
-        return pdf_bytes
     
-    def _build_executive_summary(
-        self,
-        transactions: List[Transaction],
-        risk_results: Dict[str, Dict[str, Any]]
-    ) -> List:
+    def _build_executive_summary(self, arrays: ReportArrays) -> List:
         """Build executive summary section."""
         story = []
         
         story.append(Paragraph("Executive Summary", self.styles['SectionHeader']))
         
         # Calculate stats
-        total = len(transactions)
+        total = len(arrays.amounts)
         if total == 0:
             story.append(Paragraph("No transactions to report.", self.styles['Normal']))
             story.append(Spacer(1, 20))
             return story
         
-        risk_counts = defaultdict(int)
-        total_amount = 0
-        
-        for tx in transactions:
-            result = risk_results.get(tx.transaction_id, {})
-            level = result.get('risk_level', 'Low')
-            risk_counts[level] += 1
-            total_amount += tx.amount
+        risk_counts = arrays.risk_counts
+        total_amount = float(arrays.amounts.sum())
         
         # Summary table
         summary_data = [
@@ -193,28 +254,20 @@ class PDFReportGenerator:
         
         return story
     
-    def _build_risk_distribution(
-        self,
-        transactions: List[Transaction],
-        risk_results: Dict[str, Dict[str, Any]]
-    ) -> List:
+    def _build_risk_distribution(self, arrays: ReportArrays) -> List:
         """Build risk distribution section."""
         story = []
         
         story.append(Paragraph("Risk Distribution Analysis", self.styles['SectionHeader']))
         
-        total = len(transactions)
+        total = len(arrays.amounts)
         if total == 0:
             story.append(Paragraph("No data available.", self.styles['Normal']))
             story.append(Spacer(1, 20))
             return story
         
         # Calculate percentages
-        risk_counts = defaultdict(int)
-        for tx in transactions:
-            result = risk_results.get(tx.transaction_id, {})
-            level = result.get('risk_level', 'Low')
-            risk_counts[level] += 1
+        risk_counts = arrays.risk_counts
         
         risk_pct = {
             'Low': (risk_counts['Low'] / total) * 100,
@@ -231,7 +284,7 @@ class PDFReportGenerator:
             'Critical': 'Requires immediate investigation',
         }
         
-        for level in ['Low', 'Medium', 'High', 'Critical']:
+        for level in RISK_LEVELS_ORDER:
             count = risk_counts[level]
             pct = risk_pct[level]
             story.append(Paragraph(
@@ -246,24 +299,22 @@ class PDFReportGenerator:
     def _build_high_risk_section(
         self,
         transactions: List[Transaction],
-        risk_results: Dict[str, Dict[str, Any]]
+        risk_results: Dict[str, Dict[str, Any]],
+        arrays: ReportArrays
     ) -> List:
         """Build high risk transactions section."""
         story = []
         
         # Get high risk transactions
-        high_risk = []
-        for tx in transactions:
-            result = risk_results.get(tx.transaction_id, {})
-            if result.get('risk_level') in ['High', 'Critical']:
-                high_risk.append((tx, result))
+        high_risk_positions = np.flatnonzero(arrays.level_codes >= RISK_CODE_HIGH)
+        high_risk_count = len(high_risk_positions)
         
-        if not high_risk:
+        if not high_risk_count:
             return story
         
         story.append(Paragraph("High Risk Transactions Requiring Attention", self.styles['SectionHeader']))
         story.append(Paragraph(
-            f"The following {len(high_risk)} transaction(s) require immediate review:",
+            f"The following {high_risk_count} transaction(s) require immediate review:",
             self.styles['Normal']
         ))
         story.append(Spacer(1, 10))
@@ -273,7 +324,9 @@ class PDFReportGenerator:
             ['Transaction ID', 'Amount', 'Type', 'Risk Level', 'Reason']
         ]
         
-        for tx, result in high_risk[:20]:  # Limit to 20 for PDF size
+        for position in high_risk_positions[:20].tolist():  # Limit to 20 for PDF size
+            tx = transactions[position]
+            result = risk_results[tx.transaction_id]
             table_data.append([
                 tx.transaction_id,
                 f"${tx.amount:,.2f}",
@@ -296,9 +349,9 @@ class PDFReportGenerator:
             ]))
             story.append(table)
         
-        if len(high_risk) > 20:
+        if high_risk_count > 20:
             story.append(Paragraph(
-                f"... and {len(high_risk) - 20} more high risk transactions",
+                f"... and {high_risk_count - 20} more high risk transactions",
                 self.styles['Normal']
             ))
         
@@ -308,17 +361,15 @@ class PDFReportGenerator:
     def _build_critical_section(
         self,
         transactions: List[Transaction],
-        risk_results: Dict[str, Dict[str, Any]]
+        risk_results: Dict[str, Dict[str, Any]],
+        arrays: ReportArrays
     ) -> List:
         """Build critical transactions section."""
         story = []
         
         critical = [
-            (tx, result) for tx, result in [
-                (tx, risk_results.get(tx.transaction_id, {}))
-                for tx in transactions
-            ]
-            if result.get('risk_level') == 'Critical'
+            (transactions[position], risk_results[transactions[position].transaction_id])
+            for position in np.flatnonzero(arrays.level_codes == _CODE_CRITICAL).tolist()
         ]
         
         if not critical:
@@ -347,14 +398,12 @@ class PDFReportGenerator:
         
         story.append(Paragraph("Regulations Applied", self.styles['SectionHeader']))
         
-        # Get unique regulations
-        seen = set()
-        unique_regs = []
+        # Get unique regulations, keeping the first of each in order; retrieved
+        # regulations carry neither id nor title, so fall back to the content
+        unique = {}
         for reg in regulations:
-            reg_id = reg.get('id', reg.get('title', 'unknown'))
-            if reg_id not in seen:
-                seen.add(reg_id)
-                unique_regs.append(reg)
+            unique.setdefault(reg.get('id') or reg.get('title') or reg.get('content', ''), reg)
+        unique_regs = list(unique.values())
         
         for reg in unique_regs[:10]:  # Limit to 10
             title = reg.get('title', 'Unknown Regulation')
@@ -372,25 +421,15 @@ class PDFReportGenerator:
         story.append(Spacer(1, 20))
         return story
     
-    def _build_recommendations_section(
-        self,
-        transactions: List[Transaction],
-        risk_results: Dict[str, Dict[str, Any]]
-    ) -> List:
+    def _build_recommendations_section(self, arrays: ReportArrays) -> List:
         """Build recommendations section."""
         story = []
         
         story.append(Paragraph("Compliance Recommendations", self.styles['SectionHeader']))
         
         # Calculate recommendations based on risk distribution
-        high_risk_count = sum(
-            1 for tx in transactions
-            if risk_results.get(tx.transaction_id, {}).get('risk_level') == 'High'
-        )
-        critical_count = sum(
-            1 for tx in transactions
-            if risk_results.get(tx.transaction_id, {}).get('risk_level') == 'Critical'
-        )
+        high_risk_count = arrays.risk_counts['High']
+        critical_count = arrays.risk_counts['Critical']
         
         recommendations = []
         
@@ -407,21 +446,18 @@ class PDFReportGenerator:
             )
         
         # Check for patterns
-        amounts = [tx.amount for tx in transactions]
-        if amounts:
-            avg_amount = sum(amounts) / len(amounts)
-            high_amounts = [a for a in amounts if a > avg_amount * 5]
-            if len(high_amounts) > len(amounts) * 0.1:
+        amounts = arrays.amounts
+        if len(amounts):
+            avg_amount = float(amounts.mean())
+            high_amount_count = int(np.count_nonzero(amounts > avg_amount * 5))
+            if high_amount_count > len(amounts) * 0.1:
                 recommendations.append(
                     f"3. MONITORING: Consider implementing additional controls for transactions "
                     f"exceeding 5x the average amount (${avg_amount * 5:,.2f})."
                 )
         
         # Check for crypto
-        crypto_count = sum(
-            1 for tx in transactions
-            if tx.merchant_type == 'crypto_exchange'
-        )
+        crypto_count = int(np.count_nonzero(arrays.is_crypto))
         if crypto_count > 0:
             recommendations.append(
                 f"4. CRYPTOCURRENCY: {crypto_count} transaction(s) involve cryptocurrency exchanges. "
@@ -429,11 +465,8 @@ class PDFReportGenerator:
             )
         
         # Check for foreign transactions
-        foreign_count = sum(
-            1 for tx in transactions
-            if tx.country and tx.country != 'India'
-        )
-        if foreign_count > len(transactions) * 0.2:
+        foreign_count = int(np.count_nonzero(arrays.is_foreign))
+        if foreign_count > len(amounts) * 0.2:
             recommendations.append(
                 f"5. CROSS-BORDER: Significant volume of foreign transactions detected. "
                 f"Ensure compliance with international sanctions and wire transfer rules."
@@ -468,3 +501,27 @@ class PDFReportGenerator:
 
 # Singleton instance
 report_generator = PDFReportGenerator()
+
+
+def render_compliance_report(
+    transactions: List[Transaction],
+    risk_results: Dict[str, Dict[str, Any]],
+    regulations: List[Dict[str, Any]],
+    path: str
+) -> int:
+    """
+    Render a compliance report with the module-level generator into a file.
+    
+    Kept at module level so it can be submitted to a process pool;
+    all arguments must be picklable. The report is written to disk rather
+    than returned, so it is never pickled back to the caller.
+    
+    Returns:
+        Size of the written report in bytes
+    """
+    with open(path, "wb") as file:
+        report_generator.write_compliance_report(file, transactions, risk_results, regulations)
+        size = file.tell()
+    
+    logger.info(f"Generated PDF report: {path} ({size} bytes)")
+    return size
@@ -3,22 +3,34 @@
 This module provides:
 - Async retrieval support
 - Vector store abstraction
+- Loaded index cached across queries, reloaded when the index is rebuilt
+- Batched retrieval (at most one embedding request and one index search per batch)
+- Bounded number of concurrent index searches
 - Easy extension for different retrieval methods
 - Error handling and logging
 """
-from typing import List, Optional, Protocol, Any
+from typing import List, Optional, Protocol, Any, Sequence
 import logging
 import asyncio
+import os
+import threading
 
+import numpy as np
+
+from app.rag.embeddings import QueryEmbeddingCache, get_embeddings_model
 from app.rag.vectorstore import VectorStoreManager, VectorStoreManagerProtocol
 
 logger = logging.getLogger(__name__)
 
+# Files FAISS.save_local writes for the default index name
+_INDEX_FILES = ("index.faiss", "index.pkl")
+
 
 class VectorStoreProtocol(Protocol):
     """Protocol for vector store."""
     
     def similarity_search(self, query: str, k: int = 3) -> List[Any]: ...
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 3) -> List[Any]: ...
 
 
 class RegulationRetriever:
@@ -35,7 +47,9 @@ class RegulationRetriever:
     def __init__(
         self,
         index_path: str = None,
-        vectorstore_manager: Optional[VectorStoreManagerProtocol] = None
+        vectorstore_manager: Optional[VectorStoreManagerProtocol] = None,
+        max_concurrent_searches: Optional[int] = None,
+        query_cache_size: int = 10_000
     ):
         """
         Initialize the retriever.
@@ -43,11 +57,23 @@ class RegulationRetriever:
         Args:
             index_path: Path to FAISS vectorstore. Defaults to config value.
             vectorstore_manager: Optional custom vectorstore manager.
+            max_concurrent_searches: Searches allowed in worker threads at
+                once. Defaults to the CPU count.
+            query_cache_size: Query embeddings kept to skip repeat API calls
         """
         self.index_path = index_path
         self._vectorstore_manager = vectorstore_manager
         self._initialized = False
         self._lock = asyncio.Lock()
+        # Index searches are CPU and memory-bandwidth bound; more of them
+        # in flight than there are cores only adds contention
+        self._search_slots = asyncio.Semaphore(max_concurrent_searches or os.cpu_count() or 1)
+        self._query_embeddings = QueryEmbeddingCache(query_cache_size)
+        # Loaded index and the build it came from; retrieval runs in worker
+        # threads, so loading is guarded by a thread lock
+        self._vectorstore = None
+        self._vectorstore_version: Optional[str] = None
+        self._load_lock = threading.Lock()
     
     async def initialize(self) -> None:
         """Initialize the retriever asynchronously."""
@@ -59,7 +85,11 @@ class RegulationRetriever:
                 return
             
             logger.info("Initializing RegulationRetriever")
-            # Any async initialization can go here
+            loop = asyncio.get_event_loop()
+            try:
+                await loop.run_in_executor(None, self._get_vectorstore)
+            except FileNotFoundError as e:
+                logger.warning(f"Vectorstore not found: {e}. Fallback regulations will be used.")
             self._initialized = True
     
     def _get_vectorstore_manager(self) -> VectorStoreManager:
@@ -68,13 +98,77 @@ class RegulationRetriever:
             self._vectorstore_manager = VectorStoreManager(self.index_path)
         return self._vectorstore_manager
     
-    def retrieve_sync(self, query: str, top_k: int = 3) -> List[str]:
+    def _get_vectorstore(self) -> VectorStoreProtocol:
+        """
+        Get the loaded vectorstore, loading it on first use or after a rebuild.
+        
+        Raises:
+            FileNotFoundError: If vectorstore not found
+        """
+        version = self.get_index_version()
+        if self._vectorstore is not None and self._vectorstore_version == version:
+            return self._vectorstore
+        
+        with self._load_lock:
+            if self._vectorstore is None or self._vectorstore_version != version:
+                self._vectorstore = self._get_vectorstore_manager().load_vectorstore()
+                self._vectorstore_version = version
+            return self._vectorstore
+    
+    def get_index_version(self) -> str:
+        """
+        Identify the current vectorstore build.
+        
+        Changes whenever the index is saved, so callers can invalidate
+        anything cached against the previous index. Saving rewrites the
+        index files in place, which leaves the directory's own mtime
+        unchanged, so the version is taken from the files themselves.
+        """
+        path = self._get_vectorstore_manager().vector_db_path
+        try:
+            stats = [os.stat(os.path.join(path, name)) for name in _INDEX_FILES]
+        except FileNotFoundError:
+            return "fallback"
+        return path + "@" + ",".join(f"{stat.st_mtime_ns}:{stat.st_size}" for stat in stats)
+    
+    def embed_query(self, query: str) -> Optional[List[float]]:
+        """
+        Embed a query with the model backing the vectorstore.
+        
+        Returns None when no vectorstore exists, since results then come
+        from the static fallback and no embedding is needed.
+        """
+        if not os.path.exists(self._get_vectorstore_manager().vector_db_path):
+            return None
+        embedding = self._query_embeddings.get(query)
+        if embedding is None:
+            embedding = get_embeddings_model().embed_query(query)
+            self._query_embeddings.put(query, embedding)
+        return embedding
+    
+    async def embed_query_async(self, query: str) -> Optional[List[float]]:
+        """Asynchronous variant of embed_query, using the async OpenAI client."""
+        if not os.path.exists(self._get_vectorstore_manager().vector_db_path):
+            return None
+        embedding = self._query_embeddings.get(query)
+        if embedding is None:
+            embedding = await get_embeddings_model().aembed_query(query)
+            self._query_embeddings.put(query, embedding)
+        return embedding
+    
+    def retrieve_sync(
+        self,
+        query: str,
+        top_k: int = 3,
+        embedding: Optional[Sequence[float]] = None
+    ) -> List[str]:
         """
         Synchronous retrieval of relevant regulations.
         
         Args:
             query: Search query string
             top_k: Number of results to return
+            embedding: Precomputed query embedding, skips re-embedding the query
             
         Returns:
             List of page content strings from relevant documents
@@ -84,10 +178,12 @@ class RegulationRetriever:
             RuntimeError: If retrieval fails
         """
         try:
-            manager = self._get_vectorstore_manager()
-            vectorstore = manager.load_vectorstore()
+            vectorstore = self._get_vectorstore()
             
-            docs = vectorstore.similarity_search(query, k=top_k)
+            if embedding is not None:
+                docs = vectorstore.similarity_search_by_vector(list(embedding), k=top_k)
+            else:
+                docs = vectorstore.similarity_search(query, k=top_k)
             
             results = [doc.page_content for doc in docs]
             logger.info(f"Retrieved {len(results)} documents for query: {query[:50]}...")
@@ -101,7 +197,12 @@ class RegulationRetriever:
             logger.error(f"Failed to retrieve regulations: {e}")
             raise RuntimeError(f"Retrieval failed: {e}")
     
-    async def retrieve(self, query: str, top_k: int = 3) -> List[str]:
+    async def retrieve(
+        self,
+        query: str,
+        top_k: int = 3,
+        embedding: Optional[Sequence[float]] = None
+    ) -> List[str]:
         """
         Asynchronous retrieval of relevant regulations.
         
@@ -110,13 +211,92 @@ class RegulationRetriever:
         Args:
             query: Search query string
             top_k: Number of results to return
+            embedding: Precomputed query embedding, skips re-embedding the query
             
         Returns:
             List of page content strings from relevant documents
         """
         # Run sync operation in thread pool to avoid blocking
         loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self.retrieve_sync, query, top_k)
+        async with self._search_slots:
+            return await loop.run_in_executor(None, self.retrieve_sync, query, top_k, embedding)
+    
+    async def retrieve_batch(self, queries: Sequence[str], top_k: int = 3) -> List[List[str]]:
+        """
+        Asynchronous retrieval for several queries at once.
+        
+        Queries missing from the query embedding cache are embedded in a
+        single request on the async OpenAI client, and all of them are
+        searched with a single index call in a worker thread, which costs
+        far less than one search per query.
+        
+        Args:
+            queries: Search query strings
+            top_k: Number of results to return per query
+            
+        Returns:
+            One list of page content strings per query, in query order
+            
+        Raises:
+            RuntimeError: If retrieval fails
+        """
+        loop = asyncio.get_event_loop()
+        try:
+            vectorstore = await loop.run_in_executor(None, self._get_vectorstore)
+            embeddings = await self._embed_queries_async(queries)
+            async with self._search_slots:
+                results = await loop.run_in_executor(
+                    None, self._search_by_vectors, vectorstore, embeddings, top_k
+                )
+            logger.info(f"Retrieved documents for a batch of {len(queries)} queries")
+            return results
+            
+        except FileNotFoundError as e:
+            logger.warning(f"Vectorstore not found: {e}. Returning empty results.")
+            return [self._get_fallback_regulations() for _ in queries]
+        except Exception as e:
+            logger.error(f"Failed to retrieve regulations: {e}")
+            raise RuntimeError(f"Retrieval failed: {e}")
+    
+    async def _embed_queries_async(self, queries: Sequence[str]) -> List[Sequence[float]]:
+        """Embed queries through the query cache, requesting only the misses in one call."""
+        embeddings = [self._query_embeddings.get(query) for query in queries]
+        missing = [position for position, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            fresh = await get_embeddings_model().aembed_documents([queries[position] for position in missing])
+            for position, embedding in zip(missing, fresh):
+                embeddings[position] = embedding
+                self._query_embeddings.put(queries[position], embedding)
+        return embeddings
+    
+    def _search_by_vectors(
+        self,
+        vectorstore: VectorStoreProtocol,
+        embeddings: Sequence[Sequence[float]],
+        top_k: int
+    ) -> List[List[str]]:
+        """Search the FAISS index with a (batch, dim) matrix of query vectors."""
+        index = getattr(vectorstore, "index", None)
+        if index is None:
+            # Not a FAISS-backed store; search vector by vector
+            return [
+                [doc.page_content for doc in vectorstore.similarity_search_by_vector(list(vector), k=top_k)]
+                for vector in embeddings
+            ]
+        
+        queries = np.asarray(embeddings, dtype=np.float32)
+        if getattr(vectorstore, "_normalize_L2", False):
+            import faiss
+            faiss.normalize_L2(queries)
+        
+        _, indices = index.search(queries, top_k)
+        return [
+            [
+                vectorstore.docstore.search(vectorstore.index_to_docstore_id[i]).page_content
+                for i in row if i != -1
+            ]
+            for row in indices.tolist()
+        ]
     
     def search_regulations(self, query: str, top_k: int = 3) -> List[dict]:
         """
@@ -132,18 +312,24 @@ class RegulationRetriever:
         results = self.retrieve_sync(query, top_k)
         return [{"content": r, "source": "faiss"} for r in results]
     
-    async def search_regulations_async(self, query: str, top_k: int = 3) -> List[dict]:
+    async def search_regulations_async(
+        self,
+        query: str,
+        top_k: int = 3,
+        embedding: Optional[Sequence[float]] = None
+    ) -> List[dict]:
         """
         Search regulations by query (async).
         
         Args:
             query: Search query
             top_k: Number of results
+            embedding: Precomputed query embedding, skips re-embedding the query
             
         Returns:
             List of regulation dictionaries
         """
-        results = await self.retrieve(query, top_k)
+        results = await self.retrieve(query, top_k, embedding)
         return [{"content": r, "source": "faiss"} for r in results]
     
     def _get_fallback_regulations(self) -> List[str]:
@@ -174,4 +360,5 @@ class RegulationRetriever:
         return {
             "initialized": self._initialized,
             "index_path": self.index_path,
+            "query_embeddings": self._query_embeddings.get_stats(),
         }
@@ -0,0 +1,135 @@
+"""Response Cache Service - Reuses compliance explanations for similar transactions.
+
+This module provides:
+- Canonical feature keys (country, merchant type, amount and device score buckets)
+- Reuse only when the risk level and risk factors match
+- LRU eviction with a bounded number of entries
+- TTL expiry so explanations are regenerated periodically
+- Hit/miss/eviction counters
+"""
+import logging
+import time
+from collections import OrderedDict
+from typing import FrozenSet, Iterable, Optional, Tuple
+
+from app.models.transaction_model import Transaction
+
+logger = logging.getLogger(__name__)
+
+
+def bucketed_features(transaction: Transaction) -> Tuple[str, str, float, float]:
+    """
+    Get the transaction features cached explanations are shared on.
+
+    Amounts are bucketed to the nearest hundred and device scores to one
+    decimal, so transactions that differ only in small amounts share an entry.
+    Prompts for cacheable explanations must be built from these features only,
+    or a cached explanation could name another customer's transaction.
+
+    Returns:
+        Tuple of (country, merchant type, amount bucket, device score bucket)
+    """
+    return (
+        transaction.country,
+        transaction.merchant_type,
+        round(transaction.amount, -2),
+        round(transaction.device_risk_score, 1),
+    )
+
+
+def feature_key(transaction: Transaction) -> str:
+    """Build the cache key for a transaction from its bucketed features."""
+    return "|".join(str(feature) for feature in bucketed_features(transaction))
+
+
+class ResponseCache:
+    """
+    LRU cache of compliance explanations keyed by transaction features.
+
+    Each entry remembers the risk level and risk factors it was generated
+    for; risk is still assessed exactly on every request, and an entry is
+    only reused when both agree. Amount buckets can straddle a rule
+    threshold, so the level alone does not guarantee the explanation covers
+    the same reasons.
+    """
+
+    def __init__(self, max_entries: int = 2000, ttl_seconds: float = 600):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached explanations
+            ttl_seconds: Seconds before an entry expires
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, str, FrozenSet[str], str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str, risk_level: str, factors: Iterable[str] = ()) -> Optional[str]:
+        """
+        Look up the explanation cached for a key, risk level and risk factors.
+
+        Args:
+            key: Feature key from feature_key()
+            risk_level: Risk level assessed for the current transaction
+            factors: Risk factors assessed for the current transaction
+
+        Returns:
+            Cached explanation, or None on a miss
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            stored_at, cached_level, cached_factors, explanation = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+            elif cached_level == risk_level and cached_factors == frozenset(factors):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return explanation
+
+        self.misses += 1
+        return None
+
+    def contains(self, key: str) -> bool:
+        """Check for an unexpired entry without touching LRU order or counters."""
+        entry = self._entries.get(key)
+        return entry is not None and time.monotonic() - entry[0] <= self.ttl_seconds
+
+    def put(
+        self,
+        key: str,
+        risk_level: str,
+        explanation: str,
+        factors: Iterable[str] = ()
+    ) -> None:
+        """
+        Store an explanation, evicting the least recently used entry if full.
+
+        Args:
+            key: Feature key from feature_key()
+            risk_level: Risk level the explanation was generated for
+            explanation: Compliance explanation text
+            factors: Risk factors the explanation was generated for
+        """
+        self._entries[key] = (time.monotonic(), risk_level, frozenset(factors), explanation)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._entries.clear()
+
+    def get_stats(self) -> dict:
+        """Get cache statistics."""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
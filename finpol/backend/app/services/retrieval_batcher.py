@@ -0,0 +1,180 @@
+"""Retrieval Batcher Service - Coalesces concurrent regulation retrievals.
+
+This module provides:
+- An asyncio queue that collects retrieval requests from concurrent handlers
+- A background task that drains up to a batch size (or a short wait) per tick
+- One batched embedding request and FAISS search per tick
+- Per-request futures resolved with each query's slice of the results
+- A short-lived memo of results per query and index version
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import List, Optional, Protocol, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class BatchRetrieverProtocol(Protocol):
+    """Retriever surface used by the batcher."""
+
+    async def retrieve_batch(self, queries: Sequence[str], top_k: int = 3) -> List[List[str]]: ...
+
+
+class RetrievalBatcher:
+    """
+    Micro-batcher in front of the regulation retriever.
+
+    The worker task and queue are created on first use and belong to the
+    running event loop; they are recreated if a different loop submits.
+
+    Analysis queries are built from country and merchant type only, so the
+    same few queries repeat constantly. Results are memoized per query and
+    tagged with the retriever's index version (when it exposes
+    get_index_version), so a rebuilt index is never served stale results.
+    """
+
+    def __init__(
+        self,
+        retriever: BatchRetrieverProtocol,
+        max_batch_size: int = 32,
+        max_wait_seconds: float = 0.01,
+        cache_size: int = 4096,
+        cache_ttl_seconds: float = 300
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            retriever: Retriever that performs the batched search
+            max_batch_size: Maximum queries searched together
+            max_wait_seconds: How long the first query in a batch waits for others
+            cache_size: Maximum memoized queries (0 disables the memo)
+            cache_ttl_seconds: Seconds before a memoized result expires
+        """
+        self._retriever = retriever
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self.cache_size = cache_size
+        self.cache_ttl_seconds = cache_ttl_seconds
+        # query -> (stored_at, index_version, top_k, results)
+        self._memo: "OrderedDict[str, Tuple[float, Optional[str], int, Tuple[str, ...]]]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.batches = 0
+        self.queries = 0
+        self.cache_hits = 0
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        """Start the worker task on the running loop if needed."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run(self._queue))
+        return self._queue
+
+    async def submit(self, query: str, top_k: int = 3) -> List[str]:
+        """
+        Retrieve regulations for a query as part of the next batch.
+
+        Args:
+            query: Search query string
+            top_k: Number of results to return
+
+        Returns:
+            List of page content strings from relevant documents
+        """
+        version = self._index_version()
+        entry = self._memo.get(query)
+        if entry is not None:
+            stored_at, cached_version, cached_k, results = entry
+            if (
+                cached_version == version
+                and cached_k >= top_k
+                and time.monotonic() - stored_at <= self.cache_ttl_seconds
+            ):
+                self._memo.move_to_end(query)
+                self.cache_hits += 1
+                return list(results[:top_k])
+            del self._memo[query]
+
+        future = asyncio.get_running_loop().create_future()
+        self._ensure_worker().put_nowait((query, top_k, future))
+        results = await future
+        self._remember(query, version, top_k, tuple(results))
+        return results
+
+    def _index_version(self) -> Optional[str]:
+        """Current index version of the retriever, if it reports one."""
+        get_version = getattr(self._retriever, "get_index_version", None)
+        return get_version() if get_version is not None else None
+
+    def _remember(self, query: str, version: Optional[str], top_k: int, results: Tuple[str, ...]) -> None:
+        """Memoize a query's results, evicting the least recently used if full."""
+        if self.cache_size <= 0:
+            return
+        self._memo[query] = (time.monotonic(), version, top_k, results)
+        self._memo.move_to_end(query)
+        while len(self._memo) > self.cache_size:
+            self._memo.popitem(last=False)
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        """Drain the queue in batches until cancelled."""
+        while True:
+            batch = await self._collect(queue)
+            await self._search(batch)
+
+    async def _collect(self, queue: asyncio.Queue) -> List[Tuple[str, int, asyncio.Future]]:
+        """Wait for one request, then gather more until the batch is full or the wait expires."""
+        batch = [await queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait_seconds
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _search(self, batch: List[Tuple[str, int, asyncio.Future]]) -> None:
+        """Run one batched search and resolve each request's future."""
+        # Search once with the largest k and trim each request to its own k
+        top_k = max(k for _, k, _ in batch)
+        queries = [query for query, _, _ in batch]
+
+        try:
+            results = await self._retriever.retrieve_batch(queries, top_k)
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.queries += len(batch)
+        for (_, k, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result[:k])
+
+    def close(self) -> None:
+        """Stop the worker task."""
+        if self._worker is not None:
+            if not self._loop.is_closed():
+                self._worker.cancel()
+            self._worker = None
+
+    def get_stats(self) -> dict:
+        """Get batching statistics."""
+        return {
+            "batches": self.batches,
+            "queries": self.queries,
+            "cache_hits": self.cache_hits,
+            "cached_queries": len(self._memo),
+        }
@@ -2,18 +2,23 @@
 
 This module provides:
 - Rule-based risk assessment
+- Vectorized batch assessment over pandas DataFrames
 - Async evaluation support for scalability
 - Easy extension for ML-based risk models
 - Clear abstraction layer for future ML integration
 """
-from app.models.transaction_model import Transaction
+from app.models.transaction_model import Transaction, TxnCore
 from app.models.risk_response_model import RiskResult, RiskResponse
 from app.config import settings
-from typing import List, Dict, Any, Optional
-from enum import Enum
+from app.core.constants import RISK_CODE_REVIEW
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Union
+from enum import Enum, IntFlag
 from abc import ABC, abstractmethod
 import logging
 
+import numpy as np
+import pandas as pd
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,12 +30,47 @@ class RiskLevel(str, Enum):
     CRITICAL = "Critical"
 
 
+class RiskFactor(IntFlag):
+    """
+    Bit per built-in rule, so the factors behind an assessment can be
+    combined and tested with integer operations instead of matching reason text.
+    """
+    NONE = 0
+    HIGH_AMOUNT = 1
+    CRYPTO_EXCHANGE = 2
+    FOREIGN_HIGH_VALUE = 4
+    HIGH_DEVICE_RISK = 8
+
+
+# Severity rank per level; batch assessment works on these integer ranks
+SEVERITY_ORDER = [RiskLevel.LOW, RiskLevel.MEDIUM, RiskLevel.HIGH, RiskLevel.CRITICAL]
+LEVEL_SCORES = {
+    RiskLevel.LOW: 25,
+    RiskLevel.MEDIUM: 60,
+    RiskLevel.HIGH: 85,
+    RiskLevel.CRITICAL: 95
+}
+
+_SEVERITY_RANK = {level: rank for rank, level in enumerate(SEVERITY_ORDER)}
+_MANUAL_REVIEW_LEVELS = frozenset((RiskLevel.HIGH, RiskLevel.CRITICAL))
+
+# Reason reported by CryptoExchangeRule; matched exactly by callers that
+# react to crypto exposure
+CRYPTO_EXCHANGE_REASON = "Crypto exchange merchant type"
+
+_RANK_LEVELS = np.array([level.value for level in SEVERITY_ORDER], dtype=object)
+_RANK_SCORES = np.array([LEVEL_SCORES[level] for level in SEVERITY_ORDER], dtype=np.int32)
+
+
 class RiskRule(ABC):
     """Abstract base class for risk rules.
     
     Allows easy extension with ML-based rules in the future.
     """
     
+    # Flag set on transactions this rule matches (custom rules may leave it unset)
+    factor: RiskFactor = RiskFactor.NONE
+    
     @property
     @abstractmethod
     def name(self) -> str:
@@ -38,9 +78,31 @@ class RiskRule(ABC):
         pass
     
     @abstractmethod
-    def evaluate(self, transaction: Transaction) -> Optional[tuple[str, RiskLevel]]:
-        """Evaluate the rule against a transaction."""
+    def evaluate(self, transaction: Union[Transaction, TxnCore]) -> Optional[tuple[str, RiskLevel]]:
+        """
+        Evaluate the rule against a transaction.
+        
+        assess_transactions passes the original transactions; assess_batch
+        on a bare DataFrame passes TxnCore records, so rules should only
+        read the fields TxnCore carries.
+        """
         pass
+    
+    def evaluate_batch(
+        self,
+        frame: pd.DataFrame
+    ) -> Optional[Tuple[np.ndarray, List[str], RiskLevel]]:
+        """
+        Evaluate the rule against every row of a DataFrame at once.
+        
+        Args:
+            frame: One row per transaction, columns named like Transaction fields
+            
+        Returns:
+            (matched-row mask, reasons for matched rows in order, level),
+            or None if the rule has no vectorized form
+        """
+        return None
 
 
 class RiskEngineProtocol(ABC):
@@ -136,8 +198,7 @@ class RiskEngine(RiskEngineProtocol):
     def _evaluate_internal(self, transaction: Transaction) -> Dict[str, Any]:
         """Internal evaluation logic."""
         reasons: List[str] = []
-        severity_order = [RiskLevel.LOW, RiskLevel.MEDIUM, RiskLevel.HIGH, RiskLevel.CRITICAL]
-        current_level = RiskLevel.LOW
+        current_rank = 0
         
         # Apply all rules - highest severity wins
         for rule in self._rules:
@@ -146,11 +207,11 @@ class RiskEngine(RiskEngineProtocol):
                 if rule_result:
                     reason, level = rule_result
                     reasons.append(reason)
-                    if severity_order.index(level) > severity_order.index(current_level):
-                        current_level = level
+                    current_rank = max(current_rank, _SEVERITY_RANK[level])
             except Exception as e:
                 logger.error(f"Error evaluating rule {rule.name}: {e}")
         
+        current_level = SEVERITY_ORDER[current_rank]
         return {
             "risk_score": current_level.value,
             "risk_level": current_level,
@@ -186,6 +247,7 @@ class RiskEngine(RiskEngineProtocol):
         return RiskResult(
             risk_score=risk_score,
             risk_level=evaluation["risk_level"].value,
+            risk_code=_SEVERITY_RANK[evaluation["risk_level"]],
             factors=evaluation["reasons"],
             recommendations=recommendations
         )
@@ -211,38 +273,152 @@ class RiskEngine(RiskEngineProtocol):
         return RiskResult(
             risk_score=risk_score,
             risk_level=evaluation["risk_level"].value,
+            risk_code=_SEVERITY_RANK[evaluation["risk_level"]],
             factors=evaluation["reasons"],
             recommendations=recommendations
         )
     
+    def assess_batch(
+        self,
+        frame: pd.DataFrame,
+        rows: Optional[Sequence[Union[Transaction, TxnCore]]] = None
+    ) -> pd.DataFrame:
+        """
+        Assess every transaction in a DataFrame in one pass.
+        
+        Rules with a vectorized form are applied as column operations;
+        any other rule falls back to per-row evaluation. Results match
+        assess_risk row for row.
+        
+        Args:
+            frame: One row per transaction with amount, country,
+                merchant_type and device_risk_score columns
+            rows: Transactions handed to per-row rules, in frame order
+                (built from the frame as TxnCore records when omitted)
+            
+        Returns:
+            DataFrame indexed like the input with risk_score, risk_level,
+            risk_code, risk_factors (RiskFactor bits) and reasons columns
+        
+        Raises:
+            ValueError: If rows are omitted, a rule needs them and the frame
+                lacks a column TxnCore requires (user_id, timestamp)
+        """
+        size = len(frame)
+        ranks = np.zeros(size, dtype=np.int8)
+        factors = np.zeros(size, dtype=np.uint32)
+        reasons: List[List[str]] = [[] for _ in range(size)]
+        
+        for rule in self._rules:
+            try:
+                batch = rule.evaluate_batch(frame)
+            except Exception as e:
+                logger.error(f"Error evaluating rule {rule.name}: {e}")
+                continue
+            
+            if batch is None:
+                # Built outside the rule's error handling: a frame missing
+                # fields must fail loudly, not silently drop the rule
+                if rows is None:
+                    rows = [TxnCore.from_record(record) for record in frame.to_dict("records")]
+                for position, (reason, level) in self._evaluate_rows(rule, rows).items():
+                    ranks[position] = max(ranks[position], _SEVERITY_RANK[level])
+                    factors[position] |= rule.factor
+                    reasons[position].append(reason)
+                continue
+            
+            try:
+                mask, rule_reasons, level = batch
+                ranks[mask] = np.maximum(ranks[mask], _SEVERITY_RANK[level])
+                factors[mask] |= rule.factor
+                for position, reason in zip(np.flatnonzero(mask), rule_reasons):
+                    reasons[position].append(reason)
+            except Exception as e:
+                logger.error(f"Error evaluating rule {rule.name}: {e}")
+        
+        logger.info(f"Batch risk assessment complete for {size} transactions")
+        
+        return pd.DataFrame(
+            {
+                "risk_score": _RANK_SCORES[ranks],
+                "risk_level": _RANK_LEVELS[ranks],
+                "risk_code": ranks,
+                "risk_factors": factors,
+                "reasons": reasons,
+            },
+            index=frame.index
+        )
+    
+    def assess_transactions(self, transactions: List[Transaction]) -> pd.DataFrame:
+        """
+        Assess a list of transactions in one vectorized pass.
+        
+        Args:
+            transactions: Transactions to evaluate
+            
+        Returns:
+            DataFrame with one row per transaction, in order, and
+            risk_score, risk_level, risk_code, risk_factors and reasons columns
+        """
+        # Only vectorized rules read the frame; per-row rules get the
+        # transactions themselves, with every field assess_risk would see
+        frame = pd.DataFrame({
+            "amount": np.fromiter((tx.amount for tx in transactions), dtype=np.float64, count=len(transactions)),
+            "country": [tx.country for tx in transactions],
+            "merchant_type": [tx.merchant_type for tx in transactions],
+            "device_risk_score": np.fromiter(
+                (tx.device_risk_score for tx in transactions), dtype=np.float64, count=len(transactions)
+            ),
+        })
+        return self.assess_batch(frame, rows=transactions)
+    
+    def _evaluate_rows(
+        self,
+        rule: RiskRule,
+        rows: Sequence[Union[Transaction, TxnCore]]
+    ) -> Dict[int, tuple[str, RiskLevel]]:
+        """
+        Evaluate a non-vectorized rule row by row, keyed by row position.
+        
+        A row the rule fails on is skipped, as in _evaluate_internal, so
+        the rule still applies to every other row.
+        """
+        matches = {}
+        for position, transaction in enumerate(rows):
+            try:
+                rule_result = rule.evaluate(transaction)
+            except Exception as e:
+                logger.error(f"Error evaluating rule {rule.name}: {e}")
+                continue
+            if rule_result:
+                matches[position] = rule_result
+        return matches
+    
     def _level_to_score(self, level: RiskLevel) -> int:
         """Convert risk level to numeric score."""
-        mapping = {
-            RiskLevel.LOW: 25,
-            RiskLevel.MEDIUM: 60,
-            RiskLevel.HIGH: 85,
-            RiskLevel.CRITICAL: 95
-        }
-        return mapping.get(level, 0)
+        return LEVEL_SCORES.get(level, 0)
     
     def _generate_recommendations(self, level: RiskLevel, reasons: List[str]) -> List[str]:
         """Generate recommendations based on risk factors."""
         recommendations = []
+        # Lowercase the reasons once; keywords contain no newlines, so a
+        # match in the joined text is a match within a single reason
+        text = "\n".join(reasons).lower()
         
-        if level in [RiskLevel.HIGH, RiskLevel.CRITICAL]:
+        if level in _MANUAL_REVIEW_LEVELS:
             recommendations.append("Transaction requires manual review")
             recommendations.append("Verify customer identity before processing")
         
-        if any("amount" in r.lower() for r in reasons):
+        if "amount" in text:
             recommendations.append("Confirm source of funds")
         
-        if any("crypto" in r.lower() for r in reasons):
+        if "crypto" in text:
             recommendations.append("Ensure compliance with crypto regulations")
         
-        if any("foreign" in r.lower() or "country" in r.lower() for r in reasons):
+        if "foreign" in text or "country" in text:
             recommendations.append("Verify cross-border compliance requirements")
         
-        if any("device" in r.lower() for r in reasons):
+        if "device" in text:
             recommendations.append("Request additional device verification")
         
         if not recommendations:
@@ -267,8 +443,8 @@ class RiskEngine(RiskEngineProtocol):
         Returns:
             RiskResponse model
         """
-        should_approve = assessment.risk_level in ["Low"]
-        requires_review = assessment.risk_level in ["Medium", "High", "Critical"]
+        should_approve = assessment.risk_code < RISK_CODE_REVIEW
+        requires_review = assessment.risk_code >= RISK_CODE_REVIEW
         
         return RiskResponse(
             transaction_id=transaction_id,
@@ -298,50 +474,81 @@ class RiskEngine(RiskEngineProtocol):
 class HighAmountRule(RiskRule):
     """Rule: amount > 1000000 → High"""
     
+    factor = RiskFactor.HIGH_AMOUNT
+    
     @property
     def name(self) -> str:
         return "HighAmountRule"
     
-    def evaluate(self, transaction: Transaction) -> Optional[tuple[str, RiskLevel]]:
+    def evaluate(self, transaction: Union[Transaction, TxnCore]) -> Optional[tuple[str, RiskLevel]]:
         if transaction.amount > 1000000:
             return "Transaction amount exceeds 1,000,000", RiskLevel.HIGH
         return None
+    
+    def evaluate_batch(self, frame: pd.DataFrame) -> Tuple[np.ndarray, List[str], RiskLevel]:
+        mask = frame["amount"].to_numpy() > 1000000
+        return mask, ["Transaction amount exceeds 1,000,000"] * int(mask.sum()), RiskLevel.HIGH
 
 
 class CryptoExchangeRule(RiskRule):
     """Rule: merchant_type == 'crypto_exchange' → Medium"""
     
+    factor = RiskFactor.CRYPTO_EXCHANGE
+    
     @property
     def name(self) -> str:
         return "CryptoExchangeRule"
     
-    def evaluate(self, transaction: Transaction) -> Optional[tuple[str, RiskLevel]]:
+    def evaluate(self, transaction: Union[Transaction, TxnCore]) -> Optional[tuple[str, RiskLevel]]:
         if transaction.merchant_type == "crypto_exchange":
-            return "Crypto exchange merchant type", RiskLevel.MEDIUM
+            return CRYPTO_EXCHANGE_REASON, RiskLevel.MEDIUM
         return None
+    
+    def evaluate_batch(self, frame: pd.DataFrame) -> Tuple[np.ndarray, List[str], RiskLevel]:
+        mask = (frame["merchant_type"] == "crypto_exchange").to_numpy()
+        return mask, [CRYPTO_EXCHANGE_REASON] * int(mask.sum()), RiskLevel.MEDIUM
 
 
 class ForeignHighValueRule(RiskRule):
     """Rule: country != 'India' AND amount > 500000 → High"""
     
+    factor = RiskFactor.FOREIGN_HIGH_VALUE
+    
     @property
     def name(self) -> str:
         return "ForeignHighValueRule"
     
-    def evaluate(self, transaction: Transaction) -> Optional[tuple[str, RiskLevel]]:
+    def evaluate(self, transaction: Union[Transaction, TxnCore]) -> Optional[tuple[str, RiskLevel]]:
         if transaction.country != "India" and transaction.amount > 500000:
             return f"High-value transaction ({transaction.amount}) from non-India country", RiskLevel.HIGH
         return None
+    
+    def evaluate_batch(self, frame: pd.DataFrame) -> Tuple[np.ndarray, List[str], RiskLevel]:
+        amounts = frame["amount"].to_numpy()
+        mask = (frame["country"] != "India").to_numpy() & (amounts > 500000)
+        reasons = [
+            f"High-value transaction ({amount}) from non-India country"
+            for amount in amounts[mask].tolist()
+        ]
+        return mask, reasons, RiskLevel.HIGH
 
 
 class HighDeviceRiskRule(RiskRule):
     """Rule: device_risk_score > 0.7 → Medium"""
     
+    factor = RiskFactor.HIGH_DEVICE_RISK
+    
     @property
     def name(self) -> str:
         return "HighDeviceRiskRule"
     
-    def evaluate(self, transaction: Transaction) -> Optional[tuple[str, RiskLevel]]:
+    def evaluate(self, transaction: Union[Transaction, TxnCore]) -> Optional[tuple[str, RiskLevel]]:
         if transaction.device_risk_score > 0.7:
             return f"High device risk score ({transaction.device_risk_score})", RiskLevel.MEDIUM
         return None
+    
+    def evaluate_batch(self, frame: pd.DataFrame) -> Tuple[np.ndarray, List[str], RiskLevel]:
+        scores = frame["device_risk_score"].to_numpy()
+        mask = scores > 0.7
+        reasons = [f"High device risk score ({score})" for score in scores[mask].tolist()]
+        return mask, reasons, RiskLevel.MEDIUM
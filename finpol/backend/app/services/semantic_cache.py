@@ -0,0 +1,197 @@
+"""Semantic Cache Service - Reuses regulation search results for similar queries.
+
+This module provides:
+- Exact-match lookup on normalized query strings
+- Near-duplicate lookup via cosine similarity over recent query embeddings
+- Per-index namespacing so a rebuilt vectorstore invalidates old entries
+- TTL expiry and bounded memory (ring buffer of slots)
+"""
+import logging
+import re
+import time
+from typing import Dict, List, Optional, Protocol, Sequence
+
+import numpy as np
+import orjson
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class SearchableRetrieverProtocol(Protocol):
+    """Retriever surface used by the semantic cache."""
+
+    def get_index_version(self) -> str: ...
+    async def embed_query_async(self, query: str) -> Optional[Sequence[float]]: ...
+    async def search_regulations_async(
+        self, query: str, top_k: int = 3, embedding: Optional[Sequence[float]] = None
+    ) -> List[dict]: ...
+
+
+def _normalize(query: str) -> str:
+    """Normalize case and whitespace so trivial variants share an entry."""
+    return _WHITESPACE.sub(" ", query).strip().lower()
+
+
+class SemanticCache:
+    """
+    Cache of serialized regulation search results.
+
+    Results are stored as JSON bytes so hits can be returned to the client
+    without re-serializing. Entries live in a fixed number of slots that are
+    overwritten oldest-first once the cache is full.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl_seconds: float = 3600,
+        similarity_threshold: float = 0.92
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached searches
+            ttl_seconds: Seconds before an entry expires
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self._namespace: Optional[str] = None
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        """Drop all entries."""
+        self._keys: List[Optional[str]] = [None] * self.max_entries
+        self._blobs: List[Optional[bytes]] = [None] * self.max_entries
+        self._stored_at = np.full(self.max_entries, -np.inf)
+        self._has_vector = np.zeros(self.max_entries, dtype=bool)
+        self._vectors: Optional[np.ndarray] = None
+        self._slots: Dict[str, int] = {}
+        self._next_slot = 0
+
+    async def get_or_search(
+        self,
+        query: str,
+        retriever: SearchableRetrieverProtocol,
+        top_k: int = 3
+    ) -> bytes:
+        """
+        Return cached results for the query, searching the retriever on a miss.
+
+        Args:
+            query: Search query
+            retriever: Retriever used for embedding and search on a miss
+            top_k: Number of results
+
+        Returns:
+            JSON-encoded list of regulation dictionaries
+        """
+        namespace = f"{retriever.get_index_version()}:{top_k}"
+        if namespace != self._namespace:
+            self._namespace = namespace
+            self._reset()
+
+        key = _normalize(query)
+        now = time.monotonic()
+
+        slot = self._slots.get(key)
+        if slot is not None and self._is_fresh(slot, now):
+            self.hits += 1
+            return self._blobs[slot]
+
+        embedding = await retriever.embed_query_async(query)
+        unit_vector = self._to_unit_vector(embedding)
+
+        if unit_vector is not None:
+            slot = self._nearest(unit_vector, now)
+            if slot is not None:
+                self.semantic_hits += 1
+                return self._blobs[slot]
+
+        self.misses += 1
+        results = await retriever.search_regulations_async(query, top_k, embedding=embedding)
+        blob = orjson.dumps(results)
+        self._store(key, unit_vector, blob, now)
+        return blob
+
+    def _is_fresh(self, slot: int, now: float) -> bool:
+        """Check whether a slot holds an unexpired entry."""
+        return now - self._stored_at[slot] <= self.ttl_seconds
+
+    def _to_unit_vector(self, embedding: Optional[Sequence[float]]) -> Optional[np.ndarray]:
+        """Convert an embedding to a normalized float32 vector."""
+        if embedding is None:
+            return None
+
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return None
+
+        if self._vectors is not None and self._vectors.shape[1] != vector.shape[0]:
+            # Embedding model changed underneath us; old vectors are not comparable
+            self._reset()
+        return vector / norm
+
+    def _nearest(self, vector: np.ndarray, now: float) -> Optional[int]:
+        """Find the most similar fresh entry above the similarity threshold."""
+        if self._vectors is None:
+            return None
+
+        candidates = self._has_vector & (now - self._stored_at <= self.ttl_seconds)
+        if not candidates.any():
+            return None
+
+        similarities = self._vectors @ vector
+        similarities[~candidates] = -np.inf
+        best = int(np.argmax(similarities))
+
+        if similarities[best] >= self.similarity_threshold:
+            return best
+        return None
+
+    def _store(self, key: str, vector: Optional[np.ndarray], blob: bytes, now: float) -> None:
+        """Write an entry into the next slot, evicting its previous occupant."""
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._next_slot
+            self._next_slot = (self._next_slot + 1) % self.max_entries
+
+            evicted = self._keys[slot]
+            if evicted is not None:
+                del self._slots[evicted]
+
+        self._keys[slot] = key
+        self._blobs[slot] = blob
+        self._stored_at[slot] = now
+        self._slots[key] = slot
+
+        if vector is None:
+            self._has_vector[slot] = False
+            return
+
+        if self._vectors is None:
+            self._vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+        self._vectors[slot] = vector
+        self._has_vector[slot] = True
+
+    def clear(self) -> None:
+        """Drop all entries and reset the namespace."""
+        self._namespace = None
+        self._reset()
+
+    def get_stats(self) -> dict:
+        """Get cache statistics."""
+        return {
+            "entries": len(self._slots),
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+        }
@@ -2,7 +2,8 @@
 
 import io
 import logging
-from typing import List, Dict, Any, Optional
+import re
+from typing import List, Dict, Any, Optional, Union, BinaryIO
 from datetime import datetime
 import csv
 
@@ -10,9 +11,15 @@ import pandas as pd
 from PyPDF2 import PdfReader
 
 from app.models.transaction_model import Transaction, TransactionType
+from app.utils.helpers import utc_now
 
 logger = logging.getLogger(__name__)
 
+# Compiled once at import; PDF parsing applies these to every statement line.
+# Match amounts like $1,234.56 or 1234.56
+_AMOUNT_PATTERN = re.compile(r'[\$€£]?(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)')
+_DATE_PATTERN = re.compile(r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})')
+
 
 class TransactionParser:
     """
@@ -38,53 +45,61 @@ class TransactionParser:
         'timestamp': ['date', 'timestamp', 'transaction_date', 'date_time', 'txn_date', 'value_date'],
     }
     
-    def parse_file(self, file_content: bytes, filename: str) -> List[Dict[str, Any]]:
+    # Rows per CSV chunk; bounds parser memory independently of file size
+    CSV_CHUNK_SIZE = 10_000
+    
+    def parse_file(self, file: Union[bytes, BinaryIO], filename: str) -> List[Dict[str, Any]]:
         """
         Parse a file and extract transactions.
         
         Args:
-            file_content: Raw file content
+            file: Readable binary file object (or raw bytes)
             filename: Name of the file (determines parser)
             
         Returns:
             List of transaction dictionaries
         """
+        if isinstance(file, (bytes, bytearray)):
+            file = io.BytesIO(file)
+        
         file_ext = filename.lower().split('.')[-1]
         
         logger.info(f"Parsing file: {filename} (extension: {file_ext})")
         
         if file_ext == 'csv':
-            return self._parse_csv(file_content)
+            return self._parse_csv(file)
         elif file_ext in ['xlsx', 'xls']:
-            return self._parse_excel(file_content)
+            return self._parse_excel(file)
         elif file_ext == 'pdf':
-            return self._parse_pdf(file_content)
+            return self._parse_pdf(file)
         else:
             raise ValueError(f"Unsupported file format: {file_ext}")
     
-    def _parse_csv(self, file_content: bytes) -> List[Dict[str, Any]]:
-        """Parse CSV file."""
+    def _parse_csv(self, file: BinaryIO) -> List[Dict[str, Any]]:
+        """Parse CSV file in fixed-size chunks."""
         try:
-            df = pd.read_csv(io.BytesIO(file_content))
-            return self._normalize_dataframe(df)
+            transactions = []
+            for chunk in pd.read_csv(file, chunksize=self.CSV_CHUNK_SIZE):
+                transactions.extend(self._normalize_dataframe(chunk))
+            return transactions
         except Exception as e:
             logger.error(f"Error parsing CSV: {e}")
             raise ValueError(f"Failed to parse CSV file: {str(e)}")
     
-    def _parse_excel(self, file_content: bytes) -> List[Dict[str, Any]]:
+    def _parse_excel(self, file: BinaryIO) -> List[Dict[str, Any]]:
         """Parse Excel file."""
         try:
             # Try reading all sheets
-            df = pd.read_excel(io.BytesIO(file_content), sheet_name=0)
+            df = pd.read_excel(file, sheet_name=0)
             return self._normalize_dataframe(df)
         except Exception as e:
             logger.error(f"Error parsing Excel: {e}")
             raise ValueError(f"Failed to parse Excel file: {str(e)}")
     
-    def _parse_pdf(self, file_content: bytes) -> List[Dict[str, Any]]:
+    def _parse_pdf(self, file: BinaryIO) -> List[Dict[str, Any]]:
         """Parse PDF bank statement (basic text extraction)."""
         try:
-            reader = PdfReader(io.BytesIO(file_content))
+            reader = PdfReader(file)
             transactions = []
             
             for page in reader.pages:
@@ -94,8 +109,9 @@ class TransactionParser:
                 lines = text.split('\n')
                 for line in lines:
                     # Look for lines with amounts (e.g., "$1,234.56" or "1,234.56")
-                    if self._looks_like_transaction(line):
-                        tx = self._extract_transaction_from_line(line)
+                    amount_match = _AMOUNT_PATTERN.search(line)
+                    if amount_match:
+                        tx = self._extract_transaction_from_line(line, amount_match)
                         if tx:
                             transactions.append(tx)
             
@@ -108,16 +124,17 @@ class TransactionParser:
     def _looks_like_transaction(self, line: str) -> bool:
         """Check if a line looks like a transaction."""
         # Look for currency patterns
-        import re
-        # Match patterns like $1,234.56 or 1234.56
-        return bool(re.search(r'[\$€£]?\d{1,3}(?:,\d{3})*(?:\.\d{2})?', line))
+        return bool(_AMOUNT_PATTERN.search(line))
     
-    def _extract_transaction_from_line(self, line: str) -> Optional[Dict[str, Any]]:
-        """Extract transaction data from a text line."""
-        import re
-        
+    def _extract_transaction_from_line(
+        self,
+        line: str,
+        amount_match: Optional[re.Match] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Extract transaction data from a text line, reusing an existing amount match if given."""
         # Try to extract amount
-        amount_match = re.search(r'[\$€£]?(\d{1,3}(?:,\d{3})*(?:\.\d{2})?)', line)
+        if amount_match is None:
+            amount_match = _AMOUNT_PATTERN.search(line)
         if not amount_match:
             return None
         
@@ -128,7 +145,7 @@ class TransactionParser:
             return None
         
         # Try to extract date (common formats)
-        date_match = re.search(r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})', line)
+        date_match = _DATE_PATTERN.search(line)
         timestamp = datetime.now()
         if date_match:
             try:
@@ -213,10 +230,14 @@ class TransactionParser:
         """
         transactions = []
         
+        # One clock read per upload rather than per row
+        now = utc_now()
+        date_prefix = now.strftime('%Y%m%d')
+        
         for idx, item in enumerate(data):
             try:
                 # Generate transaction ID
-                txn_id = f"TXN-{datetime.now().strftime('%Y%m%d')}-{idx+1:04d}"
+                txn_id = f"TXN-{date_prefix}-{idx+1:04d}"
                 
                 # Parse timestamp
                 timestamp = item.get('timestamp')
@@ -224,9 +245,9 @@ class TransactionParser:
                     try:
                         timestamp = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
                     except:
-                        timestamp = datetime.now()
+                        timestamp = now
                 elif timestamp is None:
-                    timestamp = datetime.now()
+                    timestamp = now
                 
                 # Determine transaction type
                 txn_type = item.get('transaction_type', 'transfer')
@@ -0,0 +1,434 @@
+"""Transaction Store Service - Storage for analyzed transactions.
+
+This module provides:
+- TransactionStore: columnar in-memory storage
+  - Struct-of-arrays layout (one column per field)
+  - Low-cardinality strings interned as int32 codes
+  - O(1) get/delete via an id -> row index map
+  - Newest-first pagination via a cached argsort over the timestamp column
+  - Tombstone deletes with periodic compaction
+- SQLiteTransactionStore: persistent storage shared across workers
+  - WAL journal, timestamp index for ordered pagination
+- Timestamps kept as epoch seconds, converted to UTC datetimes on read
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+import logging
+import sqlite3
+import threading
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+# Field order of materialized rows (matches TransactionResponse)
+FIELDS = (
+    "id",
+    "user_id",
+    "amount",
+    "currency",
+    "transaction_type",
+    "description",
+    "recipient_account",
+    "sender_account",
+    "country",
+    "merchant_type",
+    "device_risk_score",
+    "timestamp",
+    "risk_score",
+    "risk_level",
+)
+
+# Fields kept as Python object columns
+TEXT_FIELDS = (
+    "id",
+    "user_id",
+    "description",
+    "recipient_account",
+    "sender_account",
+)
+
+# Fields with few distinct values, stored as codes into a per-field vocabulary
+CATEGORICAL_FIELDS = (
+    "currency",
+    "transaction_type",
+    "country",
+    "merchant_type",
+    "risk_level",
+)
+
+_NUMERIC_COLUMNS = ("_timestamps", "_amounts", "_device_risk_scores", "_risk_scores", "_alive")
+
+
+def _to_epoch(timestamp: datetime) -> float:
+    """Convert a datetime to epoch seconds, treating naive values as UTC."""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.timestamp()
+
+
+def _from_epoch(seconds: float) -> datetime:
+    """Convert epoch seconds back to a UTC datetime."""
+    return datetime.fromtimestamp(seconds, timezone.utc)
+
+
+class TransactionStore:
+    """
+    Append-only columnar store for analyzed transactions.
+
+    Numeric fields live in numpy arrays that grow by doubling, so sorting
+    and pagination operate on contiguous columns instead of per-row dicts.
+    Rows are only materialized for the page being returned.
+    """
+
+    def __init__(self, initial_capacity: int = 1024):
+        """
+        Initialize an empty store.
+
+        Args:
+            initial_capacity: Number of rows to preallocate
+        """
+        self._capacity = max(initial_capacity, 1)
+        self._size = 0
+        self._live = 0
+
+        self._timestamps = np.empty(self._capacity, dtype=np.float64)
+        self._amounts = np.empty(self._capacity, dtype=np.float64)
+        self._device_risk_scores = np.empty(self._capacity, dtype=np.float64)
+        self._risk_scores = np.empty(self._capacity, dtype=np.int32)
+        self._alive = np.zeros(self._capacity, dtype=bool)
+        self._text: Dict[str, List[Any]] = {field: [] for field in TEXT_FIELDS}
+        self._codes = {field: np.empty(self._capacity, dtype=np.int32) for field in CATEGORICAL_FIELDS}
+        # Vocabularies only grow; codes stay valid across deletes and compaction
+        self._vocab: Dict[str, List[Any]] = {field: [] for field in CATEGORICAL_FIELDS}
+        self._code_of: Dict[str, Dict[Any, int]] = {field: {} for field in CATEGORICAL_FIELDS}
+
+        self._index: Dict[str, int] = {}
+        self._order: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return self._live
+
+    def __contains__(self, transaction_id: str) -> bool:
+        return transaction_id in self._index
+
+    def add(self, record: Dict[str, Any]) -> None:
+        """
+        Append a transaction record.
+
+        Args:
+            record: Transaction fields including id, timestamp, risk_score and risk_level
+        """
+        transaction_id = record["id"]
+        if transaction_id in self._index:
+            self.delete(transaction_id)
+
+        if self._size == self._capacity:
+            self._grow()
+
+        row = self._size
+        self._timestamps[row] = _to_epoch(record["timestamp"])
+        self._amounts[row] = record["amount"]
+        self._device_risk_scores[row] = record.get("device_risk_score", 0.0)
+        self._risk_scores[row] = record["risk_score"]
+        self._alive[row] = True
+        for field in TEXT_FIELDS:
+            self._text[field].append(record.get(field))
+        for field in CATEGORICAL_FIELDS:
+            self._codes[field][row] = self._intern(field, record.get(field))
+
+        self._index[transaction_id] = row
+        self._size += 1
+        self._live += 1
+        self._order = None
+
+    def get(self, transaction_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a transaction record by ID.
+
+        Args:
+            transaction_id: Transaction ID
+
+        Returns:
+            Record dictionary, or None if not found
+        """
+        row = self._index.get(transaction_id)
+        if row is None:
+            return None
+        return self._row(row)
+
+    def delete(self, transaction_id: str) -> bool:
+        """
+        Delete a transaction by ID.
+
+        Args:
+            transaction_id: Transaction ID
+
+        Returns:
+            True if a transaction was deleted
+        """
+        row = self._index.pop(transaction_id, None)
+        if row is None:
+            return False
+
+        self._alive[row] = False
+        self._live -= 1
+        self._order = None
+
+        # Reclaim space once tombstones outnumber live rows
+        if self._size - self._live > max(self._live, 64):
+            self._compact()
+        return True
+
+    def list(self, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        List transactions newest first.
+
+        Args:
+            limit: Maximum number of records to return
+            offset: Number of records to skip
+
+        Returns:
+            List of record dictionaries
+        """
+        if self._order is None:
+            live_rows = np.flatnonzero(self._alive[:self._size])
+            # Stable sort keeps insertion order among equal timestamps
+            newest_first = np.argsort(-self._timestamps[live_rows], kind="stable")
+            self._order = live_rows[newest_first]
+
+        offset = max(offset, 0)
+        limit = max(limit, 0)
+        return self._rows(self._order[offset:offset + limit])
+
+    def clear(self) -> None:
+        """Remove all transactions."""
+        self._size = 0
+        self._live = 0
+        self._alive[:] = False
+        self._text = {field: [] for field in TEXT_FIELDS}
+        self._index.clear()
+        self._order = None
+
+    def _intern(self, field: str, value: Any) -> int:
+        """Get the code for a categorical value, adding it to the vocabulary if new."""
+        codes = self._code_of[field]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(self._vocab[field])
+            self._vocab[field].append(value)
+        return code
+
+    def _row(self, row: int) -> Dict[str, Any]:
+        """Materialize a single row as a dictionary."""
+        values = {
+            "amount": float(self._amounts[row]),
+            "device_risk_score": float(self._device_risk_scores[row]),
+            "timestamp": _from_epoch(float(self._timestamps[row])),
+            "risk_score": int(self._risk_scores[row]),
+        }
+        for field, column in self._text.items():
+            values[field] = column[row]
+        for field, codes in self._codes.items():
+            values[field] = self._vocab[field][codes[row]]
+        return {field: values[field] for field in FIELDS}
+
+    def _rows(self, rows: np.ndarray) -> List[Dict[str, Any]]:
+        """Materialize rows as dictionaries, gathering each column once."""
+        positions = rows.tolist()
+        columns = {
+            "amount": self._amounts[rows].tolist(),
+            "device_risk_score": self._device_risk_scores[rows].tolist(),
+            "timestamp": [_from_epoch(seconds) for seconds in self._timestamps[rows].tolist()],
+            "risk_score": self._risk_scores[rows].tolist(),
+        }
+        for field, column in self._text.items():
+            columns[field] = [column[row] for row in positions]
+        for field, codes in self._codes.items():
+            vocab = self._vocab[field]
+            columns[field] = [vocab[code] for code in codes[rows].tolist()]
+
+        return [dict(zip(FIELDS, values)) for values in zip(*(columns[field] for field in FIELDS))]
+
+    def _grow(self) -> None:
+        """Double column capacity."""
+        self._capacity *= 2
+
+        def grown(column: np.ndarray) -> np.ndarray:
+            resized = np.zeros(self._capacity, dtype=column.dtype)
+            resized[:self._size] = column[:self._size]
+            return resized
+
+        for name in _NUMERIC_COLUMNS:
+            setattr(self, name, grown(getattr(self, name)))
+        for field, codes in self._codes.items():
+            self._codes[field] = grown(codes)
+
+    def _compact(self) -> None:
+        """Drop tombstoned rows and rebuild the index."""
+        keep = np.flatnonzero(self._alive[:self._size])
+
+        for column in [getattr(self, name) for name in _NUMERIC_COLUMNS] + list(self._codes.values()):
+            column[:keep.size] = column[keep]
+        self._alive[keep.size:] = False
+
+        for field, column in self._text.items():
+            self._text[field] = [column[row] for row in keep]
+
+        self._index = {transaction_id: row for row, transaction_id in enumerate(self._text["id"])}
+        self._size = keep.size
+        self._order = None
+        logger.debug(f"TransactionStore compacted to {self._size} rows")
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    seq INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    user_id TEXT,
+    amount REAL,
+    currency TEXT,
+    transaction_type TEXT,
+    description TEXT,
+    recipient_account TEXT,
+    sender_account TEXT,
+    country TEXT,
+    merchant_type TEXT,
+    device_risk_score REAL,
+    timestamp REAL,
+    risk_score INTEGER,
+    risk_level TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_timestamp ON transactions (timestamp DESC, seq);
+"""
+
+# Statements are fixed strings so sqlite3's statement cache reuses them
+_INSERT_SQL = f"INSERT OR REPLACE INTO transactions ({', '.join(FIELDS)}) VALUES ({', '.join('?' for _ in FIELDS)})"
+_GET_SQL = f"SELECT {', '.join(FIELDS)} FROM transactions WHERE id = ?"
+_LIST_SQL = f"SELECT {', '.join(FIELDS)} FROM transactions ORDER BY timestamp DESC, seq LIMIT ? OFFSET ?"
+_DELETE_SQL = "DELETE FROM transactions WHERE id = ?"
+_COUNT_SQL = "SELECT COUNT(*) FROM transactions"
+
+_TIMESTAMP_POSITION = FIELDS.index("timestamp")
+
+
+def sqlite_path_from_url(database_url: str) -> Optional[str]:
+    """
+    Extract the database path from a sqlite URL.
+    
+    Args:
+        database_url: URL such as sqlite:///./finpol.db
+        
+    Returns:
+        Filesystem path (or ":memory:"), or None for non-sqlite URLs
+    """
+    prefix = "sqlite://"
+    if not database_url.startswith(prefix):
+        return None
+    path = database_url[len(prefix):]
+    if path.startswith("/"):
+        path = path[1:]
+    return path or ":memory:"
+
+
+class SQLiteTransactionStore:
+    """
+    Persistent transaction store backed by sqlite.
+    
+    Unlike the in-memory store, every worker process sees the same rows.
+    Listing walks the timestamp index, so pagination needs no sort.
+    """
+    
+    def __init__(self, path: str):
+        """
+        Open (and create if needed) the store.
+        
+        Args:
+            path: sqlite database path, or ":memory:"
+        """
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SQLITE_SCHEMA)
+        logger.info(f"SQLiteTransactionStore opened at {path}")
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(_COUNT_SQL).fetchone()[0]
+    
+    def __contains__(self, transaction_id: str) -> bool:
+        return self.get(transaction_id) is not None
+    
+    def add(self, record: Dict[str, Any]) -> None:
+        """
+        Insert or replace a transaction record.
+        
+        Args:
+            record: Transaction fields including id, timestamp, risk_score and risk_level
+        """
+        values = [record.get(field) for field in FIELDS]
+        values[_TIMESTAMP_POSITION] = _to_epoch(record["timestamp"])
+        with self._lock:
+            self._conn.execute(_INSERT_SQL, values)
+    
+    def get(self, transaction_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a transaction record by ID.
+        
+        Args:
+            transaction_id: Transaction ID
+            
+        Returns:
+            Record dictionary, or None if not found
+        """
+        with self._lock:
+            row = self._conn.execute(_GET_SQL, (transaction_id,)).fetchone()
+        return None if row is None else self._record(row)
+    
+    def delete(self, transaction_id: str) -> bool:
+        """
+        Delete a transaction by ID.
+        
+        Args:
+            transaction_id: Transaction ID
+            
+        Returns:
+            True if a transaction was deleted
+        """
+        with self._lock:
+            return self._conn.execute(_DELETE_SQL, (transaction_id,)).rowcount > 0
+    
+    def list(self, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        """
+        List transactions newest first.
+        
+        Args:
+            limit: Maximum number of records to return
+            offset: Number of records to skip
+            
+        Returns:
+            List of record dictionaries
+        """
+        with self._lock:
+            rows = self._conn.execute(_LIST_SQL, (max(limit, 0), max(offset, 0))).fetchall()
+        return [self._record(row) for row in rows]
+    
+    def clear(self) -> None:
+        """Remove all transactions."""
+        with self._lock:
+            self._conn.execute("DELETE FROM transactions")
+    
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+    
+    def _record(self, row: tuple) -> Dict[str, Any]:
+        """Convert a result row to a record dictionary."""
+        record = dict(zip(FIELDS, row))
+        record["timestamp"] = _from_epoch(record["timestamp"])
+        return record
@@ -1,7 +1,9 @@
 """Helper utilities for the application."""
 from typing import Any, Dict
 import json
-from datetime import datetime
+import os
+import time
+from datetime import datetime, timezone
 
 
 def format_currency(amount: float, currency: str = "USD") -> str:
@@ -15,6 +17,23 @@ def validate_transaction_data(data: Dict[str, Any]) -> bool:
     return all(field in data for field in required_fields)
 
 
+def generate_id() -> str:
+    """
+    Generate a compact, time-sortable unique ID.
+    
+    16 bytes (8-byte nanosecond timestamp + 8 random bytes) as 32
+    upper-case hex characters. Hex digits are in ASCII order, so IDs sort
+    lexicographically by creation time; the encoding is done in C, unlike
+    the pure-Python base32 codecs.
+    """
+    return f"{time.time_ns():016X}{os.urandom(8).hex().upper()}"
+
+
+def utc_now() -> datetime:
+    """Get the current time as a timezone-aware UTC datetime."""
+    return datetime.now(timezone.utc)
+
+
 def serialize_datetime(obj: datetime) -> str:
     """Serialize datetime to ISO format."""
     return obj.isoformat()
@@ -0,0 +1,46 @@
+"""Shared test fixtures."""
+import pytest
+
+
+class FakeRetriever:
+    """Regulation retriever stub that records its searches.
+
+    Attributes:
+        version: Reported index version; change it to simulate a rebuild
+        embeddings: Query embeddings returned by embed_query_async
+        fail: Make retrieve_batch raise like an unavailable index
+        results_per_query: Results per batched query (defaults to top_k)
+        batches: (queries, top_k) for each retrieve_batch call
+        searches: (query, embedding) for each search_regulations_async call
+    """
+
+    def __init__(self):
+        self.version = "v1"
+        self.embeddings = {}
+        self.fail = False
+        self.results_per_query = None
+        self.batches = []
+        self.searches = []
+
+    def get_index_version(self):
+        return self.version
+
+    async def embed_query_async(self, query):
+        return self.embeddings.get(query)
+
+    async def retrieve_batch(self, queries, top_k=3):
+        self.batches.append((list(queries), top_k))
+        if self.fail:
+            raise RuntimeError("Retrieval failed: index unavailable")
+        count = self.results_per_query or top_k
+        return [[f"{query}-{i}" for i in range(count)] for query in queries]
+
+    async def search_regulations_async(self, query, top_k=3, embedding=None):
+        self.searches.append((query, embedding))
+        return [{"content": f"result for {query}", "source": "faiss"}]
+
+
+@pytest.fixture
+def fake_retriever():
+    """A fresh FakeRetriever for each test."""
+    return FakeRetriever()
@@ -8,6 +8,23 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.main import app
+from app.dependencies import get_compliance_generator, get_response_cache
+from app.services.compliance_generator import ComplianceGenerator, LLMProvider
+from app.services.response_cache import ResponseCache
+
+
+class EchoProvider(LLMProvider):
+    """LLM provider that answers with the prompt it was given."""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    async def generate(self, prompt):
+        return await self.generate_with_messages([{"role": "human", "content": prompt}])
+    
+    async def generate_with_messages(self, messages):
+        self.calls += 1
+        return messages[-1]["content"]
 
 
 class TestAPI:
@@ -26,6 +43,14 @@ class TestAPI:
             data = response.json()
             assert data["status"] == "healthy"
     
+    @pytest.mark.asyncio
+    async def test_health_endpoint_supports_head(self):
+        """Test health probes answer HEAD requests."""
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.head("/api/v1/health")
+            assert response.status_code == 200
+            assert response.content == b""
+    
     @pytest.mark.asyncio
     async def test_root_endpoint(self):
         """Test root endpoint."""
@@ -33,6 +58,16 @@ class TestAPI:
             response = await client.get("/")
             assert response.status_code == 200
     
+    @pytest.mark.asyncio
+    async def test_request_id_header(self):
+        """Test request IDs are echoed back, or minted when absent."""
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            response = await client.get("/", headers={"X-Request-ID": "req-123"})
+            assert response.headers["X-Request-ID"] == "req-123"
+            
+            response = await client.get("/")
+            assert len(response.headers["X-Request-ID"]) == 32
+    
     @pytest.mark.asyncio
     async def test_transaction_endpoint(self):
         """Test transaction creation endpoint."""
@@ -73,6 +108,60 @@ class TestAPI:
             assert "risk_score" in data
             assert "risk_level" in data
     
+    @pytest.mark.asyncio
+    async def test_analyze_batch_endpoint(self):
+        """Test batch analyze endpoint keeps request order."""
+        async with AsyncClient(app=app, base_url="http://test") as client:
+            transactions = [
+                {"transaction_id": "tx-low", "user_id": "user-123", "amount": 5000, "device_risk_score": 0.3},
+                {"transaction_id": "tx-high", "user_id": "user-123", "amount": 2000000, "device_risk_score": 0.3},
+            ]
+            response = await client.post("/api/v1/transactions/analyze/batch", json=transactions)
+            assert response.status_code == 200
+            data = response.json()
+            assert [r["transaction_id"] for r in data] == ["tx-low", "tx-high"]
+            assert [r["risk_level"] for r in data] == ["Low", "High"]
+            assert data[0]["compliance_explanation"] is None
+            assert data[1]["compliance_explanation"]
+            
+            response = await client.post("/api/v1/transactions/analyze/batch", json=[])
+            assert response.status_code == 400
+    
+    @pytest.mark.asyncio
+    async def test_cached_explanation_never_names_another_transaction(self):
+        """Test a response cache hit does not return the first customer's identifiers."""
+        provider = EchoProvider()
+        generator = ComplianceGenerator(llm_provider=provider)
+        cache = ResponseCache()
+        
+        async def override_generator():
+            return generator
+        
+        async def override_cache():
+            return cache
+        
+        app.dependency_overrides[get_compliance_generator] = override_generator
+        app.dependency_overrides[get_response_cache] = override_cache
+        try:
+            async with AsyncClient(app=app, base_url="http://test") as client:
+                explanations = []
+                for transaction_id, user_id, amount in (("tx-alice", "alice", 2000010), ("tx-bob", "bob", 2000020)):
+                    response = await client.post("/api/v1/transactions/analyze", json={
+                        "transaction_id": transaction_id,
+                        "user_id": user_id,
+                        "amount": amount,
+                        "device_risk_score": 0.3,
+                    })
+                    assert response.status_code == 200
+                    explanations.append(response.json()["compliance_explanation"])
+        finally:
+            app.dependency_overrides.clear()
+        
+        assert provider.calls == 1 and cache.hits == 1
+        assert explanations[0] == explanations[1]
+        for identifier in ("tx-alice", "alice", "2000010"):
+            assert identifier not in explanations[1]
+    
     @pytest.mark.asyncio
     async def test_compliance_regulations_endpoint(self):
         """Test compliance regulations endpoint."""
@@ -0,0 +1,24 @@
+"""Tests for the Bulk Processor service."""
+import pytest
+
+from app.services.bulk_processor import BulkProcessor
+from app.services.risk_engine import RiskFactor
+
+
+class TestBulkProcessor:
+    """Test cases for BulkProcessor."""
+
+    @pytest.mark.asyncio
+    async def test_regulation_lookups_are_memoized_across_uploads(self, fake_retriever):
+        """The fixed per-upload queries are searched once, then served from the memo."""
+        fake_retriever.results_per_query = 1
+        processor = BulkProcessor(regulation_retriever=fake_retriever)
+        risk_results = {"tx-1": {"risk_code": 2, "reasons": []}}
+
+        first = await processor._get_relevant_regulations(risk_results, RiskFactor.CRYPTO_EXCHANGE)
+        second = await processor._get_relevant_regulations(risk_results, RiskFactor.CRYPTO_EXCHANGE)
+        processor._get_retrieval_batcher().close()
+
+        assert sum(len(queries) for queries, _ in fake_retriever.batches) == 2
+        assert first == second
+        assert [reg["source"] for reg in first] == ["faiss", "faiss"]
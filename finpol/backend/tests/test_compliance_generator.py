@@ -0,0 +1,205 @@
+"""Tests for Compliance Generator service."""
+import asyncio
+import json
+import threading
+import pytest
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from app.services.compliance_generator import ANALYSIS_PROMPT, ComplianceGenerator, LLMProvider, OpenAIProvider
+from app.models.transaction_model import Transaction
+
+
+class FakeProvider(LLMProvider):
+    """LLM provider that answers batched prompts with one explanation per transaction."""
+    
+    def __init__(self, malformed=False):
+        self.calls = 0
+        self.malformed = malformed
+    
+    async def generate(self, prompt):
+        return await self.generate_with_messages([{"role": "human", "content": prompt}])
+    
+    async def generate_with_messages(self, messages):
+        self.calls += 1
+        if self.malformed:
+            return "not json"
+        count = messages[-1]["content"].count("Merchant Type:")
+        return json.dumps([f"explanation {self.calls}.{i}" for i in range(count)])
+
+
+class SlowProvider(LLMProvider):
+    """LLM provider whose successive calls take the given delays."""
+    
+    def __init__(self, delays):
+        self.calls = 0
+        self.delays = delays
+    
+    async def generate(self, prompt):
+        return await self.generate_with_messages([{"role": "human", "content": prompt}])
+    
+    async def generate_with_messages(self, messages):
+        self.calls += 1
+        self.messages = messages
+        call = self.calls
+        await asyncio.sleep(self.delays[min(call, len(self.delays)) - 1])
+        return f"response {call}"
+
+
+class ChatCompletionHandler(BaseHTTPRequestHandler):
+    """Minimal OpenAI chat completions endpoint over keep-alive HTTP/1.1."""
+    
+    protocol_version = "HTTP/1.1"
+    requests = 0
+    
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        type(self).requests += 1
+        body = json.dumps({
+            "id": "chatcmpl-test",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "gpt-4o",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "explained"}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def openai_server(monkeypatch):
+    """Serve chat completions locally and point the OpenAI SDK at them."""
+    handler = type("Handler", (ChatCompletionHandler,), {"requests": 0})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{server.server_port}/v1")
+    yield handler
+    server.shutdown()
+    server.server_close()
+
+
+def make_transaction(index, amount=2000000):
+    """Create a sample transaction."""
+    return Transaction(
+        transaction_id=f"test-{index:03d}",
+        user_id="user-123",
+        amount=amount,
+        country="India",
+        merchant_type="retail",
+        device_risk_score=0.3,
+        timestamp=datetime.now()
+    )
+
+
+class TestComplianceGenerator:
+    """Test cases for ComplianceGenerator."""
+    
+    @pytest.mark.asyncio
+    async def test_batch_generation_uses_one_request_per_chunk(self):
+        """Test batched generation returns ordered explanations with fewer LLM calls."""
+        provider = FakeProvider()
+        generator = ComplianceGenerator(llm_provider=provider)
+        transactions = [make_transaction(i) for i in range(10)]
+        
+        explanations = await generator.generate_batch_async(
+            transactions, [["High amount"]] * 10, ["AML rule"], batch_size=4
+        )
+        
+        assert provider.calls == 3
+        assert len(explanations) == 10
+        assert explanations[0].endswith(".0") and explanations[4].endswith(".0")
+    
+    @pytest.mark.asyncio
+    async def test_batch_generation_tolerates_malformed_response(self):
+        """Test a chunk with an unparseable response yields None entries."""
+        generator = ComplianceGenerator(llm_provider=FakeProvider(malformed=True))
+        
+        explanations = await generator.generate_batch_async(
+            [make_transaction(i) for i in range(3)], [[]] * 3, []
+        )
+        
+        assert explanations == [None, None, None]
+    
+    @pytest.mark.asyncio
+    async def test_identical_concurrent_requests_share_one_call(self):
+        """Test concurrent generation for the same prompt makes a single LLM call."""
+        provider = SlowProvider(delays=[0.05])
+        generator = ComplianceGenerator(llm_provider=provider)
+        transaction = make_transaction(1)
+        
+        results = await asyncio.gather(*[
+            generator.generate_async(transaction, ["High amount"], ["AML rule"])
+            for _ in range(3)
+        ])
+        
+        assert provider.calls == 1
+        assert results == ["response 1"] * 3
+    
+    @pytest.mark.asyncio
+    async def test_slow_request_is_hedged(self):
+        """Test a backup request is sent after the hedge delay and the faster one wins."""
+        provider = SlowProvider(delays=[1.0, 0.01])
+        generator = ComplianceGenerator(llm_provider=provider, hedge_delay=0.02)
+        
+        result = await generator.generate_async(make_transaction(1), [], [])
+        
+        assert provider.calls == 2
+        assert result == "response 2"
+    
+    @pytest.mark.asyncio
+    async def test_prompts_put_per_transaction_details_last(self):
+        """Test prompts for different transactions share everything up to their details."""
+        provider = SlowProvider(delays=[0])
+        generator = ComplianceGenerator(llm_provider=provider)
+        
+        prompts = []
+        for index, amount in ((1, 2000000), (2, 3000000)):
+            await generator.generate_async(make_transaction(index, amount), ["High amount"], ["AML rule"])
+            prompts.append(provider.messages[-1]["content"])
+        
+        shared = ANALYSIS_PROMPT.split("{transaction_info}")[0].format(regulations_text="AML rule")
+        assert all(prompt.startswith(shared) for prompt in prompts)
+        assert prompts[0] != prompts[1]
+    
+    def test_generate_sync_runs_without_an_event_loop(self):
+        """Test the blocking entry point drives its own loop."""
+        generator = ComplianceGenerator(llm_provider=SlowProvider(delays=[0]))
+        
+        assert generator.generate_sync(make_transaction(1), [], []) == "response 1"
+    
+    @pytest.mark.asyncio
+    async def test_generate_sync_refuses_to_block_a_running_loop(self):
+        """Test the blocking entry point fails fast inside an event loop."""
+        generator = ComplianceGenerator(llm_provider=SlowProvider(delays=[0]))
+        
+        with pytest.raises(RuntimeError, match="generate_async"):
+            generator.generate_sync(make_transaction(1), [], [])
+    
+    def test_generate_sync_can_run_repeatedly(self, openai_server):
+        """Test each blocking call's event loop gets working connections from the shared client."""
+        # A key of its own, so the OpenAI clients are built against the local server
+        provider = OpenAIProvider(api_key="sk-generate-sync-test")
+        generator = ComplianceGenerator(llm_provider=provider)
+        
+        results = [generator.generate_sync(make_transaction(index), [], []) for index in (1, 2)]
+        
+        assert results == ["explained", "explained"]
+        assert openai_server.requests == 2
+    
+    @pytest.mark.asyncio
+    async def test_prompt_carries_only_cacheable_features(self):
+        """Test prompts omit identifiers and exact amounts, since explanations are shared."""
+        provider = SlowProvider(delays=[0])
+        generator = ComplianceGenerator(llm_provider=provider)
+        
+        await generator.generate_async(make_transaction(7, amount=2000049), ["High amount"], [])
+        prompt = provider.messages[-1]["content"]
+        
+        assert "test-007" not in prompt and "user-123" not in prompt
+        assert "2000049" not in prompt and "2,000,000" in prompt
@@ -0,0 +1,93 @@
+"""Tests for the RAG Embeddings wrapper."""
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.rag.embeddings import EMBEDDING_DIMENSION, Embeddings, QueryEmbeddingCache, aembed_in_batches
+
+
+class FakeEmbeddingsAPI:
+    """Stand-in for client.embeddings that records each request."""
+
+    def __init__(self):
+        self.requests = []
+
+    def create(self, model, input):
+        self.requests.append(list(input))
+        return SimpleNamespace(data=[SimpleNamespace(embedding=[float(len(text)), 1.0]) for text in input])
+
+
+class FakeAsyncModel:
+    """Async embeddings model that tracks how many requests overlap."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+
+    async def aembed_documents(self, texts):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return [[float(text)] for text in texts]
+
+
+class TestEmbeddings:
+    """Test cases for Embeddings."""
+
+    def test_documents_are_embedded_in_batches(self):
+        """K documents take ceil(K / batch_size) requests, in order."""
+        api = FakeEmbeddingsAPI()
+        embeddings = Embeddings(client=SimpleNamespace(embeddings=api), batch_size=2, dimension=2)
+
+        vectors = embeddings.embed_documents(["a", "bb", "ccc"])
+
+        assert api.requests == [["a", "bb"], ["ccc"]]
+        assert vectors.dtype == np.float32
+        assert vectors[:, 0].tolist() == [1.0, 2.0, 3.0]
+
+    def test_stub_mode_returns_zero_vectors(self):
+        """Without a client, embeddings are zeros of the model dimension."""
+        vectors = Embeddings().embed_documents(["a", "b"])
+
+        assert vectors.shape == (2, EMBEDDING_DIMENSION)
+        assert not vectors.any()
+        assert Embeddings().embed_query("q").shape == (EMBEDDING_DIMENSION,)
+
+    @pytest.mark.asyncio
+    async def test_async_batches_run_concurrently_in_order(self):
+        """Batches overlap up to the concurrency limit and keep input order."""
+        model = FakeAsyncModel()
+        texts = [str(i) for i in range(10)]
+
+        vectors = await aembed_in_batches(model, texts, batch_size=2, concurrency=3)
+
+        assert vectors.dtype == np.float32
+        assert vectors.tolist() == [[float(i)] for i in range(10)]
+        assert model.peak == 3
+
+    def test_query_embeddings_are_cached_across_trivial_variants(self):
+        """Case and whitespace variants of a query reuse one API call."""
+        api = FakeEmbeddingsAPI()
+        embeddings = Embeddings(client=SimpleNamespace(embeddings=api), dimension=2)
+
+        first = embeddings.embed_query("AML  rules")
+        first[0] = -1.0
+        second = embeddings.embed_query(" aml rules ")
+
+        assert len(api.requests) == 1
+        assert second.tolist() == [10.0, 1.0]
+
+    def test_query_cache_evicts_least_recently_used(self):
+        """The cache holds at most max_entries embeddings."""
+        cache = QueryEmbeddingCache(max_entries=2)
+        cache.put("a", [1.0])
+        cache.put("b", [2.0])
+        cache.get("a")
+        cache.put("c", [3.0])
+
+        assert cache.get("b") is None
+        assert cache.get("a") == [1.0]
+        assert cache.get("c") == [3.0]
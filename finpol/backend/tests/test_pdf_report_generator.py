@@ -0,0 +1,74 @@
+"""Tests for PDF Report Generator service."""
+from datetime import datetime
+from app.services.pdf_report_generator import ReportArrays, report_generator
+from app.models.transaction_model import Transaction
+
+
+def make_transaction(index, **changes):
+    """Create a sample transaction."""
+    fields = {
+        "transaction_id": f"test-{index:03d}",
+        "user_id": "user-123",
+        "amount": 1000.0,
+        "country": "India",
+        "merchant_type": "retail",
+        "device_risk_score": 0.1,
+        "timestamp": datetime.now(),
+    }
+    return Transaction(**{**fields, **changes})
+
+
+class TestPDFReportGenerator:
+    """Test cases for PDFReportGenerator."""
+    
+    def test_report_arrays_extract_columns_in_one_pass(self):
+        """Test shared report columns, counting transactions without results as Low."""
+        transactions = [
+            make_transaction(0),
+            make_transaction(1, amount=2000000.0, merchant_type="crypto_exchange"),
+            make_transaction(2, country="USA"),
+            make_transaction(3),
+        ]
+        risk_results = {
+            "test-000": {"risk_level": "Low"},
+            "test-001": {"risk_level": "High"},
+            "test-002": {"risk_level": "Unknown"},
+        }
+        
+        arrays = ReportArrays.extract(transactions, risk_results)
+        
+        assert arrays.amounts.tolist() == [1000.0, 2000000.0, 1000.0, 1000.0]
+        assert arrays.level_codes.tolist() == [0, 2, -1, 0]
+        assert arrays.is_crypto.tolist() == [False, True, False, False]
+        assert arrays.is_foreign.tolist() == [False, False, True, False]
+        assert arrays.risk_counts == {"Low": 2, "Medium": 0, "High": 1, "Critical": 0}
+    
+    def test_high_risk_section_lists_high_and_critical(self):
+        """Test the high risk table keeps input order and only flagged rows."""
+        transactions = [make_transaction(i) for i in range(3)]
+        risk_results = {
+            "test-000": {"risk_level": "Critical"},
+            "test-001": {"risk_level": "Low"},
+            "test-002": {"risk_level": "High"},
+        }
+        arrays = ReportArrays.extract(transactions, risk_results)
+        
+        story = report_generator._build_high_risk_section(transactions, risk_results, arrays)
+        
+        table = next(flowable for flowable in story if hasattr(flowable, "_cellvalues"))
+        assert [row[0] for row in table._cellvalues[1:]] == ["test-000", "test-002"]
+    
+    def test_regulations_section_deduplicates_by_id_title_or_content(self):
+        """Test regulations without ids are not collapsed into one entry."""
+        regulations = [
+            {"content": "AML rule", "source": "faiss"},
+            {"content": "KYC rule", "source": "faiss"},
+            {"content": "AML rule", "source": "faiss"},
+            {"id": "fatf", "title": "FATF", "content": "Travel rule"},
+            {"id": "fatf", "title": "FATF", "content": "Travel rule (copy)"},
+        ]
+        
+        story = report_generator._build_regulations_section(regulations)
+        
+        contents = [flowable.text for flowable in story if getattr(flowable, "text", "").endswith("...")]
+        assert contents == ["AML rule...", "KYC rule...", "Travel rule..."]
@@ -0,0 +1,89 @@
+"""Tests for Regulation Retriever service."""
+import numpy as np
+import pytest
+from types import SimpleNamespace
+
+from app.rag.vectorstore import VectorStoreManager
+
+from app.services import regulation_retriever as regulation_retriever_module
+from app.services.regulation_retriever import RegulationRetriever
+
+
+class FakeVectorStoreManager:
+    """Vectorstore manager stub that counts index loads."""
+    
+    def __init__(self, vector_db_path):
+        self.vector_db_path = vector_db_path
+        self.loads = 0
+    
+    def load_vectorstore(self):
+        self.loads += 1
+        return SimpleNamespace(
+            similarity_search=lambda query, k=3: [SimpleNamespace(page_content=f"doc for {query}")],
+            similarity_search_by_vector=lambda vector, k=3: [SimpleNamespace(page_content=f"doc near {vector}")]
+        )
+
+
+class FakeEmbeddings:
+    """Embedding model stub that records the texts of each request."""
+    
+    def __init__(self):
+        self.requests = []
+    
+    async def aembed_documents(self, texts):
+        self.requests.append(list(texts))
+        return [[float(len(text))] for text in texts]
+
+
+class TestRegulationRetriever:
+    """Test cases for RegulationRetriever."""
+    
+    @pytest.fixture
+    def manager(self, tmp_path):
+        """Create a manager pointing at an existing index directory."""
+        return FakeVectorStoreManager(str(tmp_path))
+    
+    @pytest.mark.asyncio
+    async def test_vectorstore_is_loaded_once(self, manager):
+        """Test initialize loads the index and later queries reuse it."""
+        retriever = RegulationRetriever(vectorstore_manager=manager)
+        
+        await retriever.initialize()
+        await retriever.retrieve("aml")
+        results = await retriever.retrieve("kyc")
+        
+        assert results == ["doc for kyc"]
+        assert manager.loads == 1
+    
+    def test_saved_index_is_reloaded(self, tmp_path):
+        """Test incremental saves and rebuilds change the version and trigger a reload."""
+        path = str(tmp_path / "index")
+        vectors = np.random.default_rng(0).standard_normal((3, 16))
+        VectorStoreManager(path).save_vectorstore(["a", "b"], vectors=vectors[:2])
+        retriever = RegulationRetriever(vectorstore_manager=VectorStoreManager(path))
+        
+        versions = [retriever.get_index_version()]
+        assert retriever._get_vectorstore().index.ntotal == 2
+        
+        VectorStoreManager(path).save_vectorstore(["c"], vectors=vectors[2:], rebuild=True)
+        versions.append(retriever.get_index_version())
+        assert retriever._get_vectorstore().index.ntotal == 1
+        
+        VectorStoreManager(path).save_vectorstore(["a"], vectors=vectors[:1])
+        versions.append(retriever.get_index_version())
+        assert retriever._get_vectorstore().index.ntotal == 2
+        
+        assert len(set(versions)) == 3
+    
+    @pytest.mark.asyncio
+    async def test_batch_retrieval_reuses_cached_query_embeddings(self, manager, monkeypatch):
+        """Test retrieve_batch embeds only queries missing from the embedding cache."""
+        embeddings = FakeEmbeddings()
+        monkeypatch.setattr(regulation_retriever_module, "get_embeddings_model", lambda: embeddings)
+        retriever = RegulationRetriever(vectorstore_manager=manager)
+        
+        await retriever.retrieve_batch(["aml", "kyc"])
+        results = await retriever.retrieve_batch(["kyc", "crypto"])
+        
+        assert embeddings.requests == [["aml", "kyc"], ["crypto"]]
+        assert results == [["doc near [3.0]"], ["doc near [6.0]"]]
@@ -0,0 +1,60 @@
+"""Tests for the compliance explanation Response Cache."""
+from app.models.transaction_model import Transaction
+from app.services.response_cache import ResponseCache, feature_key
+
+
+def make_transaction(amount, device_risk_score=0.2):
+    """Build a transaction with the given amount and device score."""
+    return Transaction(
+        transaction_id="tx-1",
+        user_id="user-123",
+        amount=amount,
+        country="India",
+        merchant_type="crypto_exchange",
+        device_risk_score=device_risk_score,
+    )
+
+
+class TestResponseCache:
+    """Test cases for ResponseCache."""
+
+    def test_similar_transactions_share_a_key(self):
+        """Amounts and device scores are bucketed."""
+        assert feature_key(make_transaction(1210.0, 0.21)) == feature_key(make_transaction(1190.0, 0.24))
+        assert feature_key(make_transaction(1210.0)) != feature_key(make_transaction(1310.0))
+
+    def test_hit_requires_matching_risk_level(self):
+        """Entries are only reused for the risk level they were generated for."""
+        cache = ResponseCache()
+        cache.put("key", "Medium", "explanation")
+
+        assert cache.get("key", "Medium") == "explanation"
+        assert cache.get("key", "High") is None
+        assert cache.get_stats()["hits"] == 1
+        assert cache.get_stats()["misses"] == 1
+
+    def test_hit_requires_matching_risk_factors(self):
+        """Entries are only reused when the same rules fired, in any order."""
+        cache = ResponseCache()
+        cache.put("key", "High", "explanation", ["Crypto exchange", "High-value non-India"])
+
+        assert cache.get("key", "High", ["High-value non-India", "Crypto exchange"]) == "explanation"
+        assert cache.get("key", "High", ["Crypto exchange"]) is None
+
+    def test_lru_eviction_and_ttl(self, monkeypatch):
+        """The least recently used entry is evicted and expired entries miss."""
+        cache = ResponseCache(max_entries=2)
+        cache.put("a", "Medium", "A")
+        cache.put("b", "Medium", "B")
+        cache.get("a", "Medium")
+        cache.put("c", "Medium", "C")
+
+        assert cache.get("b", "Medium") is None
+        assert cache.get("a", "Medium") == "A"
+        assert cache.get_stats()["evictions"] == 1
+
+        clock = iter([100.0, 200.0])
+        monkeypatch.setattr("app.services.response_cache.time.monotonic", lambda: next(clock))
+        expired = ResponseCache(ttl_seconds=60)
+        expired.put("a", "Medium", "A")
+        assert expired.get("a", "Medium") is None
@@ -0,0 +1,57 @@
+"""Tests for the regulation Retrieval Batcher."""
+import asyncio
+import pytest
+
+from app.services.retrieval_batcher import RetrievalBatcher
+
+
+class TestRetrievalBatcher:
+    """Test cases for RetrievalBatcher."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_queries_share_one_search(self, fake_retriever):
+        """Concurrent submits are searched together and fanned back out."""
+        batcher = RetrievalBatcher(fake_retriever, max_wait_seconds=0.05)
+
+        results = await asyncio.gather(
+            batcher.submit("aml", top_k=1),
+            batcher.submit("kyc", top_k=2),
+            batcher.submit("fatf", top_k=3),
+        )
+        batcher.close()
+
+        assert results == [["aml-0"], ["kyc-0", "kyc-1"], ["fatf-0", "fatf-1", "fatf-2"]]
+        assert fake_retriever.batches == [(["aml", "kyc", "fatf"], 3)]
+
+    @pytest.mark.asyncio
+    async def test_batches_are_capped_and_errors_propagate(self, fake_retriever):
+        """Batches respect the size cap and failures reach every caller."""
+        fake_retriever.fail = True
+        batcher = RetrievalBatcher(fake_retriever, max_batch_size=2, max_wait_seconds=0.05)
+
+        results = await asyncio.gather(
+            *(batcher.submit(f"q{i}") for i in range(3)),
+            return_exceptions=True
+        )
+        batcher.close()
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert [len(queries) for queries, _ in fake_retriever.batches] == [2, 1]
+
+    @pytest.mark.asyncio
+    async def test_repeated_queries_are_memoized_per_index_version(self, fake_retriever):
+        """Repeat queries skip the search until the index is rebuilt."""
+        batcher = RetrievalBatcher(fake_retriever, max_wait_seconds=0)
+
+        assert await batcher.submit("aml", top_k=2) == ["aml-0", "aml-1"]
+        assert await batcher.submit("aml", top_k=1) == ["aml-0"]
+        assert len(fake_retriever.batches) == 1
+
+        # A larger k or a new index version needs a fresh search
+        await batcher.submit("aml", top_k=3)
+        fake_retriever.version = "v2"
+        await batcher.submit("aml", top_k=1)
+        batcher.close()
+
+        assert [k for _, k in fake_retriever.batches] == [2, 3, 1]
+        assert batcher.get_stats()["cache_hits"] == 1
@@ -1,8 +1,9 @@
 """Tests for Risk Engine service."""
 import pytest
+import pandas as pd
 from datetime import datetime
-from app.services.risk_engine import RiskEngine, RiskLevel
-from app.models.transaction_model import Transaction, TransactionType
+from app.services.risk_engine import RiskEngine, RiskFactor, RiskLevel, RiskRule
+from app.models.transaction_model import Transaction, TransactionType, TxnCore
 
 
 class TestRiskEngine:
@@ -64,3 +65,108 @@ class TestRiskEngine:
         assert response.transaction_id == sample_transaction.transaction_id
         assert response.should_approve is not None
         assert response.requires_review is not None
+    
+    def test_assess_batch_matches_per_row_assessment(self, risk_engine, sample_transaction):
+        """Test batch assessment agrees with assess_risk for each row."""
+        variants = [
+            {},
+            {"amount": 2000000},
+            {"merchant_type": "crypto_exchange", "device_risk_score": 0.9},
+            {"country": "USA", "amount": 600000},
+        ]
+        transactions = [
+            Transaction(**{**sample_transaction.model_dump(), "transaction_id": f"test-{i}", **changes})
+            for i, changes in enumerate(variants)
+        ]
+        frame = pd.DataFrame([tx.model_dump() for tx in transactions])
+        
+        batch = risk_engine.assess_batch(frame)
+        
+        for tx, (_, row) in zip(transactions, batch.iterrows()):
+            assessment = risk_engine.assess_risk(tx)
+            assert row["risk_level"] == assessment.risk_level
+            assert row["risk_score"] == assessment.risk_score
+            assert row["reasons"] == assessment.factors
+        assert batch["risk_factors"].tolist() == [
+            RiskFactor.NONE,
+            RiskFactor.HIGH_AMOUNT,
+            RiskFactor.CRYPTO_EXCHANGE | RiskFactor.HIGH_DEVICE_RISK,
+            RiskFactor.FOREIGN_HIGH_VALUE,
+        ]
+    
+    def test_assess_batch_passes_core_records_to_row_rules(self, risk_engine, sample_transaction):
+        """Test rules without a vectorized form see complete rows on both batch paths."""
+        seen = []
+        
+        class RetailRule(RiskRule):
+            name = "retail"
+            
+            def evaluate(self, transaction):
+                seen.append(transaction)
+                if transaction.merchant_type == "retail" and transaction.timestamp.hour >= 0:
+                    return "Retail merchant", RiskLevel.MEDIUM
+                return None
+        
+        risk_engine.add_rule(RetailRule())
+        frame = pd.DataFrame([sample_transaction.model_dump()])
+        
+        batch = risk_engine.assess_batch(frame)
+        
+        assert seen == [sample_transaction.to_core()]
+        assert isinstance(seen[0], TxnCore) and not hasattr(seen[0], "__dict__")
+        assert batch["risk_level"].tolist() == ["Medium"]
+        assert batch["reasons"].tolist() == [["Retail merchant"]]
+        
+        # assess_transactions hands the rule the transaction itself
+        seen.clear()
+        batch = risk_engine.assess_transactions([sample_transaction])
+        
+        assert seen == [sample_transaction]
+        assert batch["risk_level"].tolist() == ["Medium"]
+        
+        # A frame without the fields TxnCore needs is rejected, not defaulted
+        with pytest.raises(ValueError, match="user_id, timestamp"):
+            risk_engine.assess_batch(frame.drop(columns=["user_id", "timestamp"]))
+    
+    def test_assess_batch_skips_only_rows_a_rule_fails_on(self, risk_engine, sample_transaction):
+        """Test a row rule raising on one row still applies to the other rows."""
+        class FlakyRule(RiskRule):
+            name = "flaky"
+            
+            def evaluate(self, transaction):
+                if transaction.amount == 13:
+                    raise ValueError("unlucky amount")
+                return "Flagged", RiskLevel.HIGH
+        
+        risk_engine.add_rule(FlakyRule())
+        transactions = [
+            Transaction(**{**sample_transaction.model_dump(), "transaction_id": f"test-{i}", "amount": amount})
+            for i, amount in enumerate((500, 13))
+        ]
+        
+        batch = risk_engine.assess_transactions(transactions)
+        
+        expected = [risk_engine.assess_risk(tx).risk_level for tx in transactions]
+        assert expected == ["High", "Low"]
+        assert batch["risk_level"].tolist() == expected
+    
+    def test_assess_transactions_gives_row_rules_every_field(self, risk_engine, sample_transaction):
+        """Test per-row rules see the same timestamp and user as in assess_risk."""
+        class NightRule(RiskRule):
+            name = "night"
+            
+            def evaluate(self, transaction):
+                if transaction.timestamp.hour < 5 and transaction.user_id == "user-123":
+                    return "Night-time transaction", RiskLevel.MEDIUM
+                return None
+        
+        risk_engine.add_rule(NightRule())
+        transaction = Transaction(**{
+            **sample_transaction.model_dump(), "timestamp": datetime(2024, 1, 1, 2, 0)
+        })
+        
+        batch = risk_engine.assess_transactions([transaction])
+        
+        assert risk_engine.assess_risk(transaction).risk_level == "Medium"
+        assert batch["risk_level"].tolist() == ["Medium"]
+        assert batch["reasons"].tolist() == [["Night-time transaction"]]
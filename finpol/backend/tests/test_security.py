@@ -0,0 +1,36 @@
+"""Tests for security utilities."""
+import hashlib
+
+from app.core.security import hash_password, verify_password
+
+
+class TestPasswordHashing:
+    """Test cases for password hashing."""
+
+    def test_hashes_are_salted_and_verifiable(self):
+        """The same password hashes differently but verifies against both."""
+        first = hash_password("correct horse")
+        second = hash_password("correct horse")
+
+        assert first != second
+        assert verify_password("correct horse", first)
+        assert verify_password("correct horse", second)
+        assert not verify_password("wrong horse", first)
+
+    def test_legacy_sha256_hashes_still_verify(self):
+        """Hashes created before scrypt remain valid."""
+        legacy = hashlib.sha256(b"correct horse").hexdigest()
+
+        assert verify_password("correct horse", legacy)
+        assert not verify_password("wrong horse", legacy)
+
+    def test_malformed_scrypt_hashes_fail_verification(self):
+        """Stored hashes with unusable parameters are rejected, not raised."""
+        for malformed in (
+            "scrypt$3$8$1$00$00",
+            f"scrypt${2 ** 30}$8$1$00$00",
+            f"scrypt${2 ** 70}$8$1$00$00",
+            "scrypt$-16$8$1$00$00",
+            "scrypt$16384$8$1$zz$00",
+        ):
+            assert not verify_password("correct horse", malformed)
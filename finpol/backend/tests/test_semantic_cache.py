@@ -0,0 +1,61 @@
+"""Tests for the regulation search Semantic Cache."""
+import json
+import pytest
+
+from app.services.semantic_cache import SemanticCache
+
+
+class TestSemanticCache:
+    """Test cases for SemanticCache."""
+
+    @pytest.mark.asyncio
+    async def test_exact_repeat_is_served_from_cache(self, fake_retriever):
+        """Normalized repeats skip the fake_retriever."""
+        cache = SemanticCache()
+
+        first = await cache.get_or_search("AML  reporting", fake_retriever)
+        second = await cache.get_or_search("aml reporting", fake_retriever)
+
+        assert first == second
+        assert len(fake_retriever.searches) == 1
+        assert json.loads(first)[0]["source"] == "faiss"
+
+    @pytest.mark.asyncio
+    async def test_similar_embedding_is_a_semantic_hit(self, fake_retriever):
+        """Queries above the similarity threshold reuse the cached result."""
+        cache = SemanticCache(similarity_threshold=0.9)
+        fake_retriever.embeddings = {
+            "aml rules": [1.0, 0.0, 0.1],
+            "aml regulations": [1.0, 0.0, 0.15],
+            "crypto travel rule": [0.0, 1.0, 0.0],
+        }
+
+        await cache.get_or_search("aml rules", fake_retriever)
+        await cache.get_or_search("aml regulations", fake_retriever)
+        await cache.get_or_search("crypto travel rule", fake_retriever)
+
+        assert [q for q, _ in fake_retriever.searches] == ["aml rules", "crypto travel rule"]
+        assert fake_retriever.searches[0][1] == [1.0, 0.0, 0.1]
+        assert cache.get_stats()["semantic_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_index_rebuild_invalidates_entries(self, fake_retriever):
+        """A new index version starts from an empty cache."""
+        cache = SemanticCache()
+
+        await cache.get_or_search("kyc", fake_retriever)
+        fake_retriever.version = "v2"
+        await cache.get_or_search("kyc", fake_retriever)
+
+        assert len(fake_retriever.searches) == 2
+
+    @pytest.mark.asyncio
+    async def test_oldest_entry_is_evicted_when_full(self, fake_retriever):
+        """The cache never holds more than max_entries searches."""
+        cache = SemanticCache(max_entries=2)
+
+        for query in ("a", "b", "c", "a"):
+            await cache.get_or_search(query, fake_retriever)
+
+        assert [q for q, _ in fake_retriever.searches] == ["a", "b", "c", "a"]
+        assert cache.get_stats()["entries"] == 2
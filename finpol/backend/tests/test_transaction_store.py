@@ -0,0 +1,108 @@
+"""Tests for the columnar Transaction Store."""
+import pytest
+from datetime import datetime, timedelta, timezone
+
+from app.services.transaction_store import (
+    SQLiteTransactionStore,
+    TransactionStore,
+    sqlite_path_from_url,
+)
+
+
+def make_record(transaction_id, minutes, amount=100.0):
+    """Build a stored transaction record."""
+    return {
+        "id": transaction_id,
+        "user_id": "user-123",
+        "amount": amount,
+        "currency": "USD",
+        "transaction_type": "transfer",
+        "description": None,
+        "recipient_account": "ACC123456",
+        "sender_account": "ACC789012",
+        "country": "India",
+        "merchant_type": "retail",
+        "device_risk_score": 0.2,
+        "timestamp": datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=minutes),
+        "risk_score": 25,
+        "risk_level": "Low",
+    }
+
+
+class TestTransactionStore:
+    """Test cases for TransactionStore."""
+
+    @pytest.fixture
+    def store(self):
+        """Create a small store so growth is exercised."""
+        return TransactionStore(initial_capacity=2)
+
+    def test_round_trip(self, store):
+        """Stored records come back unchanged."""
+        record = make_record("tx-1", 5, amount=1234.5)
+        store.add(record)
+
+        assert store.get("tx-1") == record
+        assert store.get("missing") is None
+
+    def test_list_is_newest_first_and_paginated(self, store):
+        """Listing sorts by timestamp descending and applies offset/limit."""
+        for i, minutes in enumerate([10, 30, 20, 40, 0]):
+            store.add(make_record(f"tx-{i}", minutes))
+
+        ids = [r["id"] for r in store.list(limit=10)]
+        assert ids == ["tx-3", "tx-1", "tx-2", "tx-0", "tx-4"]
+        assert [r["id"] for r in store.list(limit=2, offset=1)] == ["tx-1", "tx-2"]
+
+    def test_delete_and_compaction(self, store):
+        """Deleted rows disappear and survivors stay addressable after compaction."""
+        for i in range(200):
+            store.add(make_record(f"tx-{i}", i))
+        for i in range(150):
+            assert store.delete(f"tx-{i}")
+
+        assert not store.delete("tx-0")
+        assert len(store) == 50
+        assert store.get("tx-199")["timestamp"] == datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=199)
+        assert [r["id"] for r in store.list(limit=2)] == ["tx-199", "tx-198"]
+
+    def test_naive_timestamps_are_read_back_as_utc(self, store):
+        """Naive timestamps are stored as UTC and returned timezone-aware."""
+        record = make_record("tx-1", 0)
+        record["timestamp"] = datetime(2024, 1, 1, 12, 30, 0, 123456)
+        store.add(record)
+
+        assert store.get("tx-1")["timestamp"] == datetime(2024, 1, 1, 12, 30, 0, 123456, tzinfo=timezone.utc)
+
+
+class TestSQLiteTransactionStore:
+    """Test cases for SQLiteTransactionStore."""
+
+    @pytest.fixture
+    def db_path(self, tmp_path):
+        """Database file in a temporary directory."""
+        return str(tmp_path / "transactions.db")
+
+    def test_round_trip_and_ordering(self, db_path):
+        """Stored records come back unchanged, newest first."""
+        store = SQLiteTransactionStore(db_path)
+        for i, minutes in enumerate([10, 30, 20, 40, 0]):
+            store.add(make_record(f"tx-{i}", minutes, amount=100.0 + i))
+
+        assert store.get("tx-1") == make_record("tx-1", 30, amount=101.0)
+        assert [r["id"] for r in store.list(limit=2, offset=1)] == ["tx-1", "tx-2"]
+        assert store.delete("tx-1")
+        assert not store.delete("tx-1")
+        assert len(store) == 4
+
+    def test_rows_persist_across_connections(self, db_path):
+        """A second store on the same file sees earlier writes."""
+        SQLiteTransactionStore(db_path).add(make_record("tx-1", 5))
+
+        assert SQLiteTransactionStore(db_path).get("tx-1")["id"] == "tx-1"
+
+    def test_sqlite_path_from_url(self):
+        """Only sqlite URLs map to a database path."""
+        assert sqlite_path_from_url("sqlite:///./finpol.db") == "./finpol.db"
+        assert sqlite_path_from_url("sqlite://") == ":memory:"
+        assert sqlite_path_from_url("postgresql://user@localhost/finpol") is None
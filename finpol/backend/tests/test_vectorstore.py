@@ -0,0 +1,152 @@
+"""Tests for the FAISS VectorStore."""
+import faiss
+import numpy as np
+import pytest
+
+from app.config import settings
+from app.rag import vectorstore
+from app.rag.vectorstore import VectorStore, VectorStoreManager, build_ivf_index
+
+
+@pytest.fixture
+def vectors():
+    """Random embeddings with a fixed seed."""
+    return np.random.default_rng(0).standard_normal((200, 16))
+
+
+class TestVectorStore:
+    """Test cases for VectorStore."""
+
+    @pytest.mark.parametrize("quantization", ["fp16", "int8", None])
+    def test_search_finds_stored_vector(self, vectors, quantization):
+        """Each encoding returns the stored document for its own vector."""
+        store = VectorStore(dimension=16, quantization=quantization)
+        store.add_vectors(vectors, [f"doc-{i}" for i in range(len(vectors))])
+
+        results = store.search_one(vectors[42], top_k=3)
+
+        assert results[0][0] == "doc-42"
+        assert len(results) == 3
+
+    def test_scores_are_cosine_similarities(self, vectors):
+        """Scale does not affect ranking, and better matches score higher."""
+        store = VectorStore(dimension=16, quantization=None)
+        store.add_vectors(vectors, [f"doc-{i}" for i in range(len(vectors))])
+
+        results = store.search_one(vectors[7] * 10, top_k=3)
+        scores = [score for _, score in results]
+
+        assert results[0][0] == "doc-7"
+        assert scores[0] == pytest.approx(1.0, abs=1e-5)
+        assert scores == sorted(scores, reverse=True)
+
+    def test_unknown_quantization_is_rejected(self):
+        """Only supported scalar quantizers are accepted."""
+        with pytest.raises(ValueError):
+            VectorStore(quantization="pq")
+
+    def test_unfilled_slots_are_dropped(self, vectors):
+        """Asking for more results than documents returns only real matches."""
+        store = VectorStore(dimension=16)
+        store.add_vectors(vectors[:2], ["a", "b"])
+        assert [doc for doc, _ in store.search_one(vectors[0], top_k=5)] == ["a", "b"]
+
+        store.add_vectors(vectors[2:3], ["c"])
+        assert store.search_one(vectors[2], top_k=1)[0][0] == "c"
+
+    def test_staged_vectors_flush_in_one_batch(self, vectors):
+        """Small adds are staged, then indexed together in insertion order."""
+        store = VectorStore(dimension=16, quantization="int8")
+        for start in range(0, len(vectors), 50):
+            store.add_vectors(vectors[start:start + 50], [f"doc-{i}" for i in range(start, start + 50)])
+        assert store.index is None
+
+        assert store.search_one(vectors[150], top_k=1)[0][0] == "doc-150"
+        assert store.index.ntotal == len(vectors) == len(store.documents)
+
+    def test_batch_search_returns_results_per_query(self, vectors):
+        """A batch of queries gets one ranked result list per query."""
+        store = VectorStore(dimension=16, quantization=None)
+        store.add_vectors(vectors, [f"doc-{i}" for i in range(len(vectors))])
+        queries = vectors[[3, 99, 150]].astype(np.float32)
+
+        results = store.search(queries, top_k=2)
+
+        assert [hits[0][0] for hits in results] == ["doc-3", "doc-99", "doc-150"]
+        assert all(len(hits) == 2 for hits in results)
+
+    def test_batch_search_rejects_non_float32_queries(self, vectors):
+        """Batched search requires 2D float32 input."""
+        store = VectorStore(dimension=16)
+        with pytest.raises(ValueError):
+            store.search(vectors[:2], top_k=1)
+        with pytest.raises(ValueError):
+            store.search(vectors[0].astype(np.float32), top_k=1)
+
+
+class TestVectorStoreManager:
+    """Test cases for incremental VectorStoreManager saves."""
+
+    def test_save_adds_only_new_texts_to_saved_store(self, tmp_path, vectors):
+        """A second ingest skips indexed texts and appends the rest."""
+        path = str(tmp_path / "index")
+        VectorStoreManager(path).save_vectorstore(["a", "b"], vectors=vectors[:2])
+
+        manager = VectorStoreManager(path)
+        texts, metadatas = manager.exclude_indexed(["b", "c"], [{"n": 1}, {"n": 2}])
+        assert (texts, metadatas) == (["c"], [{"n": 2}])
+
+        store = manager.save_vectorstore(texts, metadatas, vectors=vectors[2:3])
+        assert store.index.ntotal == 3
+        assert VectorStoreManager(path).load_vectorstore().index.ntotal == 3
+
+    def test_rebuild_replaces_saved_store(self, tmp_path, vectors):
+        """rebuild=True starts a fresh index."""
+        path = str(tmp_path / "index")
+        VectorStoreManager(path).save_vectorstore(["a", "b"], vectors=vectors[:2])
+
+        store = VectorStoreManager(path).save_vectorstore(["c"], vectors=vectors[2:3], rebuild=True)
+        assert store.index.ntotal == 1
+
+    def test_merge_from_appends_other_store(self, tmp_path, vectors):
+        """Stores saved by separate processes can be merged."""
+        VectorStoreManager(str(tmp_path / "one")).save_vectorstore(["a"], vectors=vectors[:1])
+        VectorStoreManager(str(tmp_path / "two")).save_vectorstore(["b", "c"], vectors=vectors[1:3])
+
+        store = VectorStoreManager(str(tmp_path / "one")).merge_from(str(tmp_path / "two"))
+        assert store.index.ntotal == 3
+        assert VectorStoreManager(str(tmp_path / "one")).load_vectorstore().index.ntotal == 3
+
+    def test_small_store_over_ivf_threshold_stays_flat(self, tmp_path, vectors, monkeypatch):
+        """A corpus too small to train IVF is saved as the flat index."""
+        monkeypatch.setattr(vectorstore, "settings", settings.model_copy(update={"vector_index_ivf_threshold": 1}))
+        path = str(tmp_path / "index")
+
+        store = VectorStoreManager(path).save_vectorstore([f"doc-{i}" for i in range(len(vectors))], vectors=vectors)
+
+        assert isinstance(store.index, faiss.IndexFlat)
+        assert VectorStoreManager(path).load_vectorstore().index.ntotal == len(vectors)
+
+
+class TestBuildIvfIndex:
+    """Test cases for converting a flat index to IVF."""
+
+    def test_too_few_vectors_keeps_flat_index(self, vectors):
+        """Below the training minimum the flat index is returned unchanged."""
+        flat = faiss.IndexFlatL2(16)
+        flat.add(vectors.astype(np.float32))
+
+        assert build_ivf_index(flat, nprobe=8) is flat
+
+    def test_large_index_is_trained_and_searchable(self):
+        """With enough vectors an IVF index is built and finds stored vectors."""
+        data = np.random.default_rng(0).standard_normal((24_400, 8)).astype(np.float32)
+        flat = faiss.IndexFlatL2(8)
+        flat.add(data)
+
+        index = build_ivf_index(flat, nprobe=8)
+
+        assert isinstance(index, faiss.IndexIVF)
+        assert index.ntotal == len(data)
+        _, ids = index.search(data[[3, 4242, 24_399]], 1)
+        assert ids.ravel().tolist() == [3, 4242, 24_399]